@@ -0,0 +1,35 @@
+"""Unique vendor price per component
+
+Revision ID: 7b2d4f90c1e3
+Revises: a3c9e1f27b44
+Create Date: 2026-10-16 11:03:27.914562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # Added for SQLModel support
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d4f90c1e3'
+down_revision: Union[str, None] = 'a3c9e1f27b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the newest row for any (component, vendor) duplicates first
+    op.execute("""
+        DELETE FROM vendor_prices older
+        USING vendor_prices newer
+        WHERE older.component_id = newer.component_id
+          AND older.vendor_name = newer.vendor_name
+          AND older.id < newer.id
+    """)
+    op.create_unique_constraint('uq_vendor_prices_component_vendor', 'vendor_prices', ['component_id', 'vendor_name'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_vendor_prices_component_vendor', 'vendor_prices', type_='unique')
@@ -0,0 +1,92 @@
+"""Add raw_pages and move inline HTML out of vendor_prices
+
+Revision ID: c4e8a2d61f09
+Revises: 7b2d4f90c1e3
+Create Date: 2026-10-16 13:40:12.375014
+
+Existing vendor_prices.raw_data {"html": ...} values are compressed into
+raw_pages and replaced with {"page": <sha256>}. Run VACUUM FULL vendor_prices
+afterwards to hand the freed space back to the OS.
+
+"""
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel # Added for SQLModel support
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d61f09'
+down_revision: Union[str, None] = '7b2d4f90c1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK = 200
+
+
+def upgrade() -> None:
+    op.create_table('raw_pages',
+    sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('encoding', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('content', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+    conn = op.get_bind()
+    insert_page = sa.text(
+        "INSERT INTO raw_pages (sha256, encoding, size_bytes, content, created_at) "
+        "VALUES (:sha256, 'gzip', :size_bytes, :content, :created_at) ON CONFLICT (sha256) DO NOTHING"
+    )
+    update_price = sa.text("UPDATE vendor_prices SET raw_data = CAST(:raw_data AS JSON) WHERE id = :id")
+
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT id, raw_data ->> 'html' AS html FROM vendor_prices "
+            "WHERE id > :last_id AND raw_data ->> 'html' IS NOT NULL ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_CHUNK}).all()
+        if not rows:
+            break
+
+        now = datetime.utcnow()
+        pages, updates = {}, []
+        for row in rows:
+            data = row.html.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            pages[digest] = {"sha256": digest, "size_bytes": len(data), "content": gzip.compress(data, compresslevel=6), "created_at": now}
+            updates.append({"id": row.id, "raw_data": json.dumps({"page": digest})})
+
+        conn.execute(insert_page, list(pages.values()))
+        conn.execute(update_price, updates)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    update_price = sa.text("UPDATE vendor_prices SET raw_data = CAST(:raw_data AS JSON) WHERE id = :id")
+
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT vendor_prices.id, raw_pages.content FROM vendor_prices "
+            "JOIN raw_pages ON raw_pages.sha256 = vendor_prices.raw_data ->> 'page' "
+            "WHERE vendor_prices.id > :last_id ORDER BY vendor_prices.id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_CHUNK}).all()
+        if not rows:
+            break
+
+        updates = [
+            {"id": row.id, "raw_data": json.dumps({"html": gzip.decompress(row.content).decode("utf-8")})}
+            for row in rows
+        ]
+        conn.execute(update_price, updates)
+        last_id = rows[-1].id
+
+    op.drop_table('raw_pages')
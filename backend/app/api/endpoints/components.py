@@ -9,6 +9,7 @@ from ...database import get_session
 from ...models.component import Component
 from ...models.price import VendorPrice
 from ...models.enums import ComponentType
+from ...services.refresh import component_views
 from typing import Optional
 from ...models.price import VendorPrice
 
@@ -121,5 +122,8 @@ async def read_component(
     if not component:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Component not found")
+
+    # View counts feed the scraper's refresh priorities; buffered, written in the background
+    component_views.add(component_id)
         
     return component
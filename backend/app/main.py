@@ -4,12 +4,16 @@ Zenfa API - PC Parts Aggregator for Bangladesh
 A price comparison and AI-powered build recommendation API.
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from .config import get_settings
-from .database import init_db
+from .database import init_db, engine
+from .metrics import setup_metrics
+from .services.refresh import component_views
 
 settings = get_settings()
 
@@ -19,8 +23,15 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup: Initialize database
     init_db()
+    # Component view counts are written in batches, off the request path
+    view_writer = asyncio.create_task(component_views.run(engine))
     yield
-    # Shutdown: Cleanup if needed
+    # Shutdown: write the views still buffered
+    view_writer.cancel()
+    try:
+        await view_writer
+    except asyncio.CancelledError:
+        pass
 
 
 from .api.endpoints import components
@@ -48,6 +59,10 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 
+# Opt-in Prometheus endpoint (METRICS_ENABLED=true)
+if settings.metrics_enabled:
+    setup_metrics(app, engine, prefix="zenfa_api")
+
 
 @app.get("/")
 async def root():
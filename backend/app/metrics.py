@@ -0,0 +1,101 @@
+"""
+Opt-in Prometheus metrics for the API (``METRICS_ENABLED=true``).
+
+Serves ``GET /metrics`` in the Prometheus text format with request latency
+per route template, how long requests hold SQLAlchemy pool connections, and
+the pool's connections in use, idle and in overflow. Needs ``prometheus_client``; nothing is imported
+or instrumented while metrics are disabled.
+"""
+
+import logging
+import time
+
+from fastapi import FastAPI, Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds; API routes are mostly sub-second DB reads
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HOLD_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+
+def setup_metrics(app: FastAPI, engine: Engine, prefix: str = "zenfa_api") -> bool:
+    """Adds the latency middleware, pool instrumentation and the /metrics route. False if unavailable."""
+    try:
+        from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    except ImportError:
+        logger.warning("METRICS_ENABLED is set but prometheus_client is not installed; /metrics disabled")
+        return False
+
+    # Own registry: repeated setup (tests, reloads) never collides with the global one
+    registry = CollectorRegistry()
+    latency = Histogram(
+        f"{prefix}_request_duration_seconds", "HTTP request latency by route template",
+        ["method", "route", "status"], buckets=LATENCY_BUCKETS, registry=registry,
+    )
+    in_progress = Gauge(f"{prefix}_requests_in_progress", "HTTP requests being served", registry=registry)
+    hold_time = Histogram(
+        f"{prefix}_db_pool_connection_hold_seconds", "Time a connection stays checked out of the SQLAlchemy pool",
+        buckets=HOLD_BUCKETS, registry=registry,
+    )
+    checkouts = Counter(f"{prefix}_db_pool_checkouts", "Connections checked out of the pool", registry=registry)
+    # Read from the live pool at scrape time
+    for name, documentation, read in (
+        ("in_use", "Connections checked out of the pool", lambda: engine.pool.checkedout()),
+        ("idle", "Connections idle in the pool", lambda: engine.pool.checkedin()),
+        ("overflow", "Connections open beyond pool_size", lambda: max(engine.pool.overflow(), 0)),
+        ("size", "Configured pool_size", lambda: engine.pool.size()),
+    ):
+        Gauge(f"{prefix}_db_pool_{name}", documentation, registry=registry).set_function(read)
+
+    _watch_pool(engine, hold_time, checkouts)
+
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        if request.url.path == "/metrics":
+            return await call_next(request)
+        start = time.perf_counter()
+        status = 500
+        in_progress.inc()
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            in_progress.dec()
+            # The template ("/components/{component_id}"), not the raw path, keeps label values bounded
+            route = request.scope.get("route")
+            latency.labels(request.method, getattr(route, "path", "unmatched"), str(status)).observe(
+                time.perf_counter() - start
+            )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+    logger.info("Prometheus metrics enabled at /metrics")
+    return True
+
+
+def _watch_pool(engine: Engine, hold_time, checkouts) -> None:
+    """
+    Times each checkout-to-checkin span with the pool's public events. Long
+    holds with in_use at size + overflow are what make later requests queue
+    for a connection; a checkout that times out surfaces as a 500 in the
+    request histogram.
+    """
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        checkouts.inc()
+
+    def on_checkin(dbapi_connection, connection_record):
+        # Absent when the connection was checked out before setup_metrics ran
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            hold_time.observe(time.perf_counter() - started)
+
+    event.listen(engine.pool, "checkout", on_checkout)
+    event.listen(engine.pool, "checkin", on_checkin)
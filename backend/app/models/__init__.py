@@ -12,6 +12,11 @@ from .monitor import Monitor
 from .laptop import Laptop
 from .peripheral import Peripheral
 from .price import VendorPrice
+from .match import ProductMatch
+from .raw_page import RawPage
+from .page_validator import PageValidator
+from .checkpoint import ScrapeRun, ScrapeCheckpoint
+from .refresh import UrlRefreshStats, ComponentView
 from .enums import (
     ComponentType, SocketType, FormFactor, RAMType, StorageType, PSUkb,
     CoolerType, MonitorPanelType, KeyboardType, PeripheralType
@@ -32,6 +37,13 @@ __all__ = [
     "Laptop",
     "Peripheral",
     "VendorPrice",
+    "ProductMatch",
+    "RawPage",
+    "PageValidator",
+    "ScrapeRun",
+    "ScrapeCheckpoint",
+    "UrlRefreshStats",
+    "ComponentView",
     "ComponentType",
     "SocketType",
     "FormFactor",
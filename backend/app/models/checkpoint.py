@@ -0,0 +1,38 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional, List
+from datetime import datetime
+from sqlalchemy import Column, JSON
+
+
+class ScrapeRun(SQLModel, table=True):
+    """One pass of a scrape runner over its planned categories; unfinished runs are resumed."""
+
+    __tablename__ = "scrape_runs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    runner: str = Field(index=True)  # "full", "safe", ...
+    plan: List[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))  # component types
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    # Refresh planning: URLs picked, how many were fetched, and the expected
+    # versus actually observed number of price/stock changes among them
+    planned: Optional[int] = None
+    refreshed: Optional[int] = None
+    expected_changes: Optional[float] = None
+    actual_changes: Optional[int] = None
+
+
+class ScrapeCheckpoint(SQLModel, table=True):
+    """Progress of one URL within a run: a listing page, a product page or a whole category."""
+
+    __tablename__ = "scrape_checkpoints"
+
+    run_id: int = Field(foreign_key="scrape_runs.id", primary_key=True)
+    vendor_name: str = Field(primary_key=True)
+    category: str = Field(primary_key=True)
+    url: str = Field(primary_key=True)  # empty for the category marker
+    page: int = 0  # listing page the URL was found on
+    kind: str = "product"  # listing, product or category
+    status: str = "pending"  # pending, done, skipped or failed
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
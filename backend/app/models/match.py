@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class ProductMatch(SQLModel, table=True):
+    """Remembers which component a vendor product URL was matched to."""
+
+    __tablename__ = "product_matches"
+
+    vendor_url: str = Field(primary_key=True)
+    vendor_name: str = Field(index=True)
+    component_id: int = Field(foreign_key="components.id", index=True)
+    name_hash: str  # sha1 of the normalized product title at match time
+    last_matched: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class PageValidator(SQLModel, table=True):
+    """HTTP cache validators and body hash from the last fetch of a vendor URL."""
+
+    __tablename__ = "page_validators"
+
+    url: str = Field(primary_key=True)
+    vendor_name: str = Field(index=True)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None  # sha256 of the raw response body
+    checked_at: datetime = Field(default_factory=datetime.utcnow)
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
@@ -2,7 +2,7 @@ from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, TYPE_CHECKING, Dict, Any
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, UniqueConstraint
 
 if TYPE_CHECKING:
     from .component import Component
@@ -22,6 +22,10 @@ class VendorPrice(SQLModel, table=True):
     """Price tracking for components across vendors."""
     
     __tablename__ = "vendor_prices"
+    # Ensure unique price per component per vendor (target of bulk upserts)
+    __table_args__ = (
+        UniqueConstraint("component_id", "vendor_name", name="uq_vendor_prices_component_vendor"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     component_id: int = Field(foreign_key="components.id", index=True)
@@ -34,7 +38,3 @@ class VendorPrice(SQLModel, table=True):
     
     # Relationship
     component: Optional["Component"] = Relationship(back_populates="prices")
-    
-    class Config:
-        # Ensure unique price per component per vendor
-        unique_together = [("component_id", "vendor_name")]
@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from sqlalchemy import Column, LargeBinary
+
+
+class RawPage(SQLModel, table=True):
+    """Compressed, content-addressed copy of a scraped product page."""
+
+    __tablename__ = "raw_pages"
+
+    sha256: str = Field(primary_key=True, max_length=64)  # hash of the uncompressed HTML
+    encoding: str = "gzip"
+    size_bytes: int  # uncompressed size
+    content: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class UrlRefreshStats(SQLModel, table=True):
+    """Running change statistics of one vendor product URL, used to plan refreshes."""
+
+    __tablename__ = "url_refresh_stats"
+
+    url: str = Field(primary_key=True)
+    vendor_name: str = Field(index=True)
+    observations: int = 0
+    price_changes: int = 0
+    stock_changes: int = 0
+    volatility: float = 0.0  # EWMA of the relative price move per observation
+    last_price: Optional[int] = None
+    last_in_stock: Optional[bool] = None
+    first_seen: datetime = Field(default_factory=datetime.utcnow)
+    last_checked: datetime = Field(default_factory=datetime.utcnow)
+    last_changed: Optional[datetime] = None
+
+
+class ComponentView(SQLModel, table=True):
+    """How often a component's detail page was requested."""
+
+    __tablename__ = "component_views"
+
+    component_id: int = Field(foreign_key="components.id", primary_key=True)
+    views: int = 0
+    last_viewed: datetime = Field(default_factory=datetime.utcnow)
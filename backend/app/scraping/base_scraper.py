@@ -1,27 +1,113 @@
 from abc import ABC, abstractmethod
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 from bs4 import BeautifulSoup
 import logging
 import random
 import asyncio
-from typing import Optional, Dict, List
-from .schemas import ScrapedProduct
+import hashlib
+import inspect
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional, Dict, Iterable, List, Set, Tuple
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from datetime import datetime
+from .schemas import ScrapedProduct, ListingItem
+from .fetchers import Fetcher, FetchProfile, FetchResult, HttpxFetcher, PlaywrightFetcher
+from .config import SCRAPER_CONFIG, FETCH_PROFILES
+from .monitor import ScraperMonitor, RequestMetrics
+from .scheduler import budget_for, is_timeout, parse_retry_after
 import json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared by every scraper in the process; created on first use
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+# Worker-process state: one parser instance per scraper class
+_worker_scrapers: Dict[type, "BaseScraper"] = {}
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def css(expr: str) -> CSSSelector:
+    """Compiles a CSS selector once; vendor modules build theirs at import time."""
+    return CSSSelector(expr, translator="html")
+
+
+def first(node, *selectors: CSSSelector):
+    """First match of the first selector that matches anything, else None.
+
+    Compare the result with ``is None``: lxml elements without children are falsy.
+    """
+    for selector in selectors:
+        matches = selector(node)
+        if matches:
+            return matches[0]
+    return None
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    global _parse_pool
+    workers = SCRAPER_CONFIG.get("parse_workers", 0)
+    if _parse_pool is None and workers > 0:
+        _parse_pool = ProcessPoolExecutor(max_workers=workers)
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+
+
+def _run_parser(scraper_cls: type, method: str, args: tuple) -> Any:
+    """Runs in a parse worker: only the extracted result is pickled back, never the soup."""
+    global _worker_loop
+    scraper = _worker_scrapers.get(scraper_cls)
+    if scraper is None:
+        scraper = scraper_cls(headless=True)
+        _worker_scrapers[scraper_cls] = scraper
+
+    result = getattr(scraper, method)(*args)
+    if inspect.iscoroutine(result):
+        if _worker_loop is None:
+            _worker_loop = asyncio.new_event_loop()
+        result = _worker_loop.run_until_complete(result)
+    return result
+
 class BaseScraper(ABC):
     """Advanced anti-detection base class for all vendor scrapers."""
 
-    def __init__(self, headless: bool = True):
+    # "httpx" fetches over plain HTTP/2 and falls back to the browser per URL;
+    # "browser" always renders with Playwright.
+    FETCH_BACKEND = "browser"
+
+    # FETCH_PROFILES entry for browser page loads; None uses SCRAPER_CONFIG["fetch_profile"].
+    # "dom" runs no scripts, so it cannot clear JS challenges: only for vendors that
+    # render server-side and are always fetched with the browser.
+    FETCH_PROFILE: Optional[str] = None
+
+    # Vendor sitemap (or sitemap index) for the listing-only refresh mode
+    SITEMAP_URL: Optional[str] = None
+
+    def __init__(self, headless: bool = True, fetch_backend: Optional[str] = None):
         self.headless = headless
-        self.browser = None
-        self.contexts = []
-        self.current_context_index = 0
+        self.fetch_backend = fetch_backend or self.FETCH_BACKEND
         self.request_count = 0
-        self.session_start = asyncio.get_event_loop().time() if asyncio.get_event_loop().is_running() else 0
+        self.fast_parser = SCRAPER_CONFIG.get("fast_parser", True)
+
+        # Conditional-fetch state: url -> {"etag", "last_modified", "content_hash"}
+        # Loaded from page_validators by the runner. Validators of pages fetched
+        # this run are staged until the runner commits what was parsed from them,
+        # so a page that failed to parse or save is never taken as unchanged.
+        self.page_validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self.validators_loaded = False
+        self._staged_validators: Dict[str, Dict[str, Optional[str]]] = {}
         
         # Anti-detection configurations
         self.user_agents = [
@@ -39,194 +125,307 @@ class BaseScraper(ABC):
             {"width": 1536, "height": 864},
             {"width": 1280, "height": 720}
         ]
-        
-    async def _initialize_browser_pool(self):
-        """Initialize browser with multiple contexts for session rotation"""
-        if not self.browser:
-            playwright = await async_playwright().start()
-            
-            # Advanced browser launch options
-            self.browser = await playwright.chromium.launch(
-                headless=self.headless,
-                args=[
-                    "--no-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                    "--no-first-run",
-                    "--disable-extensions",
-                    "--disable-default-apps",
-                    "--disable-background-timer-throttling",
-                    "--disable-backgrounding-occluded-windows",
-                    "--disable-renderer-backgrounding",
-                    "--disable-features=TranslateUI,BlinkGenPropertyTrees"
-                ]
-            )
-            
-            # Create multiple contexts with different configurations
-            for i in range(3):
-                context = await self._create_stealth_context()
-                self.contexts.append(context)
-    
-    async def _create_stealth_context(self) -> BrowserContext:
-        """Create a stealth browser context with randomized fingerprint"""
-        user_agent = random.choice(self.user_agents)
-        viewport = random.choice(self.viewport_sizes)
-        
-        # Advanced context options for better stealth
-        context = await self.browser.new_context(
-            user_agent=user_agent,
-            viewport=viewport,
-            locale="en-US",
-            timezone_id="America/New_York",
-            permissions=["geolocation"],
-            color_scheme="light",
-            reduced_motion="no-preference",
-            forced_colors="none",
-            extra_http_headers={
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
+
+        # Fetch backends: the browser is only launched when first used
+        profile_name = self.FETCH_PROFILE or SCRAPER_CONFIG.get("fetch_profile", "full")
+        self.fetch_profile = FetchProfile.from_config(profile_name, FETCH_PROFILES[profile_name])
+        self.browser_fetcher = PlaywrightFetcher(
+            self.headless,
+            self.user_agents,
+            self.viewport_sizes,
+            page_pool_size=SCRAPER_CONFIG.get("page_pool_size", 2),
+            profile=self.fetch_profile,
         )
-        
-        # Add stealth script to hide automation
-        await context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-            });
-            
-            window.chrome = {
-                runtime: {},
-                // etc.
-            };
-            
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5],
-            });
-            
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en'],
-            });
-            
-            const originalQuery = window.navigator.permissions.query;
-            return window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                    Promise.resolve({ state: Notification.permission }) :
-                    originalQuery(parameters)
-            );
-        """)
-        
-        return context
-    
-    async def _get_page(self) -> Page:
-        """Get a page from current context with session rotation"""
-        await self._initialize_browser_pool()
-        
-        # Rotate context every 10-15 requests to avoid fingerprinting
-        if self.request_count > 0 and self.request_count % random.randint(10, 15) == 0:
-            self.current_context_index = (self.current_context_index + 1) % len(self.contexts)
-            logger.info(f"Rotating to context {self.current_context_index}")
-        
-        context = self.contexts[self.current_context_index]
-        return await context.new_page()
+
+        # Optional ScraperMonitor the runner attaches to collect per-page metrics,
+        # labelled with the category the runner is currently working on
+        self.monitor: Optional[ScraperMonitor] = None
+        self.category = ""
+        self.http_fetcher: Optional[HttpxFetcher] = None
+        self._browser_urls: Set[str] = set()
+
+    def _fetcher_for(self, url: str) -> Fetcher:
+        """Plain HTTP unless this vendor or this URL needs a real browser."""
+        if self.fetch_backend != "httpx" or url in self._browser_urls:
+            return self.browser_fetcher
+        if self.http_fetcher is None:
+            self.http_fetcher = HttpxFetcher(user_agent=random.choice(self.user_agents))
+        return self.http_fetcher
     
-    async def _calculate_smart_delay(self, base_delay: float = 2.5) -> float:
-        """Calculate intelligent delay based on request patterns and timing - ENHANCED"""
-        # Much larger base random delay for safety
-        delay = random.uniform(base_delay * 1.2, base_delay * 2.5)
-        
-        # Add extra delay for burst protection - increased
-        if self.request_count % 4 == 0:  # Every 4 requests instead of 5
-            delay += random.uniform(4, 8)  # Doubled delay
-        
-        # Add extra delay for sustained scraping - much more aggressive
-        current_time = asyncio.get_event_loop().time()
-        session_duration = current_time - self.session_start
-        
-        if session_duration > 180:  # After just 3 minutes (was 5)
-            delay += random.uniform(3, 6)  # Increased delay
-        
-        if session_duration > 600:  # After 10 minutes
-            delay += random.uniform(5, 10)  # Even more delay
-        
-        # Add delay based on total request count
-        if self.request_count > 50:
-            delay += random.uniform(2, 4)
-        
-        return delay
+    def timed(self, phase: str):
+        """Times a with-block as ``phase`` of this vendor's current category, when a monitor is attached."""
+        if self.monitor is None:
+            return nullcontext()
+        return self.monitor.timed(self.VENDOR_NAME, self.category, phase)
+
+    def count(self, name: str, value: float = 1):
+        """Adds to a run counter of this vendor's current category, when a monitor is attached."""
+        if self.monitor is not None and value:
+            self.monitor.count(self.VENDOR_NAME, self.category, name, value)
+
+    def _record_request(self, url: str, phases: Dict[str, float], duration: float,
+                        result: Optional[FetchResult], success: bool, error: Optional[str] = None):
+        if self.monitor is None:
+            return
+        if error is None and not success:
+            error = f"HTTP {result.status}" if result and result.status else "No response"
+        self.monitor.record_request(RequestMetrics(
+            url=url,
+            vendor=self.VENDOR_NAME,
+            component_type=self.category,
+            timestamp=time.time(),
+            duration=duration,
+            success=success,
+            status_code=result.status if result else None,
+            error=error,
+            content_length=len(result.body) if result and result.body else None,
+            phases=phases,
+        ))
+
+    async def _budgeted_get(self, fetcher: Fetcher, url: str, phases: Dict[str, float], **kwargs) -> FetchResult:
+        """
+        One request through the host's adaptive budget, reporting latency,
+        overload statuses, challenge pages, Retry-After and timeouts back to
+        it. Adds the wait for the budget and the fetcher's timings to ``phases``.
+        """
+        budget = budget_for(url)
+        queued = time.perf_counter()
+        async with budget.slot() as ticket:
+            started = time.perf_counter()
+            phases["host_wait"] = phases.get("host_wait", 0.0) + started - queued
+            try:
+                result = await fetcher.get(url, **kwargs)
+            except Exception as e:
+                # Failed inside the fetcher, usually a navigation timeout
+                phases["navigation"] = phases.get("navigation", 0.0) + time.perf_counter() - started
+                budget.record(ticket, timed_out=is_timeout(e))
+                raise
+            for phase, seconds in result.timings.items():
+                phases[phase] = phases.get(phase, 0.0) + seconds
+            budget.record(
+                ticket,
+                latency=result.timings.get("navigation", time.perf_counter() - started),
+                status=result.status,
+                blocked=result.ok and result.looks_blocked(),
+                retry_after=parse_retry_after(result.headers.get("retry-after")),
+            )
+        return result
+
+    @staticmethod
+    def _fetch_seconds(phases: Dict[str, float]) -> float:
+        """Time the request itself took: everything but waiting and deliberate pauses."""
+        return sum(seconds for phase, seconds in phases.items() if phase not in ("delay", "host_wait"))
 
     async def fetch_page(self, url: str, retries: int = 2) -> Optional[str]:
-        """Enhanced page fetching with anti-detection measures"""
+        """HTML of a page, or None; see ``fetch_result``."""
+        result = await self.fetch_result(url, retries)
+        return result.text if result else None
+
+    async def fetch_result(self, url: str, retries: int = 2) -> Optional[FetchResult]:
+        """
+        Fetches a page through the host's adaptive budget, which does the
+        pacing: retries wait for it too, and back off as far as it decided.
+        Returns the 200 response, or None if every attempt failed or was blocked.
+        """
         for attempt in range(retries + 1):
+            fetcher = self._fetcher_for(url)
+            result = None
+            error = None
+            # Seconds per monitor phase for this attempt; see monitor.PHASES
+            phases: Dict[str, float] = {}
             try:
-                # Smart delay before request
-                if self.request_count > 0:
-                    delay = await self._calculate_smart_delay()
-                    await asyncio.sleep(delay)
-                
-                page = await self._get_page()
                 self.request_count += 1
-                
-                # Randomize navigation behavior
-                await page.set_extra_http_headers({
-                    "Referer": "https://www.google.com/" if random.random() < 0.3 else "",
-                    "Cache-Control": "no-cache" if random.random() < 0.1 else "max-age=0"
-                })
-                
                 logger.info(f"Fetching {url} (attempt {attempt + 1})")
-                
-                # Navigate with realistic options
-                response = await page.goto(
-                    url, 
-                    timeout=45000, 
-                    wait_until="domcontentloaded"
-                )
-                
-                if response and response.status == 200:
-                    # Simulate human behavior
-                    await asyncio.sleep(random.uniform(0.5, 2.0))
-                    
-                    # Random scroll simulation
-                    if random.random() < 0.3:
-                        await page.evaluate("window.scrollTo(0, Math.random() * 500)")
-                        await asyncio.sleep(random.uniform(0.2, 0.8))
-                    
-                    content = await page.content()
-                    await page.close()
-                    return content
-                else:
-                    logger.warning(f"HTTP {response.status if response else 'No response'} for {url}")
+                result = await self._budgeted_get(fetcher, url, phases)
+                if self.monitor and result.load_stats:
+                    self.monitor.record_page_load(self.VENDOR_NAME, url, result.load_stats)
+                if result.ok and not result.looks_blocked():
+                    return result
+                if result.ok:
+                    error = "Blocked: challenge page"
+                logger.warning(f"HTTP {result.status or 'No response'} for {url}")
                     
             except Exception as e:
+                error = str(e) or type(e).__name__
                 logger.error(f"Error fetching {url} (attempt {attempt + 1}): {e}")
-                if attempt < retries:
-                    # Exponential backoff for retries
-                    await asyncio.sleep(random.uniform(3, 8) * (attempt + 1))
+                if attempt < retries and fetcher is self.browser_fetcher:
                     continue
-            
+
             finally:
-                try:
-                    await page.close()
-                except:
-                    pass
+                # One record per attempt, whichever way it ended
+                success = error is None and result is not None and result.ok
+                self._record_request(url, phases, self._fetch_seconds(phases), result, success, error)
+
+            if result and result.status in (404, 410):
+                return None
+            if fetcher is not self.browser_fetcher:
+                # Refused or challenged over plain HTTP: render this URL from now on
+                logger.info(f"Falling back to browser for {url}")
+                self._browser_urls.add(url)
         
         return None
     
+    @staticmethod
+    def validators_for(result: FetchResult) -> Optional[Dict[str, Optional[str]]]:
+        """ETag, Last-Modified and the raw body hash of a 200 response."""
+        if not result.body:
+            return None
+        return {
+            "etag": result.headers.get("etag"),
+            "last_modified": result.headers.get("last-modified"),
+            "content_hash": hashlib.sha256(result.body).hexdigest(),
+        }
+
+    def stage_validators(self, url: str, result: Optional[FetchResult] = None) -> None:
+        """
+        Holds the validators of ``result`` (or, without one, the known ones)
+        until the runner saves them with the data parsed from the page.
+        """
+        entry = self.validators_for(result) if result is not None else self.page_validators.get(url)
+        if entry:
+            self._staged_validators[url] = entry
+
+    def take_validators(self, urls: Iterable[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """Removes and returns the staged validators of ``urls``."""
+        taken = {}
+        for url in urls:
+            entry = self._staged_validators.pop(url, None)
+            if entry:
+                taken[url] = entry
+        return taken
+
+    async def conditional_fetch(self, url: str) -> Tuple[bool, Optional[FetchResult]]:
+        """
+        Cheap conditional GET (no browser page) against the validators from the
+        last fetch. Returns ``(unchanged, result)``: unchanged on 304 or an
+        identical body hash, so the caller can skip parsing and the DB write
+        (the validators are then staged for the caller to save). A changed page
+        comes back as ``result`` when it is the same response a full fetch would
+        get, so it is parsed without a second request; browser-rendered URLs
+        still need a page load.
+        """
+        known = self.page_validators.get(url)
+        if not known:
+            return False, None
+
+        headers = {}
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+
+        fetcher = self._fetcher_for(url)
+        phases: Dict[str, float] = {}
+        try:
+            result = await self._budgeted_get(fetcher, url, phases, headers=headers, render=False)
+        except Exception as e:
+            logger.debug(f"Conditional GET failed for {url}: {e}")
+            if "navigation" in phases:
+                self._record_request(url, phases, self._fetch_seconds(phases), None, False, str(e) or type(e).__name__)
+            return False, None
+        self.request_count += 1
+        self._record_request(url, phases, self._fetch_seconds(phases), result, result.status in (200, 304))
+
+        if result.status == 304:
+            self.stage_validators(url)
+            return True, None
+        if result.status != 200:
+            return False, None
+        entry = self.validators_for(result)
+        if entry is not None and entry["content_hash"] == known.get("content_hash"):
+            self.stage_validators(url, result)
+            return True, None
+        if fetcher is self.browser_fetcher or not result.ok or result.looks_blocked():
+            return False, None
+        return False, result
+
     async def cleanup(self):
-        """Cleanup browser resources"""
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
-            self.contexts = []
+        """Cleanup browser and HTTP client resources"""
+        await self.browser_fetcher.close()
+        if self.http_fetcher:
+            await self.http_fetcher.close()
+            self.http_fetcher = None
+
+    async def parse_in_pool(self, method: str, *args) -> Any:
+        """
+        Calls a parsing method (``parse_product``, ``extract_product_urls``, ...)
+        in the shared process pool so large pages never block the event loop.
+        Falls back to parsing in-loop when the pool is disabled or broken.
+        """
+        with self.timed("parse"):
+            pool = get_parse_pool()
+            if pool is not None:
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(
+                        pool, _run_parser, type(self), method, args
+                    )
+                except BrokenProcessPool as e:
+                    logger.warning(f"Parse pool broken, parsing in-loop: {e}")
+                    shutdown_parse_pool()
+
+            result = getattr(self, method)(*args)
+            if inspect.iscoroutine(result):
+                result = await result
+            return result
 
     def parse_html(self, html: str) -> BeautifulSoup:
         """Parses HTML using BeautifulSoup."""
         return BeautifulSoup(html, "html.parser")
 
+    def parse_tree(self, html: str) -> lxml.html.HtmlElement:
+        """Parses HTML with lxml for the fast-parser mode."""
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # str input that still carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+        except etree.ParserError:
+            return lxml.html.document_fromstring("<html></html>")
+
+    def parse_category_page(self, html: str) -> Tuple[List[str], Optional[str]]:
+        """Product URLs and next-page URL of a category page. Vendors override this to parse once."""
+        return self.extract_product_urls(html), self.extract_next_page_url(html)
+
+    def parse_listing(self, html: str) -> Tuple[List[ListingItem], Optional[str]]:
+        """
+        Name, URL, price and stock of every product on a category page, plus the
+        next-page URL. Vendors without listing support return no items, which
+        sends the runner back to product pages.
+        """
+        return [], self.parse_category_page(html)[1]
+
+    def parse_sitemap(self, xml: str) -> Tuple[Dict[str, Optional[datetime]], List[str]]:
+        """Page URL -> lastmod from a sitemap, and the child sitemaps of a sitemap index."""
+        try:
+            root = etree.fromstring(xml.encode("utf-8"), parser=etree.XMLParser(recover=True))
+        except etree.XMLSyntaxError:
+            return {}, []
+        if root is None:
+            return {}, []
+
+        pages, children = {}, []
+        for entry in root:
+            if not isinstance(entry.tag, str):
+                continue
+            fields = {etree.QName(child).localname: (child.text or "").strip() for child in entry if isinstance(child.tag, str)}
+            loc = fields.get("loc")
+            if not loc:
+                continue
+            if etree.QName(entry).localname == "sitemap":
+                children.append(loc)
+                continue
+            lastmod = None
+            if fields.get("lastmod"):
+                try:
+                    lastmod = datetime.fromisoformat(fields["lastmod"].replace("Z", "+00:00"))
+                except ValueError:
+                    pass
+            if lastmod is not None and lastmod.tzinfo is not None:
+                # Stored timestamps are naive UTC
+                lastmod = datetime.utcfromtimestamp(lastmod.timestamp())
+            pages[loc] = lastmod
+        return pages, children
+
     @abstractmethod
     def parse_product(self, html: str, url: str) -> Optional[ScrapedProduct]:
         """Parses the product page HTML and returns a ScrapedProduct object."""
@@ -18,10 +18,35 @@ SCRAPER_CONFIG = {
     "category_delay_range": (10, 20),
     "error_backoff_multiplier": 2.0,
     
+    # Per-host politeness budgets: each vendor host runs on its own worker.
+    # Rate and concurrency adapt to how the host responds (AIMD, see
+    # scheduler.HostBudget) but never exceed these ceilings, whatever the
+    # other hosts are doing
+    "host_requests_per_minute": 12,
+    "host_max_concurrency": 2,
+    "host_min_requests_per_minute": 2,  # Floor the rate backs off to
+    "host_increase_rpm": 1.0,  # Added per round of healthy responses
+    "host_decrease_factor": 0.5,  # Applied to rate and concurrency on 429/503, challenges, timeouts
+    "host_slow_latency_factor": 2.0,  # No increase while latency exceeds this x the host's usual
+    "host_max_retry_after": 300,  # Longest Retry-After honoured, seconds
+    "host_overrides": {
+        # "www.startech.com.bd": {"host_requests_per_minute": 8},
+    },
+
+    # Listing-only refresh: prices and stock come from category pages, product
+    # pages are fetched only for new URLs or changed listing data
+    "listing_only": False,
+    "listing_max_pages": 3,
+    "use_sitemaps": False,  # Also refetch known URLs whose sitemap lastmod is newer than our last check
+    
     # Browser Settings
     "headless": True,
     "max_requests_per_session": 15,
     "context_rotation_frequency": (10, 15),
+    "page_pool_size": 2,  # Idle pages kept per context for reuse; 0 opens and closes a page per fetch
+    # Default FETCH_PROFILES entry for scrapers that don't set their own. Scripts must run:
+    # the browser is mostly the fallback for JS challenge pages plain HTTP can't get past
+    "fetch_profile": "media",
     
     # Error Handling
     "max_retries": 1,
@@ -30,6 +55,14 @@ SCRAPER_CONFIG = {
     
     # Memory Management
     "gc_frequency": 2,  # Run GC every 2 batches
+
+    # Prometheus export of each run's counters (needs prometheus_client); both off by default
+    "metrics_textfile_dir": None,  # node_exporter textfile collector dir: writes zenfa_scraper_<runner>.prom
+    "metrics_pushgateway": None,  # e.g. "localhost:9091"
+
+    # Parsing: worker processes for HTML parsing, 0 parses on the event loop
+    "parse_workers": 2,
+    "fast_parser": True,  # lxml with precompiled selectors; False uses BeautifulSoup
     
     # Detection Avoidance
     "human_behavior_simulation": True,
@@ -68,10 +101,47 @@ BROWSER_FINGERPRINTS = [
     }
 ]
 
+# Third-party trackers and ad networks vendor pages embed; never needed to parse a product
+ANALYTICS_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "mc.yandex.ru",
+    "bat.bing.com",
+    "analytics.tiktok.com",
+    "tawk.to",
+    "onesignal.com",
+]
+
+# Browser fetch profiles: which subresources a page load may fetch
+FETCH_PROFILES = {
+    # Everything, as a real visitor would load it
+    "full": {},
+    # Layout and scripts still run; images, fonts, video and trackers don't load
+    "media": {
+        "blocked_resource_types": ["image", "font", "media"],
+        "blocked_domains": ANALYTICS_DOMAINS,
+    },
+    # Only the HTML documents themselves; enough for server-rendered product pages.
+    # Opt-in per scraper (FETCH_PROFILE): no scripts means no JS challenge clears
+    "dom": {
+        "allowed_resource_types": ["document"],
+        "blocked_domains": ANALYTICS_DOMAINS,
+    },
+}
+
 # Mode-specific overrides
 MODE_CONFIGS = {
     "conservative": {
         "max_concurrent_requests": 2,
+        "host_requests_per_minute": 6,
+        "host_max_concurrency": 1,
         "max_pages_per_category": 3,
         "base_delay_range": (3.0, 8.0),
         "vendor_delay_range": (15, 25),
@@ -80,6 +150,8 @@ MODE_CONFIGS = {
     
     "balanced": {
         "max_concurrent_requests": 3,
+        "host_requests_per_minute": 12,
+        "host_max_concurrency": 2,
         "max_pages_per_category": 5,
         "base_delay_range": (1.5, 4.0),
         "vendor_delay_range": (8, 15),
@@ -88,6 +160,8 @@ MODE_CONFIGS = {
     
     "aggressive": {
         "max_concurrent_requests": 4,
+        "host_requests_per_minute": 20,
+        "host_max_concurrency": 3,
         "max_pages_per_category": 7,
         "base_delay_range": (1.0, 2.5),
         "vendor_delay_range": (5, 10),
@@ -104,4 +178,24 @@ def get_config(mode: str = None) -> dict:
     elif config.get("mode") in MODE_CONFIGS:
         config.update(MODE_CONFIGS[config["mode"]])
     
-    return config
\ No newline at end of file
+    return config
+
+# HostBudget argument -> config key; every key can be overridden per host
+HOST_BUDGET_KEYS = {
+    "requests_per_minute": "host_requests_per_minute",
+    "max_concurrency": "host_max_concurrency",
+    "min_requests_per_minute": "host_min_requests_per_minute",
+    "increase_rpm": "host_increase_rpm",
+    "decrease_factor": "host_decrease_factor",
+    "slow_latency_factor": "host_slow_latency_factor",
+    "max_retry_after": "host_max_retry_after",
+}
+
+def get_host_budget(host: str, mode: str = None) -> dict:
+    """HostBudget settings (rate and concurrency ceilings, AIMD tuning) for one vendor host"""
+    config = get_config(mode)
+    overrides = config.get("host_overrides", {}).get(host, {})
+    return {
+        argument: overrides.get(key, config[key])
+        for argument, key in HOST_BUDGET_KEYS.items()
+    }
@@ -0,0 +1,462 @@
+"""
+Pluggable page fetchers for the vendor scrapers.
+
+Scrapers only ever see HTML strings; which backend produced them is decided
+per vendor (``BaseScraper.FETCH_BACKEND``) and per URL (a URL that fails over
+plain HTTP is retried, and from then on fetched, with the browser).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from playwright.async_api import async_playwright, Page, BrowserContext, Response, Route
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "DNT": "1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# Bodies that come back 200 but are really an anti-bot interstitial
+CHALLENGE_MARKERS = ("cf-browser-verification", "challenge-platform", "<title>just a moment", "captcha")
+
+
+@dataclass(frozen=True)
+class FetchProfile:
+    """
+    Which subresources a browser page load may fetch. ``allowed_resource_types``,
+    when set, aborts every other type; ``blocked_resource_types`` aborts the
+    listed ones; requests to ``blocked_domains`` (or their subdomains) are
+    aborted whatever their type.
+    """
+    name: str
+    allowed_resource_types: Optional[FrozenSet[str]] = None
+    blocked_resource_types: FrozenSet[str] = frozenset()
+    blocked_domains: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_config(cls, name: str, settings: Dict) -> "FetchProfile":
+        allowed = settings.get("allowed_resource_types")
+        return cls(
+            name=name,
+            allowed_resource_types=frozenset(allowed) if allowed is not None else None,
+            blocked_resource_types=frozenset(settings.get("blocked_resource_types", ())),
+            blocked_domains=tuple(settings.get("blocked_domains", ())),
+        )
+
+    @property
+    def blocks_anything(self) -> bool:
+        return self.allowed_resource_types is not None or bool(self.blocked_resource_types or self.blocked_domains)
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if self.allowed_resource_types is not None and resource_type not in self.allowed_resource_types:
+            return True
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+
+# Loads everything, as a real visitor would
+FULL_PROFILE = FetchProfile("full")
+
+
+@dataclass
+class PageLoadStats:
+    """What one browser page load fetched and skipped, by resource type."""
+    profile: str
+    time_to_content: float  # Navigation start until the DOM was read, without the human-like pauses
+    loaded_counts: Dict[str, int] = field(default_factory=dict)
+    loaded_bytes: Dict[str, int] = field(default_factory=dict)
+    blocked_counts: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class FetchResult:
+    """Backend-neutral response: status, lower-cased headers, raw body and HTML text."""
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    text: Optional[str] = None
+    load_stats: Optional[PageLoadStats] = None  # Browser page loads only
+    # Seconds spent inside the fetcher by phase: "page", "navigation", "delay", "content"
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.text is not None
+
+    def looks_blocked(self) -> bool:
+        head = (self.text or "")[:5000].lower()
+        return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+class Fetcher(ABC):
+    """Fetches one URL. ``render`` asks for a full page load where the backend distinguishes it."""
+
+    @abstractmethod
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, render: bool = True) -> FetchResult:
+        """Raises on transport errors; returns a FetchResult for any HTTP status."""
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpxFetcher(Fetcher):
+    """Plain async HTTP/2 client with a pooled, keep-alive connection per host."""
+
+    def __init__(self, user_agent: str, max_connections: int = 4, timeout: float = 30.0):
+        self.client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"User-Agent": user_agent, **DEFAULT_HEADERS},
+        )
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, render: bool = True) -> FetchResult:
+        start = time.perf_counter()
+        response = await self.client.get(url, headers=headers)
+        return FetchResult(
+            url=str(response.url),
+            status=response.status_code,
+            headers={k.lower(): v for k, v in response.headers.items()},
+            body=response.content,
+            text=response.text if response.status_code == 200 else None,
+            timings={"navigation": time.perf_counter() - start},
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class PagePool:
+    """
+    Idle pages of one browser context, reused across fetches instead of opening
+    a tab per request. A returned page is reset to about:blank with its extra
+    headers and fetch-time event handlers cleared; pages beyond ``max_idle``,
+    and pages that fail to reset, are closed.
+    """
+
+    def __init__(self, context: BrowserContext, max_idle: int, profile: FetchProfile = FULL_PROFILE):
+        self.context = context
+        self.max_idle = max_idle
+        self.profile = profile
+        self._idle: List[Page] = []
+        self._handlers: Dict[Page, List[Tuple[str, Callable]]] = {}
+        # Requests aborted on each page since it was last acquired, by resource type
+        self.blocked: Dict[Page, Dict[str, int]] = {}
+        self.created = 0
+        self.reused = 0
+
+    async def acquire(self) -> Page:
+        while self._idle:
+            page = self._idle.pop()
+            if not page.is_closed():
+                self.reused += 1
+                self.blocked[page] = {}
+                return page
+        page = await self.context.new_page()
+        self.created += 1
+        self.blocked[page] = {}
+        if self.profile.blocks_anything:
+            # Installed once per page, so it survives reuse
+            await page.route("**/*", lambda route: self._route(page, route))
+        return page
+
+    async def _route(self, page: Page, route: Route):
+        request = route.request
+        if self.profile.blocks(request.resource_type, request.url):
+            counts = self.blocked.setdefault(page, {})
+            counts[request.resource_type] = counts.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def listen(self, page: Page, event: str, handler: Callable) -> None:
+        """Adds an event handler that is removed when the page goes back to the pool."""
+        page.on(event, handler)
+        self._handlers.setdefault(page, []).append((event, handler))
+
+    async def release(self, page: Page) -> None:
+        for event, handler in self._handlers.pop(page, []):
+            page.remove_listener(event, handler)
+        if page.is_closed():
+            self.blocked.pop(page, None)
+            return
+        if len(self._idle) >= self.max_idle:
+            self.blocked.pop(page, None)
+            await page.close()
+            return
+        try:
+            await page.goto("about:blank")
+            await page.set_extra_http_headers({})
+        except Exception as e:
+            logger.debug(f"Discarding page that failed to reset: {e}")
+            self.blocked.pop(page, None)
+            await page.close()
+            return
+        self._idle.append(page)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for page in idle:
+            if not page.is_closed():
+                await page.close()
+
+
+class PlaywrightFetcher(Fetcher):
+    """Headless Chromium with rotating stealth contexts, for pages plain HTTP cannot get."""
+
+    def __init__(
+        self,
+        headless: bool,
+        user_agents: List[str],
+        viewport_sizes: List[Dict[str, int]],
+        page_pool_size: int = 2,
+        profile: FetchProfile = FULL_PROFILE,
+    ):
+        self.headless = headless
+        self.user_agents = user_agents
+        self.viewport_sizes = viewport_sizes
+        self.page_pool_size = page_pool_size
+        self.profile = profile
+        self.playwright = None
+        self.browser = None
+        self.contexts: List[BrowserContext] = []
+        self.page_pools: List[PagePool] = []
+        self.current_context_index = 0
+        self.request_count = 0
+        # Concurrent first fetches would otherwise each launch a browser
+        self._launch_lock = asyncio.Lock()
+
+    async def _initialize_browser_pool(self):
+        """Initialize browser with multiple contexts for session rotation"""
+        if self.page_pools:
+            return
+        async with self._launch_lock:
+            if self.page_pools:
+                return
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+
+            # Advanced browser launch options; kept if creating the contexts below fails
+            if self.browser is None:
+                self.browser = await self.playwright.chromium.launch(
+                    headless=self.headless,
+                    args=[
+                        "--no-sandbox",
+                        "--disable-blink-features=AutomationControlled",
+                        "--disable-dev-shm-usage",
+                        "--disable-gpu",
+                        "--no-first-run",
+                        "--disable-extensions",
+                        "--disable-default-apps",
+                        "--disable-background-timer-throttling",
+                        "--disable-backgrounding-occluded-windows",
+                        "--disable-renderer-backgrounding",
+                        "--disable-features=TranslateUI,BlinkGenPropertyTrees"
+                    ]
+                )
+
+            # Create multiple contexts with different configurations; the pools
+            # are published last, so no caller sees a half-initialized browser
+            contexts, pools = [], []
+            for i in range(3):
+                context = await self._create_stealth_context()
+                contexts.append(context)
+                pools.append(PagePool(context, self.page_pool_size, self.profile))
+            self.contexts, self.page_pools = contexts, pools
+
+    async def _create_stealth_context(self) -> BrowserContext:
+        """Create a stealth browser context with randomized fingerprint"""
+        user_agent = random.choice(self.user_agents)
+        viewport = random.choice(self.viewport_sizes)
+
+        # Advanced context options for better stealth
+        context = await self.browser.new_context(
+            user_agent=user_agent,
+            viewport=viewport,
+            locale="en-US",
+            timezone_id="America/New_York",
+            permissions=["geolocation"],
+            color_scheme="light",
+            reduced_motion="no-preference",
+            forced_colors="none",
+            extra_http_headers={
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept-Encoding": "gzip, deflate, br",
+                "DNT": "1",
+                "Connection": "keep-alive",
+                "Upgrade-Insecure-Requests": "1",
+            }
+        )
+
+        # Add stealth script to hide automation
+        await context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined,
+            });
+
+            window.chrome = {
+                runtime: {},
+                // etc.
+            };
+
+            Object.defineProperty(navigator, 'plugins', {
+                get: () => [1, 2, 3, 4, 5],
+            });
+
+            Object.defineProperty(navigator, 'languages', {
+                get: () => ['en-US', 'en'],
+            });
+
+            const originalQuery = window.navigator.permissions.query;
+            return window.navigator.permissions.query = (parameters) => (
+                parameters.name === 'notifications' ?
+                    Promise.resolve({ state: Notification.permission }) :
+                    originalQuery(parameters)
+            );
+        """)
+
+        return context
+
+    def _current_context(self) -> BrowserContext:
+        # Rotate context every 10-15 requests to avoid fingerprinting
+        if self.request_count > 0 and self.request_count % random.randint(10, 15) == 0:
+            self.current_context_index = (self.current_context_index + 1) % len(self.contexts)
+            logger.info(f"Rotating to context {self.current_context_index}")
+        return self.contexts[self.current_context_index]
+
+    async def _get_page(self) -> Tuple[Page, PagePool]:
+        """Get a page from current context's pool with session rotation"""
+        await self._initialize_browser_pool()
+        self._current_context()
+        pool = self.page_pools[self.current_context_index]
+        return await pool.acquire(), pool
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, render: bool = True) -> FetchResult:
+        if not render:
+            # APIRequestContext: shares cookies/UA with the context but opens no page
+            start = time.perf_counter()
+            await self._initialize_browser_pool()
+            launched = time.perf_counter()
+            response = await self._current_context().request.get(url, headers=headers, timeout=20000)
+            self.request_count += 1
+            try:
+                body = await response.body()
+                return FetchResult(
+                    url=response.url,
+                    status=response.status,
+                    headers={k.lower(): v for k, v in response.headers.items()},
+                    body=body,
+                    text=body.decode("utf-8", errors="replace") if response.status == 200 else None,
+                    timings={"page": launched - start, "navigation": time.perf_counter() - launched},
+                )
+            finally:
+                await response.dispose()
+
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        page, pool = await self._get_page()
+        timings["page"] = time.perf_counter() - start
+        self.request_count += 1
+        loaded_counts: Dict[str, int] = {}
+        loaded_bytes: Dict[str, int] = {}
+
+        def on_response(response: Response):
+            # Transferred size from Content-Length: no extra round trip per resource
+            resource_type = response.request.resource_type
+            loaded_counts[resource_type] = loaded_counts.get(resource_type, 0) + 1
+            try:
+                size = int(response.headers.get("content-length") or 0)
+            except ValueError:
+                size = 0
+            loaded_bytes[resource_type] = loaded_bytes.get(resource_type, 0) + size
+
+        pool.listen(page, "response", on_response)
+        try:
+            # Randomize navigation behavior
+            await page.set_extra_http_headers({
+                "Referer": "https://www.google.com/" if random.random() < 0.3 else "",
+                "Cache-Control": "no-cache" if random.random() < 0.1 else "max-age=0",
+                **(headers or {}),
+            })
+
+            # Navigate with realistic options
+            navigation_start = time.perf_counter()
+            response = await page.goto(
+                url,
+                timeout=45000,
+                wait_until="domcontentloaded"
+            )
+            if not response:
+                timings["navigation"] = time.perf_counter() - navigation_start
+                return FetchResult(url=url, status=0, timings=timings)
+            if response.status != 200:
+                timings["navigation"] = time.perf_counter() - navigation_start
+                return FetchResult(url=url, status=response.status, headers=response.headers, timings=timings)
+
+            try:
+                body = await response.body()
+            except Exception as e:
+                logger.debug(f"Could not read response body for {url}: {e}")
+                body = b""
+            timings["navigation"] = time.perf_counter() - navigation_start
+
+            # Simulate human behavior
+            pause_start = time.perf_counter()
+            await asyncio.sleep(random.uniform(0.5, 2.0))
+
+            # Random scroll simulation
+            if random.random() < 0.3:
+                await page.evaluate("window.scrollTo(0, Math.random() * 500)")
+                await asyncio.sleep(random.uniform(0.2, 0.8))
+            timings["delay"] = time.perf_counter() - pause_start
+
+            content_start = time.perf_counter()
+            text = await page.content()
+            timings["content"] = time.perf_counter() - content_start
+
+            return FetchResult(
+                url=response.url,
+                status=response.status,
+                headers=response.headers,
+                body=body,
+                text=text,
+                load_stats=PageLoadStats(
+                    profile=self.profile.name,
+                    time_to_content=timings["navigation"] + timings["content"],
+                    loaded_counts=loaded_counts,
+                    loaded_bytes=loaded_bytes,
+                    blocked_counts=dict(pool.blocked.get(page, {})),
+                ),
+                timings=timings,
+            )
+        finally:
+            await pool.release(page)
+
+    async def close(self) -> None:
+        """Cleanup browser resources"""
+        if self.browser:
+            for pool in self.page_pools:
+                await pool.close()
+            await self.browser.close()
+            self.browser = None
+            self.contexts = []
+            self.page_pools = []
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
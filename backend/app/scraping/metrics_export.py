@@ -0,0 +1,172 @@
+"""
+Prometheus export of a scrape run's ScraperMonitor totals.
+
+The runners are batch jobs, not servers, so nothing is scraped from them:
+at the end of a run the totals are written for node_exporter's textfile
+collector (``metrics_textfile_dir``) and/or pushed to a Pushgateway
+(``metrics_pushgateway``). Needs ``prometheus_client``.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from .monitor import ScraperMonitor
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "zenfa_scraper"
+
+# Monitor counter -> (metric family, extra label, label value)
+COUNTER_FAMILIES = {
+    "pages_fetched": ("pages", "outcome", "fetched"),
+    "pages_failed": ("pages", "outcome", "failed"),
+    "pages_blocked": ("pages_blocked", None, None),
+    "bytes_fetched": ("response_bytes", None, None),
+    "products_cached_match": ("products", "match", "cached"),
+    "products_fuzzy_match": ("products", "match", "fuzzy"),
+    "products_new": ("products", "match", "new"),
+    "prices_inserted": ("price_upserts", "result", "inserted"),
+    "prices_updated": ("price_upserts", "result", "updated"),
+    "prices_unchanged": ("price_upserts", "result", "unchanged"),
+}
+
+DOCUMENTATION = {
+    "pages": "Page fetch attempts by outcome",
+    "pages_blocked": "Failed fetches that looked like blocking",
+    "response_bytes": "Response body bytes of fetched pages",
+    "products": "Saved products by how they were matched to a component",
+    "price_upserts": "Vendor price upserts by effect",
+}
+
+# Caches as (hit counters, miss counters) over the monitor counters
+CACHES = {
+    # Known URL with an unchanged title: no fuzzy matching
+    "url_match": (("products_cached_match",), ("products_fuzzy_match", "products_new")),
+    # 304 or identical body on the conditional GET: no full fetch
+    "conditional_fetch": (("conditional_hits",), ("conditional_misses",)),
+}
+
+
+class RunCollector:
+    """prometheus_client collector over one monitor's counters and phase timings."""
+
+    def __init__(self, monitor: ScraperMonitor, runner: str, started: float, finished: float):
+        self.monitor = monitor
+        self.runner = runner
+        self.started = started
+        self.finished = finished
+
+    def _totals(self, names: Iterable[str]) -> Dict[Tuple[str, str], float]:
+        totals: Dict[Tuple[str, str], float] = {}
+        for (vendor, category, name), value in self.monitor.counters.items():
+            if name in names:
+                totals[(vendor, category)] = totals.get((vendor, category), 0) + value
+        return totals
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        labels = ["runner", "vendor", "category"]
+        families = {}
+        for (vendor, category, name), value in sorted(self.monitor.counters.items()):
+            if name not in COUNTER_FAMILIES:
+                continue
+            family, label, label_value = COUNTER_FAMILIES[name]
+            if family not in families:
+                families[family] = CounterMetricFamily(
+                    f"{PREFIX}_{family}", DOCUMENTATION[family], labels=labels + ([label] if label else [])
+                )
+            families[family].add_metric(
+                [self.runner, vendor, category] + ([label_value] if label else []), value
+            )
+        yield from families.values()
+
+        phase_seconds = CounterMetricFamily(
+            f"{PREFIX}_phase_seconds", "Time spent per pipeline phase (delay, navigation, parse, db_write, ...)",
+            labels=labels + ["phase"],
+        )
+        phase_calls = CounterMetricFamily(
+            f"{PREFIX}_phase_calls", "Timed sections per pipeline phase", labels=labels + ["phase"],
+        )
+        for (vendor, category, phase), (count, total, _) in sorted(self.monitor.phase_totals.items()):
+            phase_seconds.add_metric([self.runner, vendor, category, phase], total)
+            phase_calls.add_metric([self.runner, vendor, category, phase], count)
+        yield phase_seconds
+        yield phase_calls
+
+        lookups = CounterMetricFamily(
+            f"{PREFIX}_cache_lookups", "Cache lookups by cache and result", labels=labels + ["cache", "result"],
+        )
+        hit_ratio = GaugeMetricFamily(f"{PREFIX}_cache_hit_ratio", "Cache hits / lookups", labels=labels + ["cache"])
+        for cache, (hit_names, miss_names) in CACHES.items():
+            hits, misses = self._totals(hit_names), self._totals(miss_names)
+            for vendor, category in sorted(set(hits) | set(misses)):
+                hit, miss = hits.get((vendor, category), 0), misses.get((vendor, category), 0)
+                lookups.add_metric([self.runner, vendor, category, cache, "hit"], hit)
+                lookups.add_metric([self.runner, vendor, category, cache, "miss"], miss)
+                if hit + miss:
+                    hit_ratio.add_metric([self.runner, vendor, category, cache], hit / (hit + miss))
+        yield lookups
+        yield hit_ratio
+
+        # Share of saved products that matched an existing component
+        match_ratio = GaugeMetricFamily(
+            f"{PREFIX}_match_ratio", "Saved products matched to an existing component / saved products", labels=labels,
+        )
+        matched = self._totals(("products_cached_match", "products_fuzzy_match"))
+        saved = self._totals(("products_cached_match", "products_fuzzy_match", "products_new"))
+        for (vendor, category), total in sorted(saved.items()):
+            if total:
+                match_ratio.add_metric([self.runner, vendor, category], matched.get((vendor, category), 0) / total)
+        yield match_ratio
+
+        last_run = GaugeMetricFamily(f"{PREFIX}_last_run_timestamp_seconds", "End of the last run", labels=["runner"])
+        last_run.add_metric([self.runner], self.finished)
+        yield last_run
+        duration = GaugeMetricFamily(f"{PREFIX}_run_duration_seconds", "Wall-clock time of the last run", labels=["runner"])
+        duration.add_metric([self.runner], self.finished - self.started)
+        yield duration
+
+
+def export_run_metrics(
+    monitor: ScraperMonitor,
+    runner: str,
+    started: float,
+    textfile_dir: Optional[str] = None,
+    pushgateway: Optional[str] = None,
+) -> bool:
+    """
+    Writes ``<textfile_dir>/zenfa_scraper_<runner>.prom`` and/or pushes to
+    ``pushgateway`` under job ``zenfa_scraper``, grouped by runner. Errors are
+    logged, never raised: metrics must not fail a finished run.
+    """
+    if not textfile_dir and not pushgateway:
+        return False
+    try:
+        from prometheus_client import CollectorRegistry, push_to_gateway, write_to_textfile
+    except ImportError:
+        logger.warning("Scraper metrics export is configured but prometheus_client is not installed")
+        return False
+
+    registry = CollectorRegistry()
+    registry.register(RunCollector(monitor, runner, started, time.time()))
+    exported = False
+    if textfile_dir:
+        path = os.path.join(textfile_dir, f"{PREFIX}_{runner}.prom")
+        try:
+            # Written to a temp file and renamed, so the collector never reads half a file
+            write_to_textfile(path, registry)
+            logger.info(f"📈 Scraper metrics written to {path}")
+            exported = True
+        except Exception as e:
+            logger.warning(f"Could not write scraper metrics to {path}: {e}")
+    if pushgateway:
+        try:
+            push_to_gateway(pushgateway, job=PREFIX, registry=registry, grouping_key={"runner": runner})
+            logger.info(f"📈 Scraper metrics pushed to {pushgateway}")
+            exported = True
+        except Exception as e:
+            logger.warning(f"Could not push scraper metrics to {pushgateway}: {e}")
+    return exported
@@ -0,0 +1,199 @@
+"""
+Buffered, day-rotated JSONL log of scraper metrics.
+
+Records are queued in memory by the caller (no I/O) and written by a
+background thread in batches, when ``max_records`` are pending or every
+``flush_interval`` seconds. Each UTC day goes to its own
+``<prefix>-YYYY-MM-DD.jsonl`` segment; with ``compress`` on, segments of
+past days are gzipped once the writer moves past them.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import is_dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _jsonable(value: Any) -> Any:
+    """json.dumps fallback: dataclass records by their fields, anything else as a string"""
+    if is_dataclass(value):
+        return vars(value)
+    return str(value)
+
+
+def segment_path(directory: Path, prefix: str, day: date) -> Path:
+    return directory / f"{prefix}-{day.isoformat()}.jsonl"
+
+
+def split_log_file(log_file: str) -> Tuple[Path, str]:
+    """``logs/scraper_metrics.jsonl`` -> (``logs``, ``scraper_metrics``)"""
+    path = Path(log_file)
+    return path.parent, path.name[:-len(".jsonl")] if path.name.endswith(".jsonl") else path.name
+
+
+class MetricsLogWriter:
+    """Batches metrics records and appends them to daily JSONL segments off the caller's thread."""
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str,
+        max_records: int = 500,
+        flush_interval: float = 5.0,
+        compress: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.compress = compress
+
+        self._pending: List[Tuple[date, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._file: Optional[IO[str]] = None
+        self._file_day: Optional[date] = None
+
+        self.written = 0
+        self.flushes = 0
+
+    def start(self) -> "MetricsLogWriter":
+        if self._thread is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="metrics-log-writer", daemon=True)
+            self._thread.start()
+            # A daemon thread dies with the interpreter; write what is still queued first
+            atexit.register(self.close)
+        return self
+
+    def write(self, record: Dict[str, Any], timestamp: Optional[float] = None) -> None:
+        """
+        Queues one record for the segment of its UTC day. Never touches the disk;
+        serialization also happens on the writer thread, so don't mutate ``record`` afterwards.
+        """
+        moment = datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else datetime.now(timezone.utc)
+        with self._lock:
+            self._pending.append((moment.date(), record))
+            full = len(self._pending) >= self.max_records
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        if self.compress:
+            self.compress_finished()
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            for day, record in pending:
+                if day != self._file_day:
+                    self._open_segment(day)
+                self._file.write(json.dumps(record, default=_jsonable) + "\n")
+            self._file.flush()
+            self.written += len(pending)
+            self.flushes += 1
+        except Exception as e:
+            logger.error(f"Failed to write {len(pending)} metrics records: {e}")
+
+    def _open_segment(self, day: date):
+        previous = self._file_day
+        if self._file:
+            self._file.close()
+        self._file = open(segment_path(self.directory, self.prefix, day), "a", encoding="utf-8")
+        self._file_day = day
+        if self.compress and previous is not None and previous < day:
+            self._compress(previous)
+
+    def _compress(self, day: date):
+        """Gzips a finished day's segment, appending to an existing archive of that day."""
+        source = segment_path(self.directory, self.prefix, day)
+        if not source.exists():
+            return
+        try:
+            with open(source, "rb") as plain, gzip.open(f"{source}.gz", "ab") as packed:
+                shutil.copyfileobj(plain, packed)
+            os.remove(source)
+        except Exception as e:
+            logger.error(f"Failed to compress {source}: {e}")
+
+    def compress_finished(self, today: Optional[date] = None) -> None:
+        """Gzips plain segments of days before ``today`` left by earlier runs."""
+        today = today or datetime.now(timezone.utc).date()
+        for path in self.directory.glob(f"{self.prefix}-*.jsonl"):
+            try:
+                day = date.fromisoformat(path.stem[len(self.prefix) + 1:])
+            except ValueError:
+                continue
+            if day < today and day != self._file_day:
+                self._compress(day)
+
+    def close(self) -> None:
+        """Writes everything queued and stops the thread. Safe to call more than once."""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        else:
+            self._flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def load_day(log_file: str, day: date) -> Dict[str, np.ndarray]:
+    """
+    One day of ScraperMonitor request records as columns: ``logged_at`` plus
+    every field of RequestMetrics. Reads the plain or gzipped segment (or
+    both, if the day was compressed and later appended to). Numeric and
+    boolean fields become typed arrays; missing values become NaN (numbers)
+    or None (everything else).
+    """
+    directory, prefix = split_log_file(log_file)
+    plain = segment_path(directory, prefix, day)
+    rows: List[Dict[str, Any]] = []
+    for path, opener in ((Path(f"{plain}.gz"), gzip.open), (plain, open)):
+        if not path.exists():
+            continue
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                rows.append({"logged_at": entry.get("timestamp"), **entry.get("metrics", {})})
+
+    columns: Dict[str, np.ndarray] = {}
+    keys = list(dict.fromkeys(key for row in rows for key in row))
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, bool) for v in present) and len(present) == len(values):
+            columns[key] = np.array(values, dtype=bool)
+        elif present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            columns[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            columns[key] = np.array(values, dtype=object)
+    return columns
@@ -0,0 +1,198 @@
+"""
+Fixed-size columnar store for per-request scraper metrics.
+
+Requests land in preallocated numpy columns indexed by a ring position, so
+recording one never allocates or copies. Each tracked time window keeps
+running totals and a latency histogram that are updated as requests enter
+and as they age out, so window aggregates cost O(histogram buckets) rather
+than a scan of the history.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+# Log-spaced latency buckets from 1 ms to 5 min: percentiles are reported as
+# the upper edge of their bucket, within ~15% of the exact value
+LATENCY_EDGES: List[float] = list(np.geomspace(0.001, 300.0, 96))
+
+SUCCESS = 1
+BLOCKED = 2
+
+
+class _Window:
+    """Running aggregates over the requests of the last ``seconds``."""
+
+    __slots__ = ("seconds", "tail", "count", "successes", "blocked", "duration_sum", "bytes_sum", "histogram")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.tail = 0  # Sequence number of the oldest request still counted
+        self.count = 0
+        self.successes = 0
+        self.blocked = 0
+        self.duration_sum = 0.0
+        self.bytes_sum = 0
+        self.histogram = [0] * (len(LATENCY_EDGES) + 1)
+
+
+class RequestRing:
+    """
+    The last ``capacity`` requests as columns (timestamp, duration, status,
+    bytes, flags, vendor, component), plus incremental aggregates for the
+    windows in ``windows_seconds``. Timestamps are expected to be recorded in
+    (roughly) increasing order.
+    """
+
+    def __init__(self, capacity: int = 8192, windows_seconds: Iterable[float] = (300, 600, 1800)):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.durations = np.zeros(capacity, dtype=np.float64)
+        self.status_codes = np.zeros(capacity, dtype=np.int16)
+        self.content_lengths = np.zeros(capacity, dtype=np.int64)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.latency_buckets = np.zeros(capacity, dtype=np.uint8)
+        self.vendor_codes = np.zeros(capacity, dtype=np.int16)
+        self.component_codes = np.zeros(capacity, dtype=np.int16)
+
+        # Strings are interned to small integer codes
+        self.vendors: List[str] = []
+        self.components: List[str] = []
+        self._codes: Dict[Tuple[int, str], int] = {}
+
+        self.windows = {seconds: _Window(seconds) for seconds in windows_seconds}
+        self.head = 0  # Sequence number of the next request
+
+    def __len__(self) -> int:
+        return min(self.head, self.capacity)
+
+    def _code(self, table: List[str], kind: int, value: str) -> int:
+        code = self._codes.get((kind, value))
+        if code is None:
+            code = len(table)
+            table.append(value)
+            self._codes[(kind, value)] = code
+        return code
+
+    def append(
+        self,
+        timestamp: float,
+        duration: float,
+        success: bool,
+        blocked: bool = False,
+        status_code: Optional[int] = None,
+        content_length: Optional[int] = None,
+        vendor: str = "",
+        component_type: str = "",
+    ) -> None:
+        seq = self.head
+        if seq >= self.capacity:
+            # The slot's previous request leaves the ring: drop it from every window first
+            for window in self.windows.values():
+                self._evict_through(window, seq - self.capacity)
+
+        i = seq % self.capacity
+        flags = (SUCCESS if success else 0) | (BLOCKED if blocked else 0)
+        bucket = bisect_left(LATENCY_EDGES, duration)
+        size = content_length or 0
+        self.timestamps[i] = timestamp
+        self.durations[i] = duration
+        self.status_codes[i] = status_code or 0
+        self.content_lengths[i] = size
+        self.flags[i] = flags
+        self.latency_buckets[i] = bucket
+        self.vendor_codes[i] = self._code(self.vendors, 0, vendor)
+        self.component_codes[i] = self._code(self.components, 1, component_type)
+        self.head = seq + 1
+
+        for window in self.windows.values():
+            window.count += 1
+            window.successes += success
+            window.blocked += blocked
+            window.duration_sum += duration
+            window.bytes_sum += size
+            window.histogram[bucket] += 1
+
+    def _evict(self, window: _Window, seq: int) -> None:
+        i = seq % self.capacity
+        flags = int(self.flags[i])
+        window.count -= 1
+        window.successes -= flags & SUCCESS
+        window.blocked -= (flags & BLOCKED) >> 1
+        window.duration_sum -= float(self.durations[i])
+        window.bytes_sum -= int(self.content_lengths[i])
+        window.histogram[self.latency_buckets[i]] -= 1
+
+    def _evict_through(self, window: _Window, last_seq: int) -> None:
+        while window.tail <= last_seq:
+            self._evict(window, window.tail)
+            window.tail += 1
+
+    def _advance(self, window: _Window, now: float) -> None:
+        cutoff = now - window.seconds
+        while window.tail < self.head and self.timestamps[window.tail % self.capacity] <= cutoff:
+            self._evict(window, window.tail)
+            window.tail += 1
+
+    def window_stats(self, seconds: float, now: float) -> Dict:
+        """Aggregates over the requests newer than ``now - seconds``."""
+        window = self.windows.get(seconds)
+        if window is None:
+            return self._scan(seconds, now)
+        self._advance(window, now)
+        return {
+            "requests": window.count,
+            "successful": window.successes,
+            "blocked": window.blocked,
+            "duration_sum": window.duration_sum,
+            "bytes": window.bytes_sum,
+            "p50": self._percentile(window.histogram, window.count, 0.50),
+            "p95": self._percentile(window.histogram, window.count, 0.95),
+        }
+
+    @staticmethod
+    def _percentile(histogram: List[int], count: int, q: float) -> float:
+        if count <= 0:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for bucket, n in enumerate(histogram):
+            seen += n
+            if seen >= rank:
+                return LATENCY_EDGES[min(bucket, len(LATENCY_EDGES) - 1)]
+        return LATENCY_EDGES[-1]
+
+    def _live(self) -> slice:
+        return slice(0, len(self))
+
+    def _scan(self, seconds: float, now: float) -> Dict:
+        """Vectorized fallback for windows that are not tracked incrementally."""
+        live = self._live()
+        mask = self.timestamps[live] > now - seconds
+        durations = self.durations[live][mask]
+        flags = self.flags[live][mask]
+        return {
+            "requests": int(mask.sum()),
+            "successful": int((flags & SUCCESS).sum()),
+            "blocked": int(((flags & BLOCKED) >> 1).sum()),
+            "duration_sum": float(durations.sum()),
+            "bytes": int(self.content_lengths[live][mask].sum()),
+            "p50": float(np.percentile(durations, 50)) if durations.size else 0.0,
+            "p95": float(np.percentile(durations, 95)) if durations.size else 0.0,
+        }
+
+    def counts_by(self, column: str) -> Dict[str, Dict[str, int]]:
+        """Total and successful requests in the ring per vendor or per component type."""
+        codes, names = {
+            "vendor": (self.vendor_codes, self.vendors),
+            "component_type": (self.component_codes, self.components),
+        }[column]
+        live = self._live()
+        codes = codes[live]
+        totals = np.bincount(codes, minlength=len(names))
+        successes = np.bincount(codes, weights=self.flags[live] & SUCCESS, minlength=len(names))
+        return {
+            name: {"total": int(totals[code]), "successful": int(successes[code])}
+            for code, name in enumerate(names)
+            if totals[code]
+        }
@@ -3,15 +3,39 @@ Monitoring and analytics for the scraper to detect blocking and performance issu
 """
 
 import time
-import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass, asdict
+from contextlib import contextmanager
 import asyncio
+from .fetchers import PageLoadStats
+from .metrics_store import RequestRing
+from .metrics_log import MetricsLogWriter, split_log_file
 
 logger = logging.getLogger(__name__)
 
+# Typical transfer size of a subresource by type, used to estimate what a blocked
+# request would have cost until loads of that type have actually been seen
+TYPICAL_RESOURCE_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 35_000,
+    "stylesheet": 25_000,
+    "script": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 10_000,
+}
+
+# Where a scrape spends its time, in pipeline order. "delay" is deliberate
+# sleeping (runner pauses, human-like pauses in the browser); "host_wait" is
+# queueing for a host's adaptive budget (its pacing and backoff); "page" is
+# getting a browser page (including the browser launch); "navigation" is the
+# network round trip.
+PHASES = ("delay", "host_wait", "page", "navigation", "content", "parse", "normalization", "db_write")
+
 @dataclass
 class RequestMetrics:
     """Individual request metrics"""
@@ -24,6 +48,20 @@ class RequestMetrics:
     status_code: Optional[int] = None
     error: Optional[str] = None
     content_length: Optional[int] = None
+    phases: Optional[Dict[str, float]] = None  # Seconds per PHASES entry spent on this request
+
+@dataclass
+class PageLoadMetrics:
+    """One browser page load under a fetch profile"""
+    url: str
+    vendor: str
+    profile: str
+    timestamp: float
+    time_to_content: float
+    bytes_loaded: int
+    requests_loaded: int
+    requests_blocked: int
+    bytes_saved: int  # Estimate: blocked requests x typical size of their type
 
 @dataclass
 class SessionMetrics:
@@ -51,10 +89,23 @@ class SessionMetrics:
 class ScraperMonitor:
     """Monitor scraper performance and detect blocking patterns"""
     
-    def __init__(self, log_file: str = "scraper_metrics.jsonl"):
+    def __init__(self, log_file: str = "scraper_metrics.jsonl", compress_logs: bool = False):
+        # Written as daily segments next to it: scraper_metrics-YYYY-MM-DD.jsonl[.gz]
         self.log_file = log_file
+        self.compress_logs = compress_logs
+        self._log_writer: Optional[MetricsLogWriter] = None
         self.session_metrics = SessionMetrics(session_start=time.time())
-        self.request_history: List[RequestMetrics] = []
+        # Columnar ring of recent requests with incremental 5/10/30-minute aggregates
+        self.requests = RequestRing(capacity=8192, windows_seconds=(300, 600, 1800))
+        # The most recent browser page loads; old ones fall off without copying the rest
+        self.page_loads: Deque[PageLoadMetrics] = deque(maxlen=1000)
+        self.blocked_by_type: Dict[str, int] = {}
+        # Observed (count, bytes) of loaded subresources by type, for the savings estimate
+        self._resource_sizes: Dict[str, List[int]] = {}
+        # (vendor, component_type, phase) -> [count, total seconds, max seconds]
+        self.phase_totals: Dict[Tuple[str, str, str], List[float]] = {}
+        # (vendor, component_type, name) -> running total, e.g. pages_fetched, prices_updated
+        self.counters: Dict[Tuple[str, str, str], float] = {}
         self.blocking_indicators = {
             # Common HTTP status codes that indicate blocking
             "blocked_status_codes": [403, 429, 503, 999],
@@ -70,10 +121,10 @@ class ScraperMonitor:
     
     def record_request(self, metrics: RequestMetrics):
         """Record metrics for a single request"""
-        self.request_history.append(metrics)
         self.session_metrics.total_requests += 1
         self.session_metrics.total_duration += metrics.duration
         
+        blocked = False
         if metrics.success:
             self.session_metrics.successful_requests += 1
         else:
@@ -81,16 +132,151 @@ class ScraperMonitor:
             
             # Check if this looks like blocking
             if self._is_likely_blocked(metrics):
+                blocked = True
                 self.session_metrics.blocked_requests += 1
                 logger.warning(f"Potential blocking detected: {metrics.url} - {metrics.error}")
+
+        # O(1): overwrites the oldest slot once the ring is full
+        self.requests.append(
+            metrics.timestamp,
+            metrics.duration,
+            metrics.success,
+            blocked,
+            metrics.status_code,
+            metrics.content_length,
+            metrics.vendor,
+            metrics.component_type,
+        )
+        
+        self.count(metrics.vendor, metrics.component_type, "pages_fetched" if metrics.success else "pages_failed")
+        if blocked:
+            self.count(metrics.vendor, metrics.component_type, "pages_blocked")
+        if metrics.content_length:
+            self.count(metrics.vendor, metrics.component_type, "bytes_fetched", metrics.content_length)
+
+        # Fetch-path phases count towards the vendor/category breakdown
+        if metrics.phases:
+            for phase, seconds in metrics.phases.items():
+                self.record_phase(metrics.vendor, metrics.component_type, phase, seconds)
         
         # Log to file
         self._log_to_file(metrics)
-        
-        # Cleanup old metrics (keep last 1000)
-        if len(self.request_history) > 1000:
-            self.request_history = self.request_history[-1000:]
     
+    def record_phase(self, vendor: str, component_type: str, phase: str, seconds: float):
+        """Add time spent in one pipeline phase for a vendor and category"""
+        totals = self.phase_totals.get((vendor, component_type, phase))
+        if totals is None:
+            totals = self.phase_totals[(vendor, component_type, phase)] = [0, 0.0, 0.0]
+        totals[0] += 1
+        totals[1] += seconds
+        if seconds > totals[2]:
+            totals[2] = seconds
+
+    def count(self, vendor: str, component_type: str, name: str, value: float = 1):
+        """Add to a run counter (pages, bytes, matches, upserts) of a vendor and category"""
+        key = (vendor, component_type, name)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timed(self, vendor: str, component_type: str, phase: str):
+        """Record the duration of the with-block as one ``phase`` entry, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(vendor, component_type, phase, time.perf_counter() - start)
+
+    def get_phase_summary(self) -> Dict:
+        """
+        Time per phase for each vendor and category, plus each phase's share of
+        the category's total. Concurrent requests overlap, so totals can exceed
+        wall-clock time; shares are still comparable.
+        """
+        summary: Dict[str, Dict[str, Dict]] = {}
+        for (vendor, component_type, phase), (count, total, longest) in self.phase_totals.items():
+            category = summary.setdefault(vendor, {}).setdefault(component_type or "unknown", {"total": 0.0, "phases": {}})
+            category["total"] += total
+            category["phases"][phase] = {"count": int(count), "total": total, "avg": total / count, "max": longest}
+
+        order = {phase: i for i, phase in enumerate(PHASES)}
+        for categories in summary.values():
+            for category in categories.values():
+                for stats in category["phases"].values():
+                    stats["share"] = stats["total"] / category["total"] if category["total"] else 0.0
+                category["phases"] = dict(sorted(category["phases"].items(), key=lambda item: order.get(item[0], len(order))))
+        return summary
+
+    def format_phase_summary(self) -> str:
+        """Phase breakdown as a plain-text table, one row per vendor and category"""
+        summary = self.get_phase_summary()
+        seen = {phase for categories in summary.values() for c in categories.values() for phase in c["phases"]}
+        phases = [p for p in PHASES if p in seen] + sorted(seen - set(PHASES))
+        lines = [f"{'vendor':<10} {'category':<12} {'total s':>8} " + " ".join(f"{p:>13}" for p in phases)]
+        for vendor, categories in sorted(summary.items()):
+            for component_type, category in sorted(categories.items()):
+                cells = []
+                for phase in phases:
+                    stats = category["phases"].get(phase)
+                    cells.append(f"{stats['total']:>7.1f} {stats['share']:>4.0%}" if stats else f"{'-':>13}")
+                lines.append(f"{vendor:<10} {component_type:<12} {category['total']:>8.1f} " + " ".join(f"{c:>13}" for c in cells))
+        return "\n".join(lines)
+
+    def record_page_load(self, vendor: str, url: str, stats: PageLoadStats) -> PageLoadMetrics:
+        """Record what a browser page load fetched, skipped and how long the DOM took"""
+        for resource_type, count in stats.loaded_counts.items():
+            size = stats.loaded_bytes.get(resource_type, 0)
+            if size:
+                observed = self._resource_sizes.setdefault(resource_type, [0, 0])
+                observed[0] += count
+                observed[1] += size
+
+        bytes_saved = 0
+        for resource_type, count in stats.blocked_counts.items():
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + count
+            bytes_saved += count * self.typical_resource_size(resource_type)
+
+        metrics = PageLoadMetrics(
+            url=url,
+            vendor=vendor,
+            profile=stats.profile,
+            timestamp=time.time(),
+            time_to_content=stats.time_to_content,
+            bytes_loaded=sum(stats.loaded_bytes.values()),
+            requests_loaded=sum(stats.loaded_counts.values()),
+            requests_blocked=sum(stats.blocked_counts.values()),
+            bytes_saved=bytes_saved,
+        )
+        self.page_loads.append(metrics)
+        return metrics
+
+    def typical_resource_size(self, resource_type: str) -> int:
+        """Mean observed size of a resource type, else the built-in typical size"""
+        observed = self._resource_sizes.get(resource_type)
+        if observed and observed[0]:
+            return observed[1] // observed[0]
+        return TYPICAL_RESOURCE_BYTES.get(resource_type, TYPICAL_RESOURCE_BYTES["other"])
+
+    def get_page_load_summary(self) -> Dict:
+        """Time-to-content and bytes loaded/saved per fetch profile"""
+        by_profile: Dict[str, List[PageLoadMetrics]] = {}
+        for load in self.page_loads:
+            by_profile.setdefault(load.profile, []).append(load)
+
+        summary = {}
+        for profile, loads in by_profile.items():
+            times = sorted(load.time_to_content for load in loads)
+            pages = len(loads)
+            summary[profile] = {
+                "pages": pages,
+                "time_to_content_p50": times[pages // 2],
+                "time_to_content_p95": times[min(pages - 1, int(pages * 0.95))],
+                "avg_bytes_loaded": sum(load.bytes_loaded for load in loads) / pages,
+                "avg_bytes_saved": sum(load.bytes_saved for load in loads) / pages,
+                "total_bytes_saved": sum(load.bytes_saved for load in loads),
+                "avg_requests_blocked": sum(load.requests_blocked for load in loads) / pages,
+            }
+        return {"profiles": summary, "blocked_by_type": dict(self.blocked_by_type)}
+
     def _is_likely_blocked(self, metrics: RequestMetrics) -> bool:
         """Determine if a request failure indicates blocking"""
         # Check status code
@@ -114,27 +300,27 @@ class ScraperMonitor:
     
     def get_recent_performance(self, minutes: int = 10) -> Dict:
         """Get performance metrics for recent time period"""
-        cutoff_time = time.time() - (minutes * 60)
-        recent_requests = [r for r in self.request_history if r.timestamp > cutoff_time]
-        
-        if not recent_requests:
-            return {"period": f"{minutes}m", "requests": 0}
-        
-        total = len(recent_requests)
-        successful = sum(1 for r in recent_requests if r.success)
-        failed = total - successful
-        blocked = sum(1 for r in recent_requests if not r.success and self._is_likely_blocked(r))
+        # 5, 10 and 30 minutes are maintained incrementally; other periods scan the ring
+        stats = self.requests.window_stats(minutes * 60, time.time())
+        total = stats["requests"]
         
-        avg_duration = sum(r.duration for r in recent_requests) / total
+        if not total:
+            return {
+                "period": f"{minutes}m", "requests": 0, "success_rate": 0.0, "failure_rate": 0.0,
+                "block_rate": 0.0, "requests_per_minute": 0.0,
+            }
         
         return {
             "period": f"{minutes}m",
             "requests": total,
-            "success_rate": successful / total,
-            "failure_rate": failed / total,
-            "block_rate": blocked / total,
-            "avg_response_time": avg_duration,
-            "requests_per_minute": total / minutes
+            "success_rate": stats["successful"] / total,
+            "failure_rate": (total - stats["successful"]) / total,
+            "block_rate": stats["blocked"] / total,
+            "avg_response_time": stats["duration_sum"] / total,
+            "p50_response_time": stats["p50"],
+            "p95_response_time": stats["p95"],
+            "requests_per_minute": total / minutes,
+            "bytes_per_minute": stats["bytes"] / minutes,
         }
     
     def detect_blocking_patterns(self) -> Dict[str, any]:
@@ -228,38 +414,33 @@ class ScraperMonitor:
         return list(set(recommendations))  # Remove duplicates
     
     def _log_to_file(self, metrics: RequestMetrics):
-        """Log metrics to file for analysis"""
+        """Queue metrics for the background log writer; no file I/O happens here"""
         try:
-            with open(self.log_file, "a") as f:
-                log_entry = {
-                    "timestamp": datetime.now().isoformat(),
-                    "metrics": asdict(metrics)
-                }
-                f.write(json.dumps(log_entry) + "\\n")
+            if self._log_writer is None:
+                directory, prefix = split_log_file(self.log_file)
+                self._log_writer = MetricsLogWriter(directory, prefix, compress=self.compress_logs).start()
+            # Serialized on the writer thread; RequestMetrics is never modified after recording
+            log_entry = {
+                "timestamp": datetime.now().isoformat(),
+                "metrics": metrics
+            }
+            self._log_writer.write(log_entry, metrics.timestamp)
         except Exception as e:
             logger.error(f"Failed to log metrics: {e}")
+
+    def close(self):
+        """Write out queued metrics records"""
+        if self._log_writer is not None:
+            self._log_writer.close()
+            self._log_writer = None
     
     def get_summary(self) -> Dict:
         """Get comprehensive session summary"""
         session_duration = time.time() - self.session_metrics.session_start
         
-        vendor_stats = {}
-        component_stats = {}
-        
-        for req in self.request_history:
-            # Vendor stats
-            if req.vendor not in vendor_stats:
-                vendor_stats[req.vendor] = {"total": 0, "successful": 0}
-            vendor_stats[req.vendor]["total"] += 1
-            if req.success:
-                vendor_stats[req.vendor]["successful"] += 1
-            
-            # Component stats
-            if req.component_type not in component_stats:
-                component_stats[req.component_type] = {"total": 0, "successful": 0}
-            component_stats[req.component_type]["total"] += 1
-            if req.success:
-                component_stats[req.component_type]["successful"] += 1
+        # Over the requests still in the ring
+        vendor_stats = self.requests.counts_by("vendor")
+        component_stats = self.requests.counts_by("component_type")
         
         return {
             "session_duration_minutes": session_duration / 60,
@@ -283,5 +464,7 @@ class ScraperMonitor:
                     "total_requests": stats["total"]
                 }
                 for comp, stats in component_stats.items()
-            }
+            },
+            "page_loads": self.get_page_load_summary(),
+            "phases": self.get_phase_summary()
         }
\ No newline at end of file
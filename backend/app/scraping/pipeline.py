@@ -0,0 +1,90 @@
+"""
+Streaming hand-off from fetch workers to the database writer.
+
+Workers ``put`` parsed products as soon as they have them; a single writer
+task drains the bounded queue and flushes every ``max_items`` items or
+``max_seconds`` seconds, whichever comes first. A full queue blocks the
+workers, so memory stays bounded by ``max_pending`` plus one flush.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class BatchWriter:
+    """Bounded asyncio.Queue consumer that writes in size- or time-triggered batches."""
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[int]],
+        max_items: int = 25,
+        max_seconds: float = 30.0,
+        max_pending: int = 50,
+    ):
+        self.flush = flush
+        self.max_items = max_items
+        self.max_seconds = max_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "BatchWriter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def put(self, item: Any) -> None:
+        """Blocks while the writer is behind (backpressure)."""
+        if self._task is None:
+            self.start()
+        await self.queue.put(item)
+
+    async def close(self) -> int:
+        """Flushes whatever is buffered, stops the writer and returns the total written."""
+        if self._task is None:
+            return self.written
+        await self.queue.put(_CLOSE)
+        await self._task
+        self._task = None
+        return self.written
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        buffer: List[Any] = []
+        deadline = loop.time() + self.max_seconds
+        getter: Optional[asyncio.Future] = None
+
+        while True:
+            # Keep one pending get() across timeouts so no item is ever dropped
+            if getter is None:
+                getter = asyncio.ensure_future(self.queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=max(0.0, deadline - loop.time()))
+
+            if getter in done:
+                item, getter = getter.result(), None
+                if item is _CLOSE:
+                    await self._flush(buffer)
+                    return
+                buffer.append(item)
+                self.received += 1
+
+            if len(buffer) >= self.max_items or loop.time() >= deadline:
+                await self._flush(buffer)
+                buffer = []
+                deadline = loop.time() + self.max_seconds
+
+    async def _flush(self, buffer: List[Any]):
+        if not buffer:
+            return
+        try:
+            self.written += await self.flush(buffer)
+            self.flushes += 1
+        except Exception as e:
+            # A failed flush must not kill the writer, or every worker blocks on put()
+            logger.error(f"Batch flush of {len(buffer)} items failed: {e}")
@@ -0,0 +1,222 @@
+"""
+Cross-vendor scheduling with adaptive per-host politeness budgets.
+
+Each vendor runs on its own worker so one host's delays never idle the
+other. Every request to a host goes through that host's HostBudget, an
+AIMD controller: the request rate and the number of requests in flight
+grow additively while the host answers quickly and cleanly, are cut
+multiplicatively on 429/503, challenge pages and timeouts, and never
+exceed the configured ceilings, however many workers share the host.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Dict, Optional
+from urllib.parse import urlparse
+from .config import get_host_budget
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" rather than "this page is broken"
+OVERLOAD_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_timeout(error: BaseException) -> bool:
+    """asyncio, httpx and Playwright timeouts all carry "Timeout" in their class name."""
+    return isinstance(error, asyncio.TimeoutError) or "timeout" in type(error).__name__.lower()
+
+
+class HostBudget:
+    """
+    Paces one host. Request starts are spaced at least 60/``rate`` seconds
+    apart (with jitter on top) and at most ``limit`` requests are in flight.
+
+    Every request reports its outcome with ``record``:
+
+    - healthy (200/304, latency within ``slow_latency_factor`` x the host's
+      usual latency): ``rate`` grows by ``increase_rpm`` and ``limit`` by one
+      per round of ``limit`` such responses, up to ``requests_per_minute``
+      and ``max_concurrency``;
+    - overloaded (429/503, challenge page, timeout): both are multiplied by
+      ``decrease_factor``, at most once per congestion event, down to
+      ``min_requests_per_minute`` and one request;
+    - Retry-After (capped at ``max_retry_after``) pauses every request start
+      to the host until it has passed;
+    - anything else (404s, network errors, slow responses) changes nothing.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        requests_per_minute: float,
+        max_concurrency: int,
+        min_requests_per_minute: float = 2.0,
+        increase_rpm: float = 1.0,
+        decrease_factor: float = 0.5,
+        slow_latency_factor: float = 2.0,
+        max_retry_after: float = 300.0,
+    ):
+        self.host = host
+        self.max_rate = requests_per_minute
+        self.min_rate = min(min_requests_per_minute, requests_per_minute)
+        self.max_concurrency = max_concurrency
+        self.increase_rpm = increase_rpm
+        self.decrease_factor = decrease_factor
+        self.slow_latency_factor = slow_latency_factor
+        self.max_retry_after = max_retry_after
+
+        # Start at half the ceiling, one request at a time, and probe upwards
+        self.rate = max(self.min_rate, requests_per_minute / 2)
+        self.limit = 1.0
+        self.latency_baseline: Optional[float] = None
+
+        self.in_flight = 0
+        self._available = asyncio.Condition()
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+        self._paused_until = 0.0
+        self._last_decrease = -math.inf
+
+        self.requests = 0
+        self.waited = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.peak_in_flight = 0
+
+    @property
+    def interval(self) -> float:
+        return 60.0 / self.rate
+
+    @asynccontextmanager
+    async def slot(self):
+        """Waits for a free slot and the next start time; yields the start time to pass to ``record``."""
+        async with self._available:
+            await self._available.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            async with self._lock:
+                loop = asyncio.get_running_loop()
+                # Re-checked after every sleep: a Retry-After may arrive meanwhile
+                while True:
+                    wait = max(self._next_start, self._paused_until) - loop.time()
+                    if wait <= 0:
+                        break
+                    self.waited += wait
+                    await asyncio.sleep(wait)
+                # Never faster than the current rate, and not on a metronome either
+                self._next_start = loop.time() + self.interval * random.uniform(1.0, 1.3)
+                self.requests += 1
+            yield loop.time()
+        finally:
+            async with self._available:
+                self.in_flight -= 1
+                self._available.notify_all()
+
+    def record(
+        self,
+        started: float,
+        latency: Optional[float] = None,
+        status: Optional[int] = None,
+        timed_out: bool = False,
+        blocked: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Feeds one request's outcome back into the rate and concurrency limit. Call inside ``slot``."""
+        now = asyncio.get_running_loop().time()
+        if retry_after is not None:
+            pause = min(retry_after, self.max_retry_after)
+            self._paused_until = max(self._paused_until, now + pause)
+            logger.warning(f"⏸️ {self.host} asked to retry after {retry_after:.0f}s, pausing {pause:.0f}s")
+
+        if timed_out or blocked or status in OVERLOAD_STATUSES or retry_after is not None:
+            # Requests started before the last cut report the same congestion: cut once
+            if started > self._last_decrease:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.limit = max(1.0, self.limit * self.decrease_factor)
+                self._last_decrease = now
+                self.decreases += 1
+                logger.warning(
+                    f"🐢 {self.host} overloaded ({'timeout' if timed_out else 'challenge' if blocked else status}): "
+                    f"{self.rate:.1f} req/min, {int(self.limit)} in flight"
+                )
+            return
+
+        if status not in (200, 304):
+            return
+        if latency is not None:
+            baseline = self.latency_baseline
+            self.latency_baseline = latency if baseline is None else 0.9 * baseline + 0.1 * latency
+            if baseline is not None and latency > baseline * self.slow_latency_factor:
+                return
+
+        # Additive increase: about +increase_rpm and +1 slot per round of `limit` healthy responses
+        rate = min(self.max_rate, self.rate + self.increase_rpm / self.limit)
+        limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        if (rate, limit) != (self.rate, self.limit):
+            self.increases += 1
+        self.rate, self.limit = rate, limit
+
+
+_budgets: Dict[str, HostBudget] = {}
+
+
+def budget_for(url: str) -> HostBudget:
+    """The shared budget of the URL's host, built from config on first use."""
+    host = urlparse(url).netloc
+    budget = _budgets.get(host)
+    if budget is None:
+        budget = HostBudget(host, **get_host_budget(host))
+        _budgets[host] = budget
+    return budget
+
+
+def reset_budgets():
+    """Drops all budgets, e.g. between event loops or after a config change."""
+    _budgets.clear()
+
+
+async def run_per_vendor(jobs: Dict[str, Awaitable[Any]]) -> Dict[str, Any]:
+    """
+    Runs one coroutine per vendor concurrently and returns their results by
+    vendor. A failing vendor is logged and yields its exception; the others
+    keep running.
+    """
+    start = time.monotonic()
+
+    async def timed(vendor: str, job: Awaitable[Any]):
+        vendor_start = time.monotonic()
+        try:
+            return await job
+        finally:
+            logger.info(f"🏁 {vendor} worker finished in {time.monotonic() - vendor_start:.0f}s")
+
+    names = list(jobs)
+    results = await asyncio.gather(*(timed(name, jobs[name]) for name in names), return_exceptions=True)
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logger.error(f"❌ {name} worker failed: {result}")
+    logger.info(f"🏁 All vendor workers finished in {time.monotonic() - start:.0f}s")
+    return dict(zip(names, results))
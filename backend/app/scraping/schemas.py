@@ -13,3 +13,11 @@ class ScrapedProduct(BaseModel):
     specs: Dict[str, Any] = {}  # Key-value pairs of specifications
     raw_data: Optional[Dict[str, Any]] = None  # Store raw HTML/JSON for debugging/re-parsing
     scraped_at: datetime = datetime.utcnow()
+
+class ListingItem(BaseModel):
+    """What a category listing shows about one product, without opening its page."""
+    name: str
+    url: str
+    price: int
+    status: str  # Same wording as ScrapedProduct.status
+
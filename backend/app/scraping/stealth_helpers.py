@@ -139,51 +139,6 @@ class StealthManager:
             
         return base_headers
 
-class RateLimiter:
-    """Intelligent rate limiting to avoid detection"""
-    
-    def __init__(self):
-        self.request_times = []
-        self.error_count = 0
-        self.last_error_time = 0
-        
-    def record_request(self, success: bool = True):
-        """Record request timing for adaptive rate limiting"""
-        current_time = asyncio.get_event_loop().time()
-        self.request_times.append(current_time)
-        
-        # Keep only recent requests (last 10 minutes)
-        cutoff_time = current_time - 600
-        self.request_times = [t for t in self.request_times if t > cutoff_time]
-        
-        if not success:
-            self.error_count += 1
-            self.last_error_time = current_time
-    
-    def calculate_delay(self, base_delay: float = 2.0) -> float:
-        """Calculate intelligent delay based on request history"""
-        current_time = asyncio.get_event_loop().time()
-        
-        # Base delay with randomization
-        delay = random.uniform(base_delay * 0.8, base_delay * 1.5)
-        
-        # Increase delay based on request frequency
-        recent_requests = len([t for t in self.request_times if current_time - t < 60])
-        if recent_requests > 10:
-            delay *= 1.5
-        elif recent_requests > 20:
-            delay *= 2.0
-        
-        # Increase delay if recent errors
-        if current_time - self.last_error_time < 300:  # Last 5 minutes
-            delay *= (1 + self.error_count * 0.5)
-        
-        # Reset error count if no errors for a while
-        if current_time - self.last_error_time > 600:
-            self.error_count = max(0, self.error_count - 1)
-        
-        return min(delay, 30.0)  # Cap at 30 seconds
-
 class SessionRotator:
     """Manages session rotation to avoid fingerprinting"""
     
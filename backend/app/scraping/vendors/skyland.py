@@ -1,45 +1,172 @@
 from bs4 import BeautifulSoup
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import re
+import json
 from urllib.parse import urljoin
-from ..base_scraper import BaseScraper
-from ..schemas import ScrapedProduct
+from lxml import etree
+from ..base_scraper import BaseScraper, css, first
+from ..schemas import ScrapedProduct, ListingItem
+
+# Skyland uses various selectors depending on page layout
+# Enhanced selectors for storage/case compatibility
+PRODUCT_LINK_SELECTORS = [
+    ".product-thumb .caption h4 a",      # Standard layout
+    ".product-thumb .name a",             # Alternative naming
+    ".product-layout .caption h4 a",     # Layout variation
+    ".product-item .product-name a",     # Item-based layout
+    ".product-grid .product-title a",    # Grid layout
+    "h4 a[href*='product']",             # Generic product links
+    ".caption .name a",                  # Caption-based
+    ".product-list .name a"               # List view
+]
+
+PRICE_SELECTORS = [
+    ".price-new",
+    ".product-price", 
+    ".our-price",
+    "#product-price",
+    ".current-price",
+    ".sale-price"
+]
+
+STOCK_SELECTORS = [
+    ".out-of-stock",
+    ".in-stock", 
+    ".stock",
+    ".product-stock",
+    ".availability",
+    ".stock-status"
+]
+
+_PRICE_IN_TEXT = re.compile(r'([\d,]+)৳')
+_PRICE_IN_PAGE = re.compile(r'([\d,]+)\s*৳')
+
+# Compiled once for the fast-parser mode
+_PRODUCT_LINKS = [css(selector) for selector in PRODUCT_LINK_SELECTORS]
+_NEXT_LINK = [css("ul.pagination .next_link"), css("ul.pagination .next")]
+_NEXT_LINK_TEXT = etree.XPath("//a[. = '>' or . = '&gt;']")
+_H1 = css("h1")
+_OG_TITLE = css("meta[property='og:title']")
+_TITLE = etree.XPath("//title")
+_LD_JSON = css("script[type='application/ld+json']")
+_META_PRICE = [css("meta[property='product:price:amount']"), css("meta[itemprop='price']")]
+_PRICES = [css(selector) for selector in PRICE_SELECTORS]
+_PRODUCT_BLOCK = [css("#content"), css(".product-info")]
+_PRODUCT_INFO = [css(".product-info"), css("#content")]
+_PRICE_LIST = css("ul.list-unstyled.price")
+_PRICE_ITEM = [css("li h2"), css("li")]
+_STOCK = [css(selector) for selector in STOCK_SELECTORS]
+_OG_IMAGE = css("meta[property='og:image']")
+_IMAGE = [css(".main-image img"), css(".product-image img")]
+_SPEC_TABLE = [css(".product-spec-table"), css(".attribute"), css("table.table-bordered")]
+_HEADINGS = css("h3, h4")
+_NEXT_TABLE = etree.XPath("following::table[1]")
+_ROWS = css("tr")
+_CELLS = css("td")
+
+# Category listing cards, for the listing-only refresh mode
+_LISTING_ITEM = [css(".product-layout"), css(".product-thumb"), css(".product-item")]
+_LISTING_PRICE = [css(".price-new"), css(".price-normal"), css(".price")]
+# Cards show these instead of (or next to) a price when the product can't be bought
+_LISTING_UNAVAILABLE = ("Out Of Stock", "Pre-Order", "Pre Order", "Up Coming", "Call For Price")
 
 class SkylandScraper(BaseScraper):
     """Scraper for Skyland Computer BD website."""
 
     VENDOR_NAME = "Skyland"
+    FETCH_BACKEND = "httpx"
+    SITEMAP_URL = "https://www.skyland.com.bd/sitemap.xml"
+
+    def _absolute_url(self, href: str) -> str:
+        # Handle both absolute and relative URLs
+        if href.startswith('http'):
+            return href
+        elif href.startswith('/'):
+            return f"https://www.skyland.com.bd{href}"
+        return f"https://www.skyland.com.bd/{href}"
+
+    def parse_category_page(self, html: str) -> Tuple[List[str], Optional[str]]:
+        """Product URLs and next-page URL from a single parse of a category page."""
+        if self.fast_parser:
+            root = self.parse_tree(html)
+            urls = []
+            for selector in _PRODUCT_LINKS:
+                for a_tag in selector(root):
+                    href = a_tag.get("href")
+                    if href:
+                        url = self._absolute_url(href)
+                        if url not in urls:
+                            urls.append(url)
+                # If we found links with one selector, likely we're good
+                if urls:
+                    break
+
+            next_link = first(root, *_NEXT_LINK)
+            if next_link is None:
+                next_links = _NEXT_LINK_TEXT(root)
+                next_link = next_links[0] if next_links else None
+            return urls, next_link.get("href") if next_link is not None else None
+
+        soup = self.parse_html(html)
+        return self._product_urls(soup), self._next_page_url(soup)
+
+    def parse_listing(self, html: str) -> Tuple[List[ListingItem], Optional[str]]:
+        """Name, URL, price and stock of each product card, plus the next-page URL."""
+        root = self.parse_tree(html)
+        cards = []
+        for selector in _LISTING_ITEM:
+            cards = selector(root)
+            if cards:
+                break
+
+        items, seen = [], set()
+        for card in cards:
+            link = first(card, *_PRODUCT_LINKS)
+            if link is None or not link.get("href"):
+                continue
+            url = self._absolute_url(link.get("href"))
+            if url in seen:
+                continue
+            seen.add(url)
+
+            price = 0
+            price_tag = first(card, *_LISTING_PRICE)
+            if price_tag is not None:
+                match = _PRICE_IN_PAGE.search(price_tag.text_content())
+                if match:
+                    price = int(match.group(1).replace(",", ""))
+
+            card_text = card.text_content().lower()
+            status = next((label for label in _LISTING_UNAVAILABLE if label.lower() in card_text), "In Stock")
+            if price == 0 and status == "In Stock":
+                status = "Unknown"
+
+            items.append(ListingItem(name=link.text_content().strip(), url=url, price=price, status=status))
+
+        next_link = first(root, *_NEXT_LINK)
+        if next_link is None:
+            next_links = _NEXT_LINK_TEXT(root)
+            next_link = next_links[0] if next_links else None
+        return items, next_link.get("href") if next_link is not None else None
 
     def extract_product_urls(self, html: str) -> list[str]:
         """Extracts product URLs from Skyland category page with enhanced selectors."""
-        soup = self.parse_html(html)
+        return self.parse_category_page(html)[0]
+
+    def extract_next_page_url(self, html: str) -> Optional[str]:
+        """Extracts the URL of the next page from Skyland category page."""
+        return self.parse_category_page(html)[1]
+
+    def _product_urls(self, soup: BeautifulSoup) -> list[str]:
         urls = []
-        
-        # Skyland uses various selectors depending on page layout
-        # Enhanced selectors for storage/case compatibility
-        selectors = [
-            ".product-thumb .caption h4 a",      # Standard layout
-            ".product-thumb .name a",             # Alternative naming
-            ".product-layout .caption h4 a",     # Layout variation
-            ".product-item .product-name a",     # Item-based layout
-            ".product-grid .product-title a",    # Grid layout
-            "h4 a[href*='product']",             # Generic product links
-            ".caption .name a",                  # Caption-based
-            ".product-list .name a"               # List view
-        ]
-        
-        for selector in selectors:
+        for selector in PRODUCT_LINK_SELECTORS:
             links = soup.select(selector)
             for a_tag in links:
                 href = a_tag.get("href")
-                if href and href not in urls:
-                    # Handle both absolute and relative URLs
-                    if href.startswith('http'):
-                        urls.append(href)
-                    elif href.startswith('/'):
-                        urls.append(f"https://www.skyland.com.bd{href}")
-                    else:
-                        urls.append(f"https://www.skyland.com.bd/{href}")
+                if href:
+                    url = self._absolute_url(href)
+                    if url not in urls:
+                        urls.append(url)
             
             # If we found links with one selector, likely we're good
             if urls:
@@ -47,9 +174,7 @@ class SkylandScraper(BaseScraper):
                     
         return urls
 
-    def extract_next_page_url(self, html: str) -> Optional[str]:
-        """Extracts the URL of the next page from Skyland category page."""
-        soup = self.parse_html(html)
+    def _next_page_url(self, soup: BeautifulSoup) -> Optional[str]:
         # Look for pagination "Next" link
         # Common in OpenCart specific themes: class="next" or text ">"
         next_link = soup.select_one("ul.pagination .next_link") or \
@@ -63,6 +188,9 @@ class SkylandScraper(BaseScraper):
 
     async def parse_product(self, html: str, url: str) -> Optional[ScrapedProduct]:
         """Parses a Skyland product page."""
+        if self.fast_parser:
+            return self._parse_product_fast(html, url)
+
         soup = self.parse_html(html)
 
         # 1. Product Name (Global)
@@ -112,16 +240,7 @@ class SkylandScraper(BaseScraper):
         
         if price == 0:
             # Priority 2: Direct price selectors (most reliable)
-            price_selectors = [
-                ".price-new",
-                ".product-price", 
-                ".our-price",
-                "#product-price",
-                ".current-price",
-                ".sale-price"
-            ]
-            
-            for selector in price_selectors:
+            for selector in PRICE_SELECTORS:
                 price_tag = soup.select_one(selector)
                 if price_tag:
                     price_text = price_tag.text.strip()
@@ -159,16 +278,7 @@ class SkylandScraper(BaseScraper):
         status = "Unknown"
         
         # Priority 1: Check specific stock status elements
-        stock_selectors = [
-            ".out-of-stock",
-            ".in-stock", 
-            ".stock",
-            ".product-stock",
-            ".availability",
-            ".stock-status"
-        ]
-        
-        for selector in stock_selectors:
+        for selector in STOCK_SELECTORS:
             stock_tag = soup.select_one(selector)
             if stock_tag:
                 status_text = stock_tag.text.strip()
@@ -221,6 +331,132 @@ class SkylandScraper(BaseScraper):
             raw_data={"html": html} 
         )
 
+    def _parse_product_fast(self, html: str, url: str) -> Optional[ScrapedProduct]:
+        """lxml version of parse_product, same priorities and fallbacks."""
+        root = self.parse_tree(html)
+
+        name_tag = first(root, _H1)
+        if name_tag is not None:
+            name = name_tag.text_content().strip()
+        else:
+            og_title = first(root, _OG_TITLE)
+            titles = _TITLE(root)
+            if og_title is not None:
+                name = og_title.get("content")
+            elif titles:
+                name = titles[0].text_content().strip()
+                name = name.replace(" Price in BD", "").replace(" | Skyland", "")
+            else:
+                return None
+
+        price = 0
+        for script in _LD_JSON(root):
+            try:
+                data = json.loads(script.text or "")
+                if isinstance(data, dict) and "offers" in data:
+                    offers = data["offers"]
+                    if isinstance(offers, dict) and "price" in offers:
+                        price = int(float(offers["price"]))
+                        break
+                    elif isinstance(offers, list) and offers and "price" in offers[0]:
+                        price = int(float(offers[0]["price"]))
+                        break
+            except (json.JSONDecodeError, KeyError, ValueError, TypeError):
+                continue
+
+        if price == 0:
+            meta_price = first(root, *_META_PRICE)
+            if meta_price is not None and meta_price.get("content"):
+                try:
+                    price = int(float(meta_price.get("content")))
+                except (ValueError, TypeError):
+                    pass
+
+        if price == 0:
+            for selector in _PRICES:
+                price_tag = first(root, selector)
+                if price_tag is not None:
+                    price_match = _PRICE_IN_TEXT.search(price_tag.text_content().strip())
+                    if price_match:
+                        price = self.clean_price(price_match.group(1))
+                        if price > 0:
+                            break
+
+            if price == 0:
+                product_block = first(root, *_PRODUCT_BLOCK)
+                price_list = first(product_block if product_block is not None else root, _PRICE_LIST)
+                if price_list is not None:
+                    price_item = first(price_list, *_PRICE_ITEM)
+                    if price_item is not None:
+                        price = self.clean_price(price_item.text_content())
+
+            if price == 0:
+                for pattern in _PRICE_IN_PAGE.findall(html):
+                    potential_price = self.clean_price(pattern)
+                    if potential_price > 100:
+                        price = potential_price
+                        break
+
+        status = "Unknown"
+        for selector in _STOCK:
+            stock_tag = first(root, selector)
+            if stock_tag is not None:
+                status = stock_tag.text_content().strip().split('\n')[0].strip()
+                if len(status) > 20:
+                    status = status[:20].strip()
+                break
+
+        if status == "Unknown":
+            container = first(root, *_PRODUCT_INFO)
+            container_text = (container if container is not None else root).text_content().lower()
+            if "in stock" in container_text:
+                status = "In Stock"
+            elif "out of stock" in container_text:
+                status = "Out of Stock"
+            elif "upcoming" in container_text:
+                status = "Upcoming"
+            elif "pre-order" in container_text:
+                status = "Pre-Order"
+            elif "discontinued" in container_text:
+                status = "Discontinued"
+
+        image_url = None
+        og_image = first(root, _OG_IMAGE)
+        if og_image is not None and og_image.get("content"):
+            image_url = og_image.get("content")
+        else:
+            img_tag = first(root, *_IMAGE)
+            if img_tag is not None:
+                image_url = urljoin(url, img_tag.get("src"))
+
+        specs = {}
+        table = first(root, *_SPEC_TABLE)
+        if table is None:
+            for h in _HEADINGS(root):
+                if "Specification" in h.text_content():
+                    tables = _NEXT_TABLE(h)
+                    table = tables[0] if tables else None
+                    break
+        if table is not None:
+            for row in _ROWS(table):
+                cols = _CELLS(row)
+                if len(cols) >= 2:
+                    key = cols[0].text_content().strip()
+                    value = cols[1].text_content().strip()
+                    if key and value:
+                        specs[key] = value
+
+        return ScrapedProduct(
+            name=name,
+            vendor=self.VENDOR_NAME,
+            price=price,
+            url=url,
+            image_url=image_url,
+            status=status,
+            specs=specs,
+            raw_data={"html": html}
+        )
+
     def _extract_specs(self, soup: BeautifulSoup) -> Dict[str, str]:
         """Extracts specifications from the data table."""
         specs = {}
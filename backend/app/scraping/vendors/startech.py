@@ -1,44 +1,131 @@
 from bs4 import BeautifulSoup
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import re
-from ..base_scraper import BaseScraper
-from ..schemas import ScrapedProduct
+from lxml import etree
+from ..base_scraper import BaseScraper, css, first
+from ..schemas import ScrapedProduct, ListingItem
 
 from urllib.parse import urljoin
 
+# StarTech uses multiple selectors depending on page layout
+# Try multiple selectors for better compatibility with storage/case pages
+PRODUCT_LINK_SELECTORS = [
+    ".p-item .p-item-name a",          # Standard product listing
+    ".product-item .product-name a",    # Alternative layout
+    ".product-thumb .name a",           # Thumbnail view
+    ".item .product-title a",           # Grid view
+    "h4.name a",                        # Simple list view
+    ".product-layout .name a"           # Category page layout
+]
+
+# Compiled once for the fast-parser mode
+_PRODUCT_LINKS = [css(selector) for selector in PRODUCT_LINK_SELECTORS]
+_NEXT_LINK = etree.XPath("//a[. = 'NEXT']")
+_NAME = css("h1.product-name")
+_PRICE_NEW = [css("ins"), css(".price-new")]
+_META_PRICE = css("meta[property='product:price:amount']")
+_CASH_PRICE = css(".p-wrap.cash .p-item-price")
+_PRICE = css(".price-wrap .price")
+_STATUS = css(".product-status")
+_IMAGE = css(".product-images img")
+_SPEC_TABLE = [css("#specification table"), css(".data-table")]
+_ROWS = css("tr")
+_SPEC_NAME = css("td.name")
+_SPEC_VALUE = css("td.value")
+
+# Category listing cards, for the listing-only refresh mode
+_LISTING_ITEM = css(".p-item")
+_LISTING_LINK = css(".p-item-name a")
+_LISTING_PRICE = [css(".p-item-price .price-new"), css(".p-item-price span"), css(".p-item-price")]
+_LISTING_PRICE_TEXT = re.compile(r'([\d,]+)\s*৳')
+# Cards show these instead of (or next to) a price when the product can't be bought
+_LISTING_UNAVAILABLE = ("Out Of Stock", "Up Coming", "Pre Order", "Call for Price")
+
+
 class StarTechScraper(BaseScraper):
     """Scraper for StarTech website."""
 
     VENDOR_NAME = "StarTech"
+    FETCH_BACKEND = "httpx"
+    SITEMAP_URL = "https://www.startech.com.bd/sitemap.xml"
+
+    def _absolute_url(self, href: str) -> str:
+        # Handle both absolute and relative URLs
+        if href.startswith('http'):
+            return href
+        elif href.startswith('/'):
+            return f"https://www.startech.com.bd{href}"
+        return f"https://www.startech.com.bd/{href}"
+
+    def parse_category_page(self, html: str) -> Tuple[List[str], Optional[str]]:
+        """Product URLs and next-page URL from a single parse of a category page."""
+        if self.fast_parser:
+            root = self.parse_tree(html)
+            urls = []
+            for selector in _PRODUCT_LINKS:
+                for a_tag in selector(root):
+                    href = a_tag.get("href")
+                    if href:
+                        url = self._absolute_url(href)
+                        if url not in urls:
+                            urls.append(url)
+                # If we found products with one selector, we're likely good
+                if urls:
+                    break
+            next_links = _NEXT_LINK(root)
+            return urls, next_links[0].get("href") if next_links else None
+
+        soup = self.parse_html(html)
+        return self._product_urls(soup), self._next_page_url(soup)
+
+    def parse_listing(self, html: str) -> Tuple[List[ListingItem], Optional[str]]:
+        """Name, URL, price and stock of each product card, plus the next-page URL."""
+        root = self.parse_tree(html)
+        items, seen = [], set()
+        for card in _LISTING_ITEM(root):
+            link = first(card, _LISTING_LINK)
+            if link is None or not link.get("href"):
+                continue
+            url = self._absolute_url(link.get("href"))
+            if url in seen:
+                continue
+            seen.add(url)
+
+            price = 0
+            price_tag = first(card, *_LISTING_PRICE)
+            if price_tag is not None:
+                match = _LISTING_PRICE_TEXT.search(price_tag.text_content())
+                if match:
+                    price = int(match.group(1).replace(",", ""))
+
+            card_text = card.text_content().lower()
+            status = next((label for label in _LISTING_UNAVAILABLE if label.lower() in card_text), "In Stock")
+            if price == 0 and status == "In Stock":
+                status = "Unknown"
+
+            items.append(ListingItem(name=link.text_content().strip(), url=url, price=price, status=status))
+
+        next_links = _NEXT_LINK(root)
+        return items, next_links[0].get("href") if next_links else None
 
     def extract_product_urls(self, html: str) -> list[str]:
         """Extracts product URLs from StarTech category page."""
-        soup = self.parse_html(html)
+        return self.parse_category_page(html)[0]
+
+    def extract_next_page_url(self, html: str) -> Optional[str]:
+        """Extracts the URL of the next page from StarTech category page."""
+        return self.parse_category_page(html)[1]
+
+    def _product_urls(self, soup: BeautifulSoup) -> list[str]:
         urls = []
-        
-        # StarTech uses multiple selectors depending on page layout
-        # Try multiple selectors for better compatibility with storage/case pages
-        selectors = [
-            ".p-item .p-item-name a",          # Standard product listing
-            ".product-item .product-name a",    # Alternative layout
-            ".product-thumb .name a",           # Thumbnail view
-            ".item .product-title a",           # Grid view
-            "h4.name a",                        # Simple list view
-            ".product-layout .name a"           # Category page layout
-        ]
-        
-        for selector in selectors:
+        for selector in PRODUCT_LINK_SELECTORS:
             links = soup.select(selector)
             for a_tag in links:
                 href = a_tag.get("href")
-                if href and href not in urls:
-                    # Handle both absolute and relative URLs
-                    if href.startswith('http'):
-                        urls.append(href)
-                    elif href.startswith('/'):
-                        urls.append(f"https://www.startech.com.bd{href}")
-                    else:
-                        urls.append(f"https://www.startech.com.bd/{href}")
+                if href:
+                    url = self._absolute_url(href)
+                    if url not in urls:
+                        urls.append(url)
             
             # If we found products with one selector, we're likely good
             if urls:
@@ -46,9 +133,7 @@ class StarTechScraper(BaseScraper):
                 
         return urls
 
-    def extract_next_page_url(self, html: str) -> Optional[str]:
-        """Extracts the URL of the next page from StarTech category page."""
-        soup = self.parse_html(html)
+    def _next_page_url(self, soup: BeautifulSoup) -> Optional[str]:
         # Look for pagination "NEXT" link
         next_link = soup.find("a", string="NEXT")
         if next_link:
@@ -57,6 +142,9 @@ class StarTechScraper(BaseScraper):
 
     async def parse_product(self, html: str, url: str) -> Optional[ScrapedProduct]:
         """Parses a StarTech product page."""
+        if self.fast_parser:
+            return self._parse_product_fast(html, url)
+
         soup = self.parse_html(html)
 
         # 1. Product Name
@@ -122,6 +210,61 @@ class StarTechScraper(BaseScraper):
             raw_data={"html": html} 
         )
 
+    def _parse_product_fast(self, html: str, url: str) -> Optional[ScrapedProduct]:
+        """lxml version of parse_product, same priorities and fallbacks."""
+        root = self.parse_tree(html)
+
+        name_tag = first(root, _NAME)
+        if name_tag is None:
+            return None
+        name = name_tag.text_content().strip()
+
+        price = 0
+        price_new = first(root, *_PRICE_NEW)
+        if price_new is not None:
+            price = self.clean_price(price_new.text_content())
+
+        if price == 0:
+            meta_price = first(root, _META_PRICE)
+            if meta_price is not None and meta_price.get("content"):
+                try:
+                    price = int(float(meta_price.get("content")))
+                except (ValueError, TypeError):
+                    pass
+
+        if price == 0:
+            price_tag = first(root, _CASH_PRICE)
+            if price_tag is None:
+                price_tag = first(root, _PRICE)
+            if price_tag is not None:
+                price = self.clean_price(price_tag.text_content())
+
+        status_tag = first(root, _STATUS)
+        status = status_tag.text_content().strip() if status_tag is not None else "Unknown"
+
+        img_tag = first(root, _IMAGE)
+        image_url = img_tag.get("src") if img_tag is not None else None
+
+        specs = {}
+        table = first(root, *_SPEC_TABLE)
+        if table is not None:
+            for row in _ROWS(table):
+                name_cell = first(row, _SPEC_NAME)
+                value_cell = first(row, _SPEC_VALUE)
+                if name_cell is not None and value_cell is not None:
+                    specs[name_cell.text_content().strip()] = value_cell.text_content().strip()
+
+        return ScrapedProduct(
+            name=name,
+            vendor=self.VENDOR_NAME,
+            price=price,
+            url=url,
+            image_url=image_url,
+            status=status,
+            specs=specs,
+            raw_data={"html": html}
+        )
+
     def _extract_specs(self, soup: BeautifulSoup) -> Dict[str, str]:
         """Extracts specifications from the data table."""
         specs = {}
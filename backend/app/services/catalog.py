@@ -0,0 +1,122 @@
+import re
+import logging
+from typing import List, Optional, Set, Dict, Any
+from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from ..models.component import Component
+from ..models.price import VendorPrice
+from ..models.enums import ComponentType
+from ..scraping.schemas import ScrapedProduct
+
+logger = logging.getLogger(__name__)
+
+_SLUG_INVALID = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(name: str) -> str:
+    return _SLUG_INVALID.sub("-", name.lower()).strip("-")
+
+
+def guess_brand(scraped: ScrapedProduct) -> str:
+    """Brand from the spec table when present, else the first word of the name."""
+    for key, value in scraped.specs.items():
+        if "brand" in key.lower():
+            return value
+    return scraped.name.split(" ")[0]
+
+
+class ComponentCreator:
+    """
+    Inserts new components and their first vendor price in bulk.
+
+    Slug collisions are resolved in memory against a slug set loaded once, so
+    a batch costs two INSERTs and no per-row SELECT/commit/refresh. Nothing
+    is committed here; the caller commits once per batch.
+    """
+
+    def __init__(self):
+        self._slugs: Optional[Set[str]] = None
+
+    def _reserve_slug(self, session: Session, name: str) -> str:
+        if self._slugs is None:
+            self._slugs = set(session.exec(select(Component.slug)).scalars().all())
+
+        base = slugify(name)
+        slug, suffix = base, 2
+        while slug in self._slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        self._slugs.add(slug)
+        return slug
+
+    def create_batch(
+        self,
+        session: Session,
+        vendor_name: str,
+        component_type: ComponentType,
+        products: List[ScrapedProduct],
+    ) -> List[Optional[int]]:
+        """
+        Creates one component plus VendorPrice per product.
+
+        Returns the new component id per product, or None for rows that failed.
+        A failing row only rolls back its own savepoint, not the batch.
+        """
+        if not products:
+            return []
+
+        now = datetime.utcnow()
+        component_rows = [
+            {
+                "name": p.name,
+                "slug": self._reserve_slug(session, p.name),
+                "image_url": p.image_url,
+                "component_type": component_type,
+                "brand": guess_brand(p),
+                "performance_score": 50,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for p in products
+        ]
+        price_rows = [
+            {
+                "vendor_name": vendor_name,
+                "price_bdt": p.price,
+                "url": p.url,
+                "in_stock": (p.status.lower() == "in stock"),
+                "raw_data": p.raw_data,
+                "last_updated": now,
+            }
+            for p in products
+        ]
+
+        try:
+            with session.begin_nested():
+                return self._insert(session, component_rows, price_rows)
+        except SQLAlchemyError as e:
+            logger.warning(f"Bulk component insert failed, retrying row by row: {e}")
+
+        ids: List[Optional[int]] = []
+        for component_row, price_row, product in zip(component_rows, price_rows, products):
+            try:
+                with session.begin_nested():
+                    ids.extend(self._insert(session, [component_row], [price_row]))
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to create component {product.name}: {e}")
+                ids.append(None)
+        return ids
+
+    def _insert(self, session: Session, component_rows: List[Dict[str, Any]], price_rows: List[Dict[str, Any]]) -> List[int]:
+        components = Component.__table__
+        ids = session.execute(
+            insert(components).returning(components.c.id, sort_by_parameter_order=True),
+            component_rows,
+        ).scalars().all()
+        session.execute(
+            insert(VendorPrice.__table__),
+            [{**row, "component_id": component_id} for row, component_id in zip(price_rows, ids)],
+        )
+        return list(ids)
@@ -0,0 +1,203 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from ..models.checkpoint import ScrapeRun, ScrapeCheckpoint
+from ..models.enums import ComponentType
+
+
+class CheckpointStore:
+    """
+    Per (vendor, category, page, url) progress of a scrape run, so a run that
+    died part-way resumes where it stopped instead of starting over.
+
+    A run is finished after one full pass, once every category was attempted.
+    Categories that failed are retried when an interrupted run is resumed, and
+    by the next run: a runner without a fixed plan puts them first. Runs left
+    unfinished for longer than ``resume_within`` are abandoned, not resumed.
+
+    Status changes are buffered by ``mark`` and written by ``flush`` inside the
+    caller's transaction, so a product only counts as done once its price
+    write has committed with it. Marks stay buffered until the caller reports
+    the commit with ``committed``; after a rollback the next flush writes them again.
+    """
+
+    def __init__(self, runner: str, resume_within: timedelta = timedelta(days=1)):
+        self.runner = runner
+        self.resume_within = resume_within
+        self.run_id: Optional[int] = None
+        self.resumed = False
+        # (vendor, category) -> "done" or "failed" in this run
+        self._categories: Dict[Tuple[str, str], str] = {}
+        self._marks: Dict[Tuple[str, str, str], Dict] = {}
+        self._flushed: Dict[Tuple[str, str, str], Dict] = {}
+
+    def open_run(
+        self,
+        session: Session,
+        plan: Optional[List[ComponentType]] = None,
+        fallback_plan: Optional[List[ComponentType]] = None,
+    ) -> List[ComponentType]:
+        """
+        Resumes the newest unfinished run of this runner (when ``plan`` is None
+        or matches it), otherwise starts a new run with ``plan``, or with
+        ``fallback_plan`` led by the categories that failed in the last
+        finished run. Returns the categories the run covers. Commits.
+        """
+        runs = ScrapeRun.__table__
+        checkpoints = ScrapeCheckpoint.__table__
+        now = datetime.utcnow()
+        # Stale runs stay unfinished only if something keeps failing before their pass ends
+        session.execute(
+            update(runs)
+            .where(
+                runs.c.runner == self.runner,
+                runs.c.finished_at.is_(None),
+                runs.c.started_at < now - self.resume_within,
+            )
+            .values(finished_at=now)
+        )
+        latest = session.execute(
+            select(runs.c.id, runs.c.plan)
+            .where(runs.c.runner == self.runner, runs.c.finished_at.is_(None))
+            .order_by(runs.c.id.desc())
+            .limit(1)
+        ).first()
+
+        wanted = [c.value for c in (plan or fallback_plan or [])]
+        if latest and (plan is None or latest.plan == wanted):
+            self.run_id, self.resumed = latest.id, True
+            self._categories = {
+                (row.vendor_name, row.category): row.status
+                for row in session.execute(
+                    select(checkpoints.c.vendor_name, checkpoints.c.category, checkpoints.c.status).where(
+                        checkpoints.c.run_id == self.run_id,
+                        checkpoints.c.kind == "category",
+                        checkpoints.c.status.in_(("done", "failed")),
+                    )
+                )
+            }
+            session.commit()
+            return [ComponentType(value) for value in latest.plan]
+
+        if plan is None and wanted:
+            last_finished = (
+                select(runs.c.id)
+                .where(runs.c.runner == self.runner, runs.c.finished_at.is_not(None))
+                .order_by(runs.c.id.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+            failed = session.execute(
+                select(checkpoints.c.category).distinct().where(
+                    checkpoints.c.run_id == last_finished,
+                    checkpoints.c.kind == "category",
+                    checkpoints.c.status == "failed",
+                )
+            ).scalars().all()
+            # Same plan size, retries first
+            wanted = list(dict.fromkeys(sorted(failed) + wanted))[:len(wanted)]
+
+        self.run_id = session.execute(
+            runs.insert().values(runner=self.runner, plan=wanted, started_at=now).returning(runs.c.id)
+        ).scalar_one()
+        self.resumed = False
+        self._categories = {}
+        session.commit()
+        return [ComponentType(value) for value in wanted]
+
+    def fork(self) -> "CheckpointStore":
+        """
+        A store on the same run with its own mark buffer, for a worker that
+        writes through its own session: one worker's flush or rollback never
+        takes another's pending marks with it.
+        """
+        store = CheckpointStore(self.runner)
+        store.run_id, store.resumed = self.run_id, self.resumed
+        store._categories = dict(self._categories)
+        return store
+
+    def finish_run(self, session: Session) -> None:
+        """
+        Closes the run and drops checkpoint rows of this runner's earlier runs;
+        this run's rows stay until the next run finishes, so it can retry what failed. Commits.
+        """
+        if self.run_id is None:
+            return
+        runs = ScrapeRun.__table__
+        session.execute(update(runs).where(runs.c.id == self.run_id).values(finished_at=datetime.utcnow()))
+        older = select(runs.c.id).where(runs.c.runner == self.runner, runs.c.id < self.run_id)
+        session.execute(delete(ScrapeCheckpoint.__table__).where(ScrapeCheckpoint.__table__.c.run_id.in_(older)))
+        session.commit()
+        self.run_id = None
+
+    def category_done(self, vendor_name: str, category: ComponentType) -> bool:
+        """Scraped successfully in this run; failed categories are tried again on resume."""
+        return self._categories.get((vendor_name, category.value)) == "done"
+
+    def category_attempted(self, vendor_name: str, category: ComponentType) -> bool:
+        """Done or failed in this run: once every category is, the run's pass is complete."""
+        return (vendor_name, category.value) in self._categories
+
+    def planned_products(self, session: Session, vendor_name: str, category: ComponentType) -> Dict[str, str]:
+        """Product URLs already chosen for this category in the current run: url -> status."""
+        checkpoints = ScrapeCheckpoint.__table__
+        rows = session.execute(
+            select(checkpoints.c.url, checkpoints.c.status).where(
+                checkpoints.c.run_id == self.run_id,
+                checkpoints.c.vendor_name == vendor_name,
+                checkpoints.c.category == category.value,
+                checkpoints.c.kind == "product",
+            )
+        )
+        return {row.url: row.status for row in rows}
+
+    def planned_by_kind(self, session: Session, kind: str) -> Dict[Tuple[str, ComponentType], Dict[str, str]]:
+        """URLs of one kind in the current run, grouped by (vendor, category): url -> status."""
+        checkpoints = ScrapeCheckpoint.__table__
+        rows = session.execute(
+            select(checkpoints.c.vendor_name, checkpoints.c.category, checkpoints.c.url, checkpoints.c.status)
+            .where(checkpoints.c.run_id == self.run_id, checkpoints.c.kind == kind)
+        )
+        grouped: Dict[Tuple[str, ComponentType], Dict[str, str]] = {}
+        for row in rows:
+            grouped.setdefault((row.vendor_name, ComponentType(row.category)), {})[row.url] = row.status
+        return grouped
+
+    def mark(self, vendor_name: str, category: ComponentType, url: str, status: str,
+             page: int = 0, kind: str = "product") -> None:
+        """Buffers a status change; written by the next ``flush``."""
+        if self.run_id is None:
+            return
+        self._marks[(vendor_name, category.value, url)] = {
+            "run_id": self.run_id,
+            "vendor_name": vendor_name,
+            "category": category.value,
+            "url": url,
+            "page": page,
+            "kind": kind,
+            "status": status,
+            "updated_at": datetime.utcnow(),
+        }
+        if kind == "category" and status in ("done", "failed"):
+            self._categories[(vendor_name, category.value)] = status
+
+    def flush(self, session: Session) -> None:
+        """Upserts buffered marks in one statement. Does not commit or clear the buffer."""
+        if not self._marks:
+            return
+        self._flushed = dict(self._marks)
+        stmt = insert(ScrapeCheckpoint.__table__).values(list(self._flushed.values()))
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["run_id", "vendor_name", "category", "url"],
+            set_={"status": stmt.excluded.status, "updated_at": stmt.excluded.updated_at},
+        ))
+
+    def committed(self) -> None:
+        """Drops the marks written by the last flush, now that their transaction committed."""
+        for key, mark in self._flushed.items():
+            # A mark replaced since the flush still has to be written
+            if self._marks.get(key) is mark:
+                del self._marks[key]
+        self._flushed = {}
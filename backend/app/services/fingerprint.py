@@ -0,0 +1,98 @@
+"""
+Structured attributes pulled from component names for match validation.
+
+Every pattern is compiled once at import. A fingerprint is computed once per
+name (DB-side fingerprints live in the CandidateIndex for the whole run), so
+validating a fuzzy match is a handful of tuple comparisons.
+"""
+
+import re
+from typing import NamedTuple, Optional, Tuple
+from ..models.enums import ComponentType
+
+_CPU_MODEL = re.compile(r"(\d{4,5}[a-z]*)")
+_GPU_MODEL = re.compile(r"(\d{4})")
+_RAM_CAPACITY = re.compile(r"(\d+)\s*gb")
+_CHIPSET = re.compile(r"\b([a-z]{1,2}\d{3,4})\b")
+_STORAGE_TB = re.compile(r"(\d+)\s*tb")
+_STORAGE_GB = re.compile(r"(\d+)\s*gb")
+_PSU_WATTAGE = re.compile(r"(\d+)\s*w\b")
+_COOLER_MODEL = re.compile(r"(\d{3,5})")
+
+_GPU_SUFFIXES = ("ti", "super", "xt", "xtx")
+_DDR_GENERATIONS = ("ddr4", "ddr5", "ddr3")
+_SSD_MARKERS = ("ssd", "nvme", "m.2")
+_HDD_MARKERS = ("hdd", "hard disk", "hard drive")
+
+# (substring flags that must agree, key patterns compared when both sides have them)
+_RULES = {
+    # Model number must match exactly (e.g. 5600G vs 5600X are different)
+    ComponentType.CPU: ((), (_CPU_MODEL,)),
+    # Ti/Super/XT suffix must agree, chip number must match (3060 vs 4060)
+    ComponentType.GPU: (_GPU_SUFFIXES, (_GPU_MODEL,)),
+    # DDR generation must agree, capacity must match (8GB vs 16GB)
+    ComponentType.RAM: (_DDR_GENERATIONS, (_RAM_CAPACITY,)),
+    # Chipset code must match (e.g. B450, H610, Z790, X570)
+    ComponentType.MOTHERBOARD: ((), (_CHIPSET,)),
+    # Capacity must match; TB is compared first, GB only if TB is missing
+    ComponentType.STORAGE: ((), (_STORAGE_TB, _STORAGE_GB)),
+    # Wattage must match (e.g. 550W vs 650W are different)
+    ComponentType.PSU: ((), (_PSU_WATTAGE,)),
+    # Model numbers if present must match
+    ComponentType.COOLER: ((), (_COOLER_MODEL,)),
+}
+
+
+def _first_group(pattern: re.Pattern, text: str) -> Optional[str]:
+    match = pattern.search(text)
+    return match.group(1) if match else None
+
+
+class ComponentFingerprint(NamedTuple):
+    """Per-type attributes that two names must agree on to be the same product."""
+
+    flags: Tuple[bool, ...] = ()
+    keys: Tuple[Optional[str], ...] = ()
+    is_ssd: bool = False
+    is_hdd: bool = False
+    # Storage compares only the first capacity unit both names carry
+    first_key_only: bool = False
+
+    @classmethod
+    def extract(cls, name: str, component_type: ComponentType) -> "ComponentFingerprint":
+        rule = _RULES.get(component_type)
+        if rule is None:
+            # Cases and everything else: the fuzzy score alone is enough
+            return cls()
+
+        text = name.lower()
+        markers, patterns = rule
+        flags = tuple(marker in text for marker in markers)
+        keys = tuple(_first_group(pattern, text) for pattern in patterns)
+
+        if component_type == ComponentType.STORAGE:
+            return cls(
+                flags=flags,
+                keys=keys,
+                is_ssd=any(marker in text for marker in _SSD_MARKERS),
+                is_hdd=any(marker in text for marker in _HDD_MARKERS),
+                first_key_only=True,
+            )
+        return cls(flags=flags, keys=keys)
+
+    def agrees_with(self, other: "ComponentFingerprint") -> bool:
+        if self.flags != other.flags:
+            return False
+
+        for mine, theirs in zip(self.keys, other.keys):
+            if mine is None or theirs is None:
+                continue
+            if mine != theirs:
+                return False
+            if self.first_key_only:
+                break
+
+        # SSD vs HDD must agree
+        if (self.is_ssd and other.is_hdd) or (self.is_hdd and other.is_ssd):
+            return False
+        return True
@@ -1,32 +1,245 @@
 import re
-from typing import Optional, List, Dict, Any
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple
+import numpy as np
+from rapidfuzz import fuzz as rfuzz, process as rprocess, utils as rutils
+from sqlalchemy import update
 from sqlmodel import Session, select
 from thefuzz import fuzz, process
 from ..models.component import Component
+from ..models.match import ProductMatch
 from ..models.cpu import CPU
 from ..models.gpu import GPU
 from ..models.ram import RAM
 from ..models.enums import ComponentType
 from ..scraping.schemas import ScrapedProduct
+from .fingerprint import ComponentFingerprint
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_MODEL_TOKEN = re.compile(r"\b[a-z]*\d+[a-z0-9]*\b")
+_DIGIT_CORE = re.compile(r"\d{3,}")
+
+
+def normalize_name(name: str) -> str:
+    """Lower-cases a product name and collapses punctuation to single spaces."""
+    return _NON_ALNUM.sub(" ", name.lower()).strip()
+
+
+def blocking_keys(normalized: str) -> frozenset:
+    """
+    Discriminating tokens used to block candidates before fuzzy scoring.
+
+    Model numbers, chipset codes and capacities ("5600x", "b650", "16gb") plus
+    their bare digit runs, so "rtx4060" and "rtx 4060" still share "4060".
+    """
+    keys = set()
+    for token in _MODEL_TOKEN.findall(normalized):
+        if len(token) >= 3:
+            keys.add(token)
+        keys.update(_DIGIT_CORE.findall(token))
+    return frozenset(keys)
+
+
+def name_hash(name: str) -> str:
+    """Stable fingerprint of a product title, insensitive to case and punctuation."""
+    return hashlib.sha1(normalize_name(name).encode("utf-8")).hexdigest()
+
+
+def brand_key(normalized: str) -> Optional[str]:
+    """First word of the name, which is the brand for nearly every listing."""
+    head, _, _ = normalized.partition(" ")
+    return head or None
+
+
+class CandidateIndex:
+    """
+    Compact in-memory view of one category's components.
+
+    Holds only what matching needs (id, name, normalized name, model tokens,
+    validation fingerprint) in parallel lists so a whole scrape run costs
+    one SELECT per category.
+    An inverted index from blocking keys to list positions lets matching
+    score a shortlist instead of the whole category.
+    """
+
+    # Upper bound on candidates handed to the fuzzy scorer per product
+    SHORTLIST_LIMIT = 200
+
+    def __init__(self, component_type: ComponentType):
+        self.component_type = component_type
+        self.ids: List[int] = []
+        self.names: List[str] = []
+        self.normalized: List[str] = []
+        self.model_tokens: List[frozenset] = []
+        self.fingerprints: List[ComponentFingerprint] = []
+        self._positions: Dict[int, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._brand_postings: Dict[str, List[int]] = {}
+
+    @classmethod
+    def load(cls, session: Session, component_type: ComponentType) -> "CandidateIndex":
+        index = cls(component_type)
+        rows = session.exec(
+            select(Component.id, Component.name).where(Component.component_type == component_type)
+        ).all()
+        for component_id, name in rows:
+            index.add(component_id, name)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, component_id: int, name: str) -> None:
+        """Adds a component, or refreshes its name if already indexed."""
+        normalized = normalize_name(name)
+        tokens = blocking_keys(normalized)
+        fingerprint = ComponentFingerprint.extract(name, self.component_type)
+        pos = self._positions.get(component_id)
+        if pos is not None:
+            self._unindex(pos)
+            self.names[pos] = name
+            self.normalized[pos] = normalized
+            self.model_tokens[pos] = tokens
+            self.fingerprints[pos] = fingerprint
+        else:
+            pos = len(self.ids)
+            self._positions[component_id] = pos
+            self.ids.append(component_id)
+            self.names.append(name)
+            self.normalized.append(normalized)
+            self.model_tokens.append(tokens)
+            self.fingerprints.append(fingerprint)
+
+        for token in tokens:
+            self._postings.setdefault(token, []).append(pos)
+        brand = brand_key(normalized)
+        if brand:
+            self._brand_postings.setdefault(brand, []).append(pos)
+
+    def _unindex(self, pos: int) -> None:
+        for token in self.model_tokens[pos]:
+            self._postings[token].remove(pos)
+        brand = brand_key(self.normalized[pos])
+        if brand:
+            self._brand_postings[brand].remove(pos)
+
+    def position(self, component_id: int) -> Optional[int]:
+        return self._positions.get(component_id)
+
+    def shortlist(self, name: str) -> List[int]:
+        """
+        Returns list positions worth fuzzy-scoring for ``name``.
+
+        Candidates sharing the rarest model tokens come first. Falls back to the
+        brand block, then to the whole category when nothing overlaps.
+        """
+        normalized = normalize_name(name)
+        overlap = Counter()
+        for token in blocking_keys(normalized):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            # Rare tokens ("5600x") outweigh common ones ("ddr4")
+            weight = 1.0 / len(postings)
+            for pos in postings:
+                overlap[pos] += weight
+        if overlap:
+            return [pos for pos, _ in overlap.most_common(self.SHORTLIST_LIMIT)]
+
+        brand = brand_key(normalized)
+        if brand and brand in self._brand_postings and self._brand_postings[brand]:
+            return self._brand_postings[brand]
+
+        return list(range(len(self.ids)))
+
 
 class NormalizationService:
     # Minimum fuzzy score to even consider a match (raised from 70 → 75)
     MATCH_THRESHOLD = 75
 
-    def _get_candidates(self, session: Session, component_type: ComponentType) -> List[Any]:
-        return session.exec(select(Component).where(Component.component_type == component_type)).all()
+    def __init__(self):
+        # One CandidateIndex per category, loaded lazily and kept for the whole run
+        self._indexes: Dict[ComponentType, CandidateIndex] = {}
+        # vendor -> {url: (component_id, name_hash)}, mirrors product_matches
+        self._url_matches: Dict[str, Dict[str, Tuple[int, str]]] = {}
+
+    def _get_candidates(self, session: Session, component_type: ComponentType) -> CandidateIndex:
+        index = self._indexes.get(component_type)
+        if index is None:
+            index = CandidateIndex.load(session, component_type)
+            self._indexes[component_type] = index
+        return index
+
+    def register_component(self, component_id: int, name: str, component_type: ComponentType) -> None:
+        """Keeps a loaded index in sync after a new component row is inserted."""
+        index = self._indexes.get(component_type)
+        if index is not None:
+            index.add(component_id, name)
+
+    def reset(self) -> None:
+        """Drops all cached indexes so the next lookup re-reads the DB."""
+        self._indexes.clear()
+        self._url_matches.clear()
+
+    def _get_url_matches(self, session: Session, vendor_name: str) -> Dict[str, Tuple[int, str]]:
+        matches = self._url_matches.get(vendor_name)
+        if matches is None:
+            rows = session.exec(
+                select(ProductMatch.vendor_url, ProductMatch.component_id, ProductMatch.name_hash)
+                .where(ProductMatch.vendor_name == vendor_name)
+            ).all()
+            matches = {url: (component_id, digest) for url, component_id, digest in rows}
+            self._url_matches[vendor_name] = matches
+        return matches
+
+    def cached_match(self, session: Session, vendor_name: str, scraped_data: ScrapedProduct) -> Optional[int]:
+        """
+        Returns the component a product URL was previously matched to, as long
+        as the product title is unchanged since then. Skips fuzzy matching.
+        """
+        cached = self._get_url_matches(session, vendor_name).get(scraped_data.url)
+        if cached and cached[1] == name_hash(scraped_data.name):
+            return cached[0]
+        return None
+
+    def remember_match(self, session: Session, vendor_name: str, scraped_data: ScrapedProduct, component_id: int) -> None:
+        """Records (or refreshes) the URL -> component link; committed with the caller's batch."""
+        matches = self._get_url_matches(session, vendor_name)
+        digest = name_hash(scraped_data.name)
+        if matches.get(scraped_data.url) == (component_id, digest):
+            return
+
+        if scraped_data.url in matches:
+            session.exec(
+                update(ProductMatch)
+                .where(ProductMatch.vendor_url == scraped_data.url)
+                .values(component_id=component_id, name_hash=digest, last_matched=datetime.utcnow())
+            )
+        else:
+            session.add(ProductMatch(
+                vendor_url=scraped_data.url,
+                vendor_name=vendor_name,
+                component_id=component_id,
+                name_hash=digest,
+            ))
+        matches[scraped_data.url] = (component_id, digest)
 
     def normalize_product(self, session: Session, scraped_data: ScrapedProduct, component_type: ComponentType) -> Optional[int]:
         """
         Attempts to match a scraped product to an existing DB component.
         Returns the Component ID if a confident match is found, else None.
         """
-        candidates = self._get_candidates(session, component_type)
-        if not candidates:
+        return self.match_against(self._get_candidates(session, component_type), scraped_data, component_type)
+
+    def match_against(self, candidates: CandidateIndex, scraped_data: ScrapedProduct, component_type: ComponentType) -> Optional[int]:
+        """Same as ``normalize_product`` but against any index, e.g. rows not yet in the DB."""
+        if not len(candidates):
             return None
 
-        # Fuzzy match the product name against all DB candidates
-        choices = {c.id: c.name for c in candidates}
+        # Fuzzy match the product name against the blocked shortlist only
+        choices = {candidates.ids[pos]: candidates.names[pos] for pos in candidates.shortlist(scraped_data.name)}
 
         result = process.extractOne(
             scraped_data.name,
@@ -39,136 +252,76 @@ class NormalizationService:
             return None
 
         _, score, best_match_id = result
+        return self._confirm_match(candidates, scraped_data, best_match_id, score, component_type)
 
-        if score < self.MATCH_THRESHOLD:
-            return None
+    def normalize_batch(
+        self,
+        session: Session,
+        products: List[ScrapedProduct],
+        component_type: ComponentType,
+        workers: int = -1,
+    ) -> List[Tuple[Optional[int], int]]:
+        """
+        Matches a whole scraped batch in one vectorized pass.
+
+        Every (product, shortlisted candidate) pair is flattened into a single
+        rapidfuzz ``cpdist`` call (same scorer and preprocessing as
+        ``normalize_product``), then each product takes the best score within
+        its own slice. Returns ``(component_id or None, best score)`` per product.
+        """
+        if not products:
+            return []
+
+        candidates = self._get_candidates(session, component_type)
+        if not len(candidates):
+            return [(None, 0)] * len(products)
 
-        component_obj = next((c for c in candidates if c.id == best_match_id), None)
-        if not component_obj:
+        shortlists = [candidates.shortlist(p.name) for p in products]
+        queries = [p.name for p, shortlist in zip(products, shortlists) for _ in shortlist]
+        choices = [candidates.names[pos] for shortlist in shortlists for pos in shortlist]
+
+        scores = rprocess.cpdist(
+            queries,
+            choices,
+            scorer=rfuzz.token_set_ratio,
+            processor=rutils.default_process,
+            workers=workers,
+        )
+
+        results = []
+        offset = 0
+        for product, shortlist in zip(products, shortlists):
+            row_scores = scores[offset:offset + len(shortlist)]
+            offset += len(shortlist)
+            best = int(np.argmax(row_scores))
+            best_id = candidates.ids[shortlist[best]]
+            score = int(round(float(row_scores[best])))
+            results.append((self._confirm_match(candidates, product, best_id, score, component_type), score))
+        return results
+
+    def _confirm_match(
+        self,
+        candidates: CandidateIndex,
+        scraped_data: ScrapedProduct,
+        best_match_id: int,
+        score: int,
+        component_type: ComponentType,
+    ) -> Optional[int]:
+        """Applies the score threshold and per-type validation to the best fuzzy hit."""
+        if score < self.MATCH_THRESHOLD:
             return None
 
         # Component-specific validation to prevent false positives
-        if not self._validate_match(scraped_data, component_obj, component_type):
+        scraped_fp = ComponentFingerprint.extract(scraped_data.name, component_type)
+        db_fp = candidates.fingerprints[candidates.position(best_match_id)]
+        if not self._validate_match(scraped_fp, db_fp):
             return None
 
-        return component_obj.id
+        return best_match_id
 
-    def _validate_match(self, scraped: ScrapedProduct, component_item: Component, component_type: ComponentType) -> bool:
+    def _validate_match(self, scraped: ComponentFingerprint, db_item: ComponentFingerprint) -> bool:
         """
         Returns True only if the match holds up against component-specific rules.
         Prevents false positives like matching a B450 to a Z790 motherboard.
         """
-        name_scraped = scraped.name.lower()
-        name_db = component_item.name.lower()
-
-        if component_type == ComponentType.CPU:
-            # Model number must match exactly (e.g. 5600G vs 5600X are different)
-            model_pattern = r"(\d{4,5}[a-z]*)"
-            scraped_model = re.search(model_pattern, name_scraped)
-            db_model = re.search(model_pattern, name_db)
-            if scraped_model and db_model:
-                if scraped_model.group(1) != db_model.group(1):
-                    return False
-            return True
-
-        elif component_type == ComponentType.GPU:
-            # Ti/Super/XT suffix must agree
-            for suffix in ["ti", "super", "xt", "xtx"]:
-                scraped_has = suffix in name_scraped
-                db_has = suffix in name_db
-                if scraped_has != db_has:
-                    return False
-
-            # Chipset model number must match (e.g. 3060 vs 4060 are different)
-            model_pattern = r"(\d{4})"
-            scraped_model = re.search(model_pattern, name_scraped)
-            db_model = re.search(model_pattern, name_db)
-            if scraped_model and db_model:
-                if scraped_model.group(1) != db_model.group(1):
-                    return False
-            return True
-
-        elif component_type == ComponentType.RAM:
-            # DDR generation must match
-            for gen in ["ddr4", "ddr5", "ddr3"]:
-                scraped_has = gen in name_scraped
-                db_has = gen in name_db
-                if scraped_has != db_has:
-                    return False
-
-            # Capacity must match (8GB vs 16GB are different)
-            cap_pattern = r"(\d+)\s*gb"
-            scraped_cap = re.search(cap_pattern, name_scraped)
-            db_cap = re.search(cap_pattern, name_db)
-            if scraped_cap and db_cap:
-                if scraped_cap.group(1) != db_cap.group(1):
-                    return False
-            return True
-
-        elif component_type == ComponentType.MOTHERBOARD:
-            # Chipset code must match (e.g. B450, H610, Z790, X570)
-            # These follow the pattern: letter(s) + 3-4 digits
-            chipset_pattern = r"\b([a-z]{1,2}\d{3,4})\b"
-            scraped_chipset = re.search(chipset_pattern, name_scraped)
-            db_chipset = re.search(chipset_pattern, name_db)
-            if scraped_chipset and db_chipset:
-                if scraped_chipset.group(1) != db_chipset.group(1):
-                    return False
-            return True
-
-        elif component_type == ComponentType.STORAGE:
-            # Capacity must match (500GB, 1TB, 2TB must agree)
-            tb_pattern = r"(\d+)\s*tb"
-            gb_pattern = r"(\d+)\s*gb"
-            scraped_tb = re.search(tb_pattern, name_scraped)
-            db_tb = re.search(tb_pattern, name_db)
-            scraped_gb = re.search(gb_pattern, name_scraped)
-            db_gb = re.search(gb_pattern, name_db)
-
-            # If one has TB and the other only GB, they're different (unless same amount)
-            if scraped_tb and db_tb:
-                if scraped_tb.group(1) != db_tb.group(1):
-                    return False
-            elif scraped_gb and db_gb:
-                if scraped_gb.group(1) != db_gb.group(1):
-                    return False
-
-            # SSD vs HDD must agree
-            scraped_is_ssd = "ssd" in name_scraped or "nvme" in name_scraped or "m.2" in name_scraped
-            db_is_ssd = "ssd" in name_db or "nvme" in name_db or "m.2" in name_db
-            scraped_is_hdd = "hdd" in name_scraped or "hard disk" in name_scraped or "hard drive" in name_scraped
-            db_is_hdd = "hdd" in name_db or "hard disk" in name_db or "hard drive" in name_db
-
-            if scraped_is_ssd and db_is_hdd:
-                return False
-            if scraped_is_hdd and db_is_ssd:
-                return False
-
-            return True
-
-        elif component_type == ComponentType.PSU:
-            # Wattage must match (e.g. 550W vs 650W are different)
-            watt_pattern = r"(\d+)\s*w\b"
-            scraped_w = re.search(watt_pattern, name_scraped)
-            db_w = re.search(watt_pattern, name_db)
-            if scraped_w and db_w:
-                if scraped_w.group(1) != db_w.group(1):
-                    return False
-            return True
-
-        elif component_type == ComponentType.COOLER:
-            # Model numbers if present must match
-            model_pattern = r"(\d{3,5})"
-            scraped_model = re.search(model_pattern, name_scraped)
-            db_model = re.search(model_pattern, name_db)
-            if scraped_model and db_model:
-                if scraped_model.group(1) != db_model.group(1):
-                    return False
-            return True
-
-        elif component_type == ComponentType.CASE:
-            # Cases rarely share names — fuzzy score alone is enough at 75+
-            return True
-
-        # Default: trust the fuzzy score
-        return True
+        return scraped.agrees_with(db_item)
@@ -0,0 +1,46 @@
+from typing import Dict, Optional
+from datetime import datetime
+from sqlalchemy import case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from ..models.page_validator import PageValidator
+
+
+class PageValidatorStore:
+    """Loads and persists per-URL ETag / Last-Modified / body hash for conditional fetches."""
+
+    def load(self, session: Session, vendor_name: str) -> Dict[str, Dict[str, Optional[str]]]:
+        table = PageValidator.__table__
+        rows = session.execute(
+            select(table.c.url, table.c.etag, table.c.last_modified, table.c.content_hash)
+            .where(table.c.vendor_name == vendor_name)
+        )
+        return {
+            row.url: {"etag": row.etag, "last_modified": row.last_modified, "content_hash": row.content_hash}
+            for row in rows
+        }
+
+    def save(self, session: Session, vendor_name: str, validators: Dict[str, Dict[str, Optional[str]]]) -> None:
+        """Upserts validators in one statement; changed_at only moves when the body hash changed. Does not commit."""
+        if not validators:
+            return
+
+        now = datetime.utcnow()
+        table = PageValidator.__table__
+        stmt = insert(table).values([
+            {"url": url, "vendor_name": vendor_name, "checked_at": now, "changed_at": now, **entry}
+            for url, entry in validators.items()
+        ])
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["url"],
+            set_={
+                "etag": stmt.excluded.etag,
+                "last_modified": stmt.excluded.last_modified,
+                "content_hash": stmt.excluded.content_hash,
+                "checked_at": stmt.excluded.checked_at,
+                "changed_at": case(
+                    (table.c.content_hash.is_distinct_from(stmt.excluded.content_hash), stmt.excluded.changed_at),
+                    else_=table.c.changed_at,
+                ),
+            },
+        ))
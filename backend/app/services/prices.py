@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+from datetime import datetime
+from sqlalchemy import and_, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from ..models.price import VendorPrice
+
+# Columns that decide whether an upsert actually changed a price row
+_TRACKED = ("price_bdt", "in_stock", "url")
+
+
+def upsert_vendor_prices(session: Session, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Writes a batch of vendor prices with one INSERT ... ON CONFLICT statement.
+
+    Each row is a dict of VendorPrice columns and must include ``component_id``
+    and ``vendor_name``. Rows for the same (component, vendor) collapse to the
+    last one, matching the old one-at-a-time behaviour. ``last_updated`` is
+    always bumped; a row counts as ``unchanged`` when price, stock and URL
+    equal what was stored. Does not commit.
+
+    Returns ``{"inserted": n, "updated": n, "unchanged": n}``.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+
+    # ON CONFLICT cannot touch the same target row twice in one statement
+    now = datetime.utcnow()
+    latest = {}
+    for row in rows:
+        latest[(row["component_id"], row["vendor_name"])] = {"last_updated": now, **row}
+    values = list(latest.values())
+
+    table = VendorPrice.__table__
+    keys = [table.c.component_id, table.c.vendor_name]
+
+    # Read in the same snapshot as the upsert, so it sees the pre-update values
+    previous = (
+        select(*keys, *(table.c[name] for name in _TRACKED))
+        .where(tuple_(*keys).in_([(v["component_id"], v["vendor_name"]) for v in values]))
+        .cte("previous")
+    )
+
+    stmt = insert(table).values(values)
+    upsert = stmt.on_conflict_do_update(
+        constraint="uq_vendor_prices_component_vendor",
+        set_={name: stmt.excluded[name] for name in values[0] if name not in ("component_id", "vendor_name")},
+    ).returning(*keys, *(table.c[name] for name in _TRACKED), literal_column("xmax = 0").label("inserted"))
+    written = upsert.cte("written")
+
+    same = and_(*(written.c[name].is_not_distinct_from(previous.c[name]) for name in _TRACKED))
+    outcome = select(written.c.inserted, same.label("same")).select_from(
+        written.outerjoin(
+            previous,
+            and_(
+                written.c.component_id == previous.c.component_id,
+                written.c.vendor_name == previous.c.vendor_name,
+            ),
+        )
+    )
+
+    for inserted, unchanged in session.execute(outcome):
+        if inserted:
+            counts["inserted"] += 1
+        elif unchanged:
+            counts["unchanged"] += 1
+        else:
+            counts["updated"] += 1
+    return counts
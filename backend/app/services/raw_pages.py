@@ -0,0 +1,96 @@
+"""
+Content-addressed store for raw product pages.
+
+Scrapers keep the full HTML so pages can be re-parsed later, but storing it
+inline in vendor_prices.raw_data bloats the table every /components request
+reads. Pages live gzip-compressed in raw_pages keyed by their SHA-256 instead,
+and raw_data keeps only {"page": <sha256>, "specs": {...}}.
+"""
+
+import gzip
+import hashlib
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from ..models.raw_page import RawPage
+from ..scraping.schemas import ScrapedProduct
+
+
+def page_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def compress_page(html: str) -> bytes:
+    return gzip.compress(html.encode("utf-8"), compresslevel=6)
+
+
+def decompress_page(content: bytes, encoding: str = "gzip") -> str:
+    if encoding != "gzip":
+        raise ValueError(f"Unsupported raw page encoding: {encoding}")
+    return gzip.decompress(content).decode("utf-8")
+
+
+def page_reference(raw_data: Optional[Dict]) -> Optional[str]:
+    """Hash of the stored page behind a raw_data value, if any."""
+    if isinstance(raw_data, dict):
+        return raw_data.get("page")
+    return None
+
+
+class RawPageStore:
+    """Writes and reads raw_pages rows. Never commits; callers own the transaction."""
+
+    def put_many(self, session: Session, pages: Iterable[str]) -> List[str]:
+        """Stores pages (deduplicated by hash) with one INSERT; returns their hashes in order."""
+        hashes = []
+        rows = {}
+        now = datetime.utcnow()
+        for html in pages:
+            digest = page_hash(html)
+            hashes.append(digest)
+            if digest not in rows:
+                rows[digest] = {
+                    "sha256": digest,
+                    "encoding": "gzip",
+                    "size_bytes": len(html.encode("utf-8")),
+                    "content": compress_page(html),
+                    "created_at": now,
+                }
+
+        if rows:
+            session.execute(
+                insert(RawPage.__table__).values(list(rows.values())).on_conflict_do_nothing(index_elements=["sha256"])
+            )
+        return hashes
+
+    def archive(self, session: Session, products: List[ScrapedProduct]) -> List[ScrapedProduct]:
+        """
+        Stores the inline HTML of each product's raw_data and returns the
+        products to write, in order: copies whose raw_data is a reference plus
+        the parsed specs. The given products keep their HTML, so they can be
+        archived again if the caller's transaction rolls back.
+        """
+        inline = [p for p in products if p.raw_data and "html" in p.raw_data]
+        hashes = iter(self.put_many(session, (p.raw_data["html"] for p in inline)))
+        return [
+            p.model_copy(update={"raw_data": {"page": next(hashes), "specs": p.specs}})
+            if p.raw_data and "html" in p.raw_data else p
+            for p in products
+        ]
+
+    def get(self, session: Session, digest: str) -> Optional[str]:
+        row = session.execute(
+            select(RawPage.__table__.c.content, RawPage.__table__.c.encoding).where(RawPage.__table__.c.sha256 == digest)
+        ).first()
+        if row is None:
+            return None
+        return decompress_page(row.content, row.encoding)
+
+    def get_many(self, session: Session, digests: Iterable[str]) -> Dict[str, str]:
+        table = RawPage.__table__
+        rows = session.execute(
+            select(table.c.sha256, table.c.content, table.c.encoding).where(table.c.sha256.in_(set(digests)))
+        )
+        return {row.sha256: decompress_page(row.content, row.encoding) for row in rows}
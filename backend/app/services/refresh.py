@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import math
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from datetime import datetime
+from sqlalchemy import case, func, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from ..models.checkpoint import ScrapeRun
+from ..models.component import Component
+from ..models.enums import ComponentType
+from ..models.price import VendorPrice, VendorName
+from ..models.refresh import UrlRefreshStats, ComponentView
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest observation in the volatility EWMA
+VOLATILITY_ALPHA = 0.2
+
+
+class RefreshCandidate(NamedTuple):
+    url: str
+    vendor_name: str
+    component_type: ComponentType
+    score: float
+    p_changed: float  # probability the page changed since it was last checked
+
+
+class RefreshStatsStore:
+    """Keeps per-URL change statistics up to date as prices are written."""
+
+    def observe(self, session: Session, rows: List[Dict]) -> None:
+        """
+        Records one observation per price row (url, vendor_name, price_bdt,
+        in_stock) in a single upsert, counting price and stock changes against
+        the previous observation. Does not commit.
+        """
+        if not rows:
+            return
+        now = datetime.utcnow()
+        latest = {
+            row["url"]: {
+                "url": row["url"],
+                "vendor_name": str(getattr(row["vendor_name"], "value", row["vendor_name"])),
+                "observations": 1,
+                "last_price": row["price_bdt"],
+                "last_in_stock": row["in_stock"],
+                "first_seen": now,
+                "last_checked": now,
+            }
+            for row in rows
+        }
+
+        table = UrlRefreshStats.__table__
+        stmt = insert(table).values(list(latest.values()))
+        new = stmt.excluded
+        price_moved = table.c.last_price.is_distinct_from(new.last_price)
+        stock_moved = table.c.last_in_stock.is_distinct_from(new.last_in_stock)
+        relative_move = func.abs(new.last_price - table.c.last_price) / func.greatest(table.c.last_price, 1)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["url"],
+            set_={
+                "observations": table.c.observations + 1,
+                "price_changes": table.c.price_changes + case((price_moved, 1), else_=0),
+                "stock_changes": table.c.stock_changes + case((stock_moved, 1), else_=0),
+                "volatility": (1 - VOLATILITY_ALPHA) * table.c.volatility
+                              + VOLATILITY_ALPHA * func.coalesce(relative_move, 0.0),
+                "last_price": new.last_price,
+                "last_in_stock": new.last_in_stock,
+                "last_checked": new.last_checked,
+                "last_changed": case((price_moved | stock_moved, new.last_checked), else_=table.c.last_changed),
+            },
+        ))
+
+    def touch(self, session: Session, urls: Iterable[str]) -> None:
+        """Counts an observation without a change (304 / identical body). Does not commit."""
+        urls = list(urls)
+        if not urls:
+            return
+        table = UrlRefreshStats.__table__
+        session.execute(
+            update(table)
+            .where(table.c.url.in_(urls))
+            .values(observations=table.c.observations + 1, last_checked=datetime.utcnow())
+        )
+
+
+class ComponentViewBuffer:
+    """
+    Counts component detail views in memory and writes them in one upsert per
+    flush, so the read endpoint never writes to the database: a failed write
+    costs a retry on the next flush, not a 500, and hot components don't
+    serialize readers on their counter row.
+    """
+
+    def __init__(self):
+        self._views: Dict[int, int] = {}
+        self._last_viewed: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+
+    def add(self, component_id: int) -> None:
+        with self._lock:
+            self._views[component_id] = self._views.get(component_id, 0) + 1
+            self._last_viewed[component_id] = datetime.utcnow()
+
+    def flush(self, session: Session) -> int:
+        """Upserts the buffered views and commits. On failure they are kept for the next flush."""
+        with self._lock:
+            views, self._views = self._views, {}
+            last_viewed, self._last_viewed = self._last_viewed, {}
+        if not views:
+            return 0
+
+        table = ComponentView.__table__
+        # Sorted, so concurrent flushes from several API workers lock rows in the same order
+        stmt = insert(table).values([
+            {"component_id": component_id, "views": count, "last_viewed": last_viewed[component_id]}
+            for component_id, count in sorted(views.items())
+        ])
+        try:
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=["component_id"],
+                set_={"views": table.c.views + stmt.excluded.views, "last_viewed": stmt.excluded.last_viewed},
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            with self._lock:
+                for component_id, count in views.items():
+                    self._views[component_id] = self._views.get(component_id, 0) + count
+                    self._last_viewed.setdefault(component_id, last_viewed[component_id])
+            logger.warning(f"Could not write {len(views)} component view counts, retrying later: {e}")
+            return 0
+        return len(views)
+
+    async def run(self, engine: Engine, interval: float = 30.0) -> None:
+        """Flushes every ``interval`` seconds until cancelled, then once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await asyncio.to_thread(self._flush_with, engine)
+        finally:
+            self._flush_with(engine)
+
+    def _flush_with(self, engine: Engine) -> None:
+        with Session(engine) as session:
+            self.flush(session)
+
+
+# Views of this API process; flushed by the app's lifespan task
+component_views = ComponentViewBuffer()
+
+
+class RefreshPlanner:
+    """
+    Scores known product URLs by the expected value of refetching them and
+    picks the best ones that fit a request budget.
+
+    The value of a URL is the probability it changed since it was last
+    checked, from its smoothed historical change rate and its age, weighted
+    by how much people look at the component and how much its price moves.
+    Each pick costs one conditional GET plus, if it changed, a full fetch.
+    """
+
+    def __init__(self, vendors: Optional[List[str]] = None):
+        self.vendors = vendors
+
+    def candidates(self, session: Session, now: Optional[datetime] = None) -> List[RefreshCandidate]:
+        now = now or datetime.utcnow()
+        prices, stats, views = VendorPrice.__table__, UrlRefreshStats.__table__, ComponentView.__table__
+        components = Component.__table__
+        query = (
+            select(
+                prices.c.url, prices.c.vendor_name, components.c.component_type, prices.c.last_updated,
+                stats.c.observations, stats.c.price_changes, stats.c.stock_changes, stats.c.volatility,
+                stats.c.first_seen, stats.c.last_checked, func.coalesce(views.c.views, 0).label("views"),
+            )
+            .join(components, components.c.id == prices.c.component_id)
+            .outerjoin(stats, stats.c.url == prices.c.url)
+            .outerjoin(views, views.c.component_id == prices.c.component_id)
+        )
+        if self.vendors:
+            query = query.where(prices.c.vendor_name.in_([VendorName(v) for v in self.vendors]))
+
+        scored = []
+        for row in session.execute(query):
+            last_checked = max(filter(None, (row.last_updated, row.last_checked)), default=None)
+            if last_checked is None:
+                # Never checked: nothing says it is still current
+                p_changed = 1.0
+            else:
+                age_days = max((now - last_checked).total_seconds(), 0) / 86400
+
+                # Laplace-smoothed changes per day over the observed span
+                changes = (row.price_changes or 0) + (row.stock_changes or 0)
+                span_days = (last_checked - row.first_seen).total_seconds() / 86400 if row.first_seen else 0
+                rate = (changes + 1) / (span_days + 1)
+                p_changed = 1 - math.exp(-rate * age_days)
+
+            importance = 1 + math.log1p(row.views) + 10 * (row.volatility or 0)
+            scored.append(RefreshCandidate(
+                url=row.url,
+                vendor_name=str(getattr(row.vendor_name, "value", row.vendor_name)),
+                component_type=row.component_type,
+                score=p_changed * importance,
+                p_changed=p_changed,
+            ))
+        return scored
+
+    def plan(self, session: Session, budget: int, now: Optional[datetime] = None) -> List[RefreshCandidate]:
+        """Highest-value URLs first, until their expected request cost reaches ``budget``."""
+        picked, spent = [], 0.0
+        for candidate in sorted(self.candidates(session, now), key=lambda c: c.score, reverse=True):
+            cost = 1 + candidate.p_changed
+            if spent + cost > budget:
+                break
+            picked.append(candidate)
+            spent += cost
+        return picked
+
+    def category_priorities(self, session: Session, now: Optional[datetime] = None) -> List[ComponentType]:
+        """Categories by total refresh value; categories with no known URLs come first."""
+        totals = {component_type: 0.0 for component_type in ComponentType}
+        known = set()
+        for candidate in self.candidates(session, now):
+            totals[candidate.component_type] += candidate.score
+            known.add(candidate.component_type)
+        return sorted(totals, key=lambda c: (c in known, -totals[c]))
+
+    def record_plan(self, session: Session, run_id: int, plan: List[RefreshCandidate]) -> None:
+        """Stores how many URLs were planned and how many changes that should find. Does not commit."""
+        runs = ScrapeRun.__table__
+        session.execute(update(runs).where(runs.c.id == run_id).values(
+            planned=len(plan),
+            expected_changes=round(sum(c.p_changed for c in plan), 2),
+        ))
+
+    def record_outcome(self, session: Session, run_id: int, urls: List[str]) -> Dict[str, int]:
+        """Counts planned URLs actually checked and actually changed since the run started. Does not commit."""
+        runs, stats = ScrapeRun.__table__, UrlRefreshStats.__table__
+        since = session.execute(select(runs.c.started_at).where(runs.c.id == run_id)).scalar_one()
+        row = session.execute(
+            select(
+                func.count().filter(stats.c.last_checked >= since).label("refreshed"),
+                func.count().filter(stats.c.last_changed >= since).label("changed"),
+            ).where(stats.c.url.in_(urls))
+        ).one() if urls else None
+        outcome = {"refreshed": row.refreshed if row else 0, "changed": row.changed if row else 0}
+
+        session.execute(update(runs).where(runs.c.id == run_id).values(
+            refreshed=outcome["refreshed"],
+            actual_changes=outcome["changed"],
+        ))
+        return outcome
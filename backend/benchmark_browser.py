@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+BROWSER FETCH BENCHMARK
+Fetches synthetic product pages (HTML plus images, a web font and a video)
+from a local server through PlaywrightFetcher, comparing a new page per fetch
+with the pooled pages, under each fetch profile (full, media, dom). Reports
+pages/sec, bytes served per page, median time-to-content and the peak RSS of
+this process and its Chromium children.
+
+Needs Chromium (``playwright install chromium``); no network or database:
+
+    python benchmark_browser.py                 # 60 fetches, 2 concurrent
+    python benchmark_browser.py 200 3
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.scraping import fetchers
+from app.scraping.config import FETCH_PROFILES
+from app.scraping.fetchers import FetchProfile, PlaywrightFetcher
+
+# The fetcher's human-like pauses would dominate the timings; skip them
+fetchers.asyncio = types.SimpleNamespace(sleep=lambda *_: asyncio.sleep(0))
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+ASSETS = {
+    "/img.jpg": ("image/jpeg", b"\xff\xd8" + os.urandom(120_000)),
+    "/font.woff2": ("font/woff2", os.urandom(60_000)),
+    "/clip.mp4": ("video/mp4", os.urandom(200_000)),
+}
+PAGE = (
+    "<html><head><style>@font-face{font-family:f;src:url(/font.woff2)} body{font-family:f}</style></head><body>"
+    + "".join(f'<img src="/img.jpg?{i}">' for i in range(8))
+    + '<video src="/clip.mp4" preload="auto"></video>'
+    + '<script src="https://www.googletagmanager.com/gtag/js"></script>'
+    + "".join(f"<p>Spec {i}: {i * 7} units</p>" for i in range(300))
+    + "</body></html>"
+).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    served = 0
+
+    def do_GET(self):
+        content_type, body = ASSETS.get(self.path.split("?")[0], ("text/html", PAGE))
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        Handler.served += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def tree_rss_mb() -> float:
+    """RSS of this process and all its descendants, from /proc (Linux only)."""
+    parents = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                parents[int(pid)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree, frontier = {os.getpid()}, [os.getpid()]
+    while frontier:
+        parent = frontier.pop()
+        children = [pid for pid, ppid in parents.items() if ppid == parent]
+        tree.update(children)
+        frontier.extend(children)
+
+    total_kb = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+async def run(base_url: str, count: int, concurrency: int, pool_size: int, profile: FetchProfile):
+    fetcher = PlaywrightFetcher(True, [USER_AGENT], [{"width": 1366, "height": 768}],
+                                page_pool_size=pool_size, profile=profile)
+    # Launch outside the timed part
+    await fetcher.get(f"{base_url}/warmup")
+    Handler.served = 0
+    peak_rss = tree_rss_mb()
+    urls = iter(range(count))
+    times = []
+
+    async def worker():
+        nonlocal peak_rss
+        for i in urls:
+            result = await fetcher.get(f"{base_url}/p/{i}")
+            assert result.ok
+            times.append(result.load_stats.time_to_content)
+            peak_rss = max(peak_rss, tree_rss_mb())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    created = sum(pool.created for pool in fetcher.page_pools)
+    await fetcher.close()
+    times.sort()
+    return count / elapsed, Handler.served / count / 1024, times[len(times) // 2] * 1000, peak_rss, created
+
+
+async def main(count: int, concurrency: int):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{count} fetches, {concurrency} concurrent, {len(PAGE) // 1024} KB HTML + "
+          f"{sum(len(body) for _, body in ASSETS.values()) // 1024} KB assets per page\n")
+
+    print(f"{'pages':>7} | {'profile':>7} | {'pages/s':>8} | {'KB/page':>8} | {'TTC p50 ms':>10} | {'peak RSS MB':>11} | {'pages opened':>12}")
+    print("-" * 84)
+    for label, pool_size in (("new", 0), ("pooled", concurrency)):
+        for name, settings in FETCH_PROFILES.items():
+            profile = FetchProfile.from_config(name, settings)
+            rate, kb, ttc, rss, created = await run(base_url, count, concurrency, pool_size, profile)
+            print(f"{label:>7} | {name:>7} | {rate:>8.2f} | {kb:>8.0f} | {ttc:>10.0f} | {rss:>11.0f} | {created:>12}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    asyncio.run(main(count, concurrency))
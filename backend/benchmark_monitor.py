@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+MONITOR BENCHMARK
+Records synthetic requests into a ScraperMonitor and times the hot path
+(record_request) and the aggregate queries the runner polls
+(get_recent_performance, detect_blocking_patterns, get_summary).
+
+Runs in memory plus one temporary metrics file, no network or database:
+
+    python benchmark_monitor.py                 # 20000 requests
+    python benchmark_monitor.py 100000
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.scraping.monitor import ScraperMonitor, RequestMetrics
+
+VENDORS = ["StarTech", "Skyland"]
+COMPONENTS = ["cpu", "gpu", "ram", "motherboard", "storage", "psu", "case", "cooler"]
+
+
+def synthetic_requests(count: int, rng: random.Random):
+    """One request every ~0.2 s of simulated time, 8% failures, a few 429s."""
+    now = time.time() - count * 0.2
+    for i in range(count):
+        now += rng.expovariate(5)
+        success = rng.random() > 0.08
+        yield RequestMetrics(
+            url=f"https://www.startech.com.bd/p/{i}",
+            vendor=rng.choice(VENDORS),
+            component_type=rng.choice(COMPONENTS),
+            timestamp=now,
+            duration=rng.lognormvariate(-0.5, 0.6),
+            success=success,
+            status_code=200 if success else rng.choice([403, 429, 500]),
+            error=None if success else "HTTP error",
+            content_length=rng.randint(40_000, 160_000) if success else 0,
+        )
+
+
+def timed(label: str, fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - start) / repeat
+    print(f"{label:>28}: {per_call * 1e6:>10.1f} µs/call")
+
+
+def main(count: int):
+    rng = random.Random(42)
+    requests = list(synthetic_requests(count, rng))
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = ScraperMonitor(log_file=str(Path(tmp) / "scraper_metrics.jsonl"))
+        start = time.perf_counter()
+        for metrics in requests:
+            monitor.record_request(metrics)
+        elapsed = time.perf_counter() - start
+        print(f"{count} requests recorded")
+        print(f"{'record_request':>28}: {elapsed / count * 1e6:>10.1f} µs/call")
+
+        timed("get_recent_performance(5)", lambda: monitor.get_recent_performance(5), 200)
+        timed("detect_blocking_patterns", monitor.detect_blocking_patterns, 200)
+        timed("get_summary", monitor.get_summary, 200)
+        close = getattr(monitor, "close", None)
+        if close:
+            close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+NORMALIZATION MATCHING BENCHMARK
+Compares full-category fuzzy scoring against the blocked shortlist path
+and the vectorized batch path (40-product batches, like one category).
+
+Runs entirely in memory on synthetic component names, no database needed:
+
+    python benchmark_normalization.py            # 1k, 10k, 100k candidates
+    python benchmark_normalization.py 5000 50000
+"""
+
+import random
+import sys
+import time
+from thefuzz import fuzz, process
+from app.models.enums import ComponentType
+from app.scraping.schemas import ScrapedProduct
+from app.services.normalization import NormalizationService, CandidateIndex
+
+BRANDS = ["AMD", "Intel", "ASUS", "MSI", "Gigabyte", "Corsair", "G.Skill", "Kingston", "Samsung", "Zotac"]
+SERIES = ["Ryzen 5", "Ryzen 7", "Core i5", "Core i7", "ROG Strix", "TUF Gaming", "Vengeance", "Trident Z", "Fury Beast"]
+SUFFIXES = ["", "X", "G", "K", "F", "KF", "XT", "Ti", "Super"]
+EXTRAS = ["Processor", "Gaming", "Desktop", "RGB", "OC Edition", "Black", "White", "Wi-Fi", "DDR5", "16GB"]
+
+
+def synthetic_name(rng: random.Random) -> str:
+    model = f"{rng.randint(1000, 99999)}{rng.choice(SUFFIXES)}"
+    extras = " ".join(rng.sample(EXTRAS, 2))
+    return f"{rng.choice(BRANDS)} {rng.choice(SERIES)} {model} {extras}"
+
+
+def build_service(names) -> NormalizationService:
+    service = NormalizationService()
+    index = CandidateIndex(ComponentType.CPU)
+    for component_id, name in enumerate(names, start=1):
+        index.add(component_id, name)
+    service._indexes[ComponentType.CPU] = index
+    return service
+
+
+def full_scan(service: NormalizationService, product: ScrapedProduct):
+    """The pre-blocking path: score every candidate of the category."""
+    index = service._indexes[ComponentType.CPU]
+    return process.extractOne(product.name, dict(zip(index.ids, index.names)), scorer=fuzz.token_set_ratio)
+
+
+def blocked(service: NormalizationService, product: ScrapedProduct):
+    return service.normalize_product(None, product, ComponentType.CPU)
+
+
+def batched(service: NormalizationService, products, batch_size: int = 40) -> float:
+    """Matches per second through normalize_batch."""
+    start = time.perf_counter()
+    for i in range(0, len(products), batch_size):
+        service.normalize_batch(None, products[i:i + batch_size], ComponentType.CPU)
+    return len(products) / (time.perf_counter() - start)
+
+
+def measure(fn, service, products, budget: float = 10.0) -> float:
+    """Matches per second, stopping early once ``budget`` seconds are spent."""
+    start = time.perf_counter()
+    done = 0
+    for product in products:
+        fn(service, product)
+        done += 1
+        if time.perf_counter() - start > budget:
+            break
+    return done / (time.perf_counter() - start)
+
+
+def main(sizes):
+    rng = random.Random(42)
+    print(f"{'candidates':>10} | {'full scan/s':>12} | {'blocked/s':>12} | {'batch/s':>12} | {'speedup':>8}")
+    print("-" * 67)
+    for size in sizes:
+        names = [synthetic_name(rng) for _ in range(size)]
+        service = build_service(names)
+
+        # Half near-duplicates of existing rows, half brand-new products
+        queries = [f"{name} (Tray)" for name in rng.sample(names, 100)] + [synthetic_name(rng) for _ in range(100)]
+        rng.shuffle(queries)
+        products = [
+            ScrapedProduct(name=q, vendor="Benchmark", price=0, url="", status="In Stock")
+            for q in queries
+        ]
+
+        before = measure(full_scan, service, products)
+        after = measure(blocked, service, products)
+        batch = batched(service, products)
+        print(f"{size:>10} | {before:>12.1f} | {after:>12.1f} | {batch:>12.1f} | {max(after, batch) / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    main(sizes)
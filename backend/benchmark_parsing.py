@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+PARSING BENCHMARK
+Parses synthetic StarTech-sized product pages with BeautifulSoup and with the
+lxml fast parser, on the event loop and through the parse pool, reporting
+pages/sec and event-loop lag (how late a 5 ms timer fires while parsing is
+in flight).
+
+Runs entirely in memory, no network or database needed:
+
+    python benchmark_parsing.py                 # 200 pages, 2 workers
+    python benchmark_parsing.py 500 4
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from app.scraping import base_scraper
+from app.scraping.config import SCRAPER_CONFIG
+from app.scraping.vendors.startech import StarTechScraper
+
+TICK = 0.005
+
+
+def synthetic_page(rng: random.Random) -> str:
+    """~75 KB of markup with a nav menu, spec table and related products, like a real product page."""
+    nav = "".join(f'<li><a href="/category/{i}">Category {i}</a></li>' for i in range(600))
+    specs = "".join(
+        f'<tr><td class="name">Spec {i}</td><td class="value">{rng.randint(1, 9999)} units</td></tr>'
+        for i in range(60)
+    )
+    description = "".join(f"<p>{'Lorem ipsum dolor sit amet. ' * 20}</p>" for _ in range(60))
+    related = "".join(
+        f'<div class="p-item"><div class="p-item-name"><a href="/p/{i}">Related {i}</a></div></div>'
+        for i in range(80)
+    )
+    return f"""<html><head><title>Product</title></head><body>
+<nav><ul>{nav}</ul></nav>
+<h1 class="product-name">AMD Ryzen 5 {rng.randint(1000, 9999)}X Processor</h1>
+<div class="price-wrap"><ins>{rng.randint(10, 90)},500৳</ins></div>
+<div class="product-status">In Stock</div>
+<div class="product-images"><img src="https://example.com/x.jpg"></div>
+<section id="specification"><table>{specs}</table></section>
+<section id="description">{description}</section>
+<section class="related">{related}</section>
+</body></html>"""
+
+
+async def run(scraper: StarTechScraper, pages, use_pool: bool, streams: int):
+    """``streams`` concurrent fetch workers, each parsing pages as they "arrive"."""
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    async def parse(html, url):
+        if use_pool:
+            return await scraper.parse_in_pool("parse_product", html, url)
+        return await scraper.parse_product(html, url)
+
+    queue = iter(enumerate(pages))
+    results = []
+
+    async def worker():
+        for i, html in queue:
+            await asyncio.sleep(0)
+            results.append(await parse(html, f"https://example.com/p/{i}"))
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(streams)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    assert all(r and r.specs for r in results)
+    lags.sort()
+    p95 = lags[int(len(lags) * 0.95) - 1] if lags else 0.0
+    return len(pages) / elapsed, p95 * 1000, max(lags, default=0.0) * 1000, statistics.mean(lags) * 1000 if lags else 0.0
+
+
+async def main(count: int, workers: int):
+    rng = random.Random(42)
+    pages = [synthetic_page(rng) for _ in range(count)]
+    print(f"{count} pages, {len(pages[0]) // 1024} KB each, {workers} parse workers\n")
+
+    print(f"{'parser':>7} | {'mode':>8} | {'pages/s':>8} | {'lag p95 ms':>10} | {'lag max ms':>10} | {'lag mean ms':>11}")
+    print("-" * 72)
+    for parser, fast in (("bs4", False), ("lxml", True)):
+        # Workers pick the mode up from the config when the pool is forked
+        SCRAPER_CONFIG["parse_workers"] = workers
+        SCRAPER_CONFIG["fast_parser"] = fast
+        scraper = StarTechScraper()
+        # Warm the workers so process start-up is not counted
+        await asyncio.gather(*(scraper.parse_in_pool("parse_product", pages[0], "warmup") for _ in range(workers * 2)))
+
+        for label, use_pool in (("in-loop", False), ("pool", True)):
+            rate, p95, worst, mean = await run(scraper, pages, use_pool, streams=max(2, workers))
+            print(f"{parser:>7} | {label:>8} | {rate:>8.1f} | {p95:>10.1f} | {worst:>10.1f} | {mean:>11.1f}")
+
+        base_scraper.shutdown_parse_pool()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    asyncio.run(main(count, workers))
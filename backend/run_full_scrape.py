@@ -3,14 +3,28 @@ import asyncio
 import logging
 import random
 import gc
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from concurrent.futures import ThreadPoolExecutor
 from sqlmodel import Session, select
 from app.database import engine
 from app.models.enums import ComponentType
 from app.scraping.vendors.startech import StarTechScraper
 from app.scraping.vendors.skyland import SkylandScraper
-from app.services.normalization import NormalizationService
+from app.services.normalization import NormalizationService, CandidateIndex
+from app.services.prices import upsert_vendor_prices
+from app.services.catalog import ComponentCreator
+from app.services.raw_pages import RawPageStore
+from app.services.page_validators import PageValidatorStore
+from app.services.checkpoints import CheckpointStore
+from app.services.refresh import RefreshStatsStore
+from app.models.refresh import UrlRefreshStats
+from app.scraping.pipeline import BatchWriter
+from app.scraping.base_scraper import shutdown_parse_pool
+from app.scraping.monitor import ScraperMonitor
+from app.scraping.metrics_export import export_run_metrics
+from app.scraping.scheduler import budget_for, run_per_vendor
+from app.scraping.config import SCRAPER_CONFIG, get_config
 from app.models.price import VendorPrice
 from datetime import datetime
 from app.models.component import Component
@@ -92,195 +106,281 @@ SKYLAND_FALLBACK_URLS = {
     ]
 }
 
-async def process_products_concurrently(scraper, product_urls, component_type, normalization, session):
-    """Process multiple products with ENHANCED stealth protection and rate limiting"""
-    semaphore = asyncio.Semaphore(2)  # REDUCED to 2 concurrent requests for maximum stealth
-    batch_size = 8  # Much smaller batches for better stealth
+async def process_products_concurrently(scraper, product_urls, component_type, normalization, session, checkpoints=None):
+    """
+    Fetches, parses and saves products with as many requests in flight as the
+    vendor host's adaptive budget allows: it grows while the vendor answers
+    quickly and cleanly and is cut on 429/503, challenges and timeouts.
+    Returns the number of products saved or confirmed unchanged
+    """
+    if not product_urls:
+        return 0
+    budget = budget_for(product_urls[0])
     success_count = 0
+    unchanged_urls = []
+    scraper.category = component_type.value
+
+    # Parsed products stream to the DB writer, which commits every 25 items or
+    # 30 seconds; a crash late in a category only loses the unflushed tail
+    writer = BatchWriter(
+        lambda items: batch_save_products(items, scraper, component_type, normalization, session, checkpoints),
+        max_items=25,
+        max_seconds=30.0,
+        max_pending=budget.max_concurrency * 16,
+    ).start()
     
+    def checkpoint(p_url, status):
+        if checkpoints:
+            checkpoints.mark(scraper.VENDOR_NAME, component_type, p_url, status)
+
     async def process_single_product(p_url):
         nonlocal success_count
-        async with semaphore:
-            try:
-                # MUCH longer delays for stealth
-                base_delay = 3.5 if success_count < len(product_urls) * 0.1 else 5.0
-                await asyncio.sleep(random.uniform(base_delay, base_delay * 2.2))
-                
-                logger.info(f"Processing: {p_url}")
-                p_html = await scraper.fetch_page(p_url, retries=1)
-                if not p_html:
-                    return None
-                    
-                scraped_data = await scraper.parse_product(p_html, p_url)
-                if scraped_data:
-                    success_count += 1
-                    logger.info(f"Scraped: {scraped_data.name} | Price: {scraped_data.price}")
-                return scraped_data, p_url
-            except Exception as e:
-                logger.error(f"Error processing {p_url}: {e}")
-                # Much longer delay if errors start occurring
-                await asyncio.sleep(random.uniform(8, 15))
+        try:
+            # A 304 or identical body since the last run means nothing to parse or save
+            known = p_url in scraper.page_validators
+            unchanged, result = await scraper.conditional_fetch(p_url)
+            if known:
+                scraper.count("conditional_hits" if unchanged else "conditional_misses")
+            if unchanged:
+                logger.info(f"Unchanged since last fetch, skipping: {p_url}")
+                checkpoint(p_url, "skipped")
+                unchanged_urls.append(p_url)
                 return None
-    
-    # Process products in smaller batches with adaptive timing
-    scraped_results = []
-    total_products = len(product_urls)
-    
-    for i in range(0, total_products, batch_size):
-        batch_urls = product_urls[i:i + batch_size]
-        logger.info(f"Processing batch {i//batch_size + 1}/{(total_products-1)//batch_size + 1} ({len(batch_urls)} products)")
-        
-        # Process batch concurrently with intelligent error handling
-        tasks = [process_single_product(url) for url in batch_urls]
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Collect successful results and monitor error rate
-        error_count = 0
-        for result in batch_results:
-            if isinstance(result, Exception):
-                error_count += 1
-                logger.warning(f"Batch processing exception: {result}")
-            elif result and result[0]:
-                scraped_results.append(result)
-        
-        # Adaptive batch delay based on error rate - MUCH more conservative
-        if error_count > len(batch_urls) * 0.2:  # If >20% errors (reduced threshold)
-            logger.warning(f"High error rate ({error_count}/{len(batch_urls)}), increasing delays significantly")
-            await asyncio.sleep(random.uniform(15, 25))  # Much longer error delays
-        else:
-            # Normal inter-batch delay - increased for safety
-            await asyncio.sleep(random.uniform(8, 15))
-        
-        # Memory cleanup after each batch
-        if i % (batch_size * 2) == 0:
-            gc.collect()
-    
-    # Batch save to database
-    await batch_save_products(scraped_results, scraper, component_type, normalization, session)
-    return len(scraped_results)
 
-async def batch_save_products(scraped_results, scraper, component_type, normalization, session):
-    """Save multiple products in batches for better database performance"""
+            logger.info(f"Processing: {p_url}")
+            if result is None:
+                # New URL, or a changed page the conditional GET could not stand in for
+                result = await scraper.fetch_result(p_url, retries=1)
+            if not result:
+                checkpoint(p_url, "failed")
+                return None
+                
+            scraped_data = await scraper.parse_in_pool("parse_product", result.text, p_url)
+            if scraped_data:
+                success_count += 1
+                # Saved with the product's price, never before it
+                scraper.stage_validators(p_url, result)
+                logger.info(f"Scraped: {scraped_data.name} | Price: {scraped_data.price}")
+            else:
+                checkpoint(p_url, "failed")
+        except Exception as e:
+            logger.error(f"Error processing {p_url}: {e}")
+            checkpoint(p_url, "failed")
+            return None
+
+        # Waiting on a full queue holds no budget slot
+        if scraped_data:
+            await writer.put((scraped_data, p_url))
+        return scraped_data
+
+    pending = iter(product_urls)
+
+    async def worker():
+        for p_url in pending:
+            await process_single_product(p_url)
+
+    try:
+        # More workers than the concurrency ceiling, so parsing and saving never
+        # leave a slot the budget would grant unused; the budget does the pacing
+        await asyncio.gather(*(worker() for _ in range(min(len(product_urls), budget.max_concurrency * 2))))
+    finally:
+        # Flush the tail even when a worker blew up or the run was cancelled
+        saved = await asyncio.shield(writer.close())
+        if checkpoints:
+            save_checkpoints(checkpoints, session)
+        save_unchanged(unchanged_urls, scraper, session)
+
+    logger.info(
+        f"Streamed {writer.received} products to the database in {writer.flushes} flushes; "
+        f"{budget.host} at {budget.rate:.1f} req/min, {int(budget.limit)} in flight "
+        f"(peak {budget.peak_in_flight}, {budget.decreases} backoffs)"
+    )
+    return saved + len(unchanged_urls)
+
+async def batch_save_products(scraped_results, scraper, component_type, normalization, session, checkpoints=None):
+    """Save multiple products in batches for better database performance. Returns the number saved."""
     batch_size = 25
     total_saved = 0
+    creator = ComponentCreator()
+    page_store = RawPageStore()
+    price_counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    validator_store = PageValidatorStore()
     
     for i in range(0, len(scraped_results), batch_size):
         batch = scraped_results[i:i + batch_size]
+        # Dropped with the batch if it fails: the pages are fetched in full next time
+        staged = scraper.take_validators(p_url for _, p_url in batch)
         
         try:
-            for scraped_data, p_url in batch:
-                match_id = normalization.normalize_product(session, scraped_data, component_type)
-                
-                if match_id:
-                    # Update existing price
-                    existing_price = session.exec(
-                        select(VendorPrice).where(
-                            VendorPrice.component_id == match_id,
-                            VendorPrice.vendor_name == scraper.VENDOR_NAME
-                        )
-                    ).first()
-                    
-                    if existing_price:
-                        existing_price.price_bdt = scraped_data.price
-                        existing_price.last_updated = datetime.utcnow()
-                        existing_price.in_stock = (scraped_data.status.lower() == "in stock")
-                        existing_price.url = scraped_data.url
-                        existing_price.raw_data = scraped_data.raw_data
+            # Move page HTML into the raw page store; the copies written below keep a
+            # reference, the scraped products keep their HTML in case this batch rolls back
+            with scraper.timed("db_write"):
+                archived = page_store.archive(session, [data for data, _ in batch])
+                batch = [(data, p_url) for data, (_, p_url) in zip(archived, batch)]
+
+            with scraper.timed("normalization"):
+                # Re-scraped URLs with an unchanged title skip fuzzy matching entirely
+                cached = [normalization.cached_match(session, scraper.VENDOR_NAME, data) for data, _ in batch]
+                pending = [data for (data, _), hit in zip(batch, cached) if not hit]
+
+                # Match the rest of the batch in one vectorized pass
+                fuzzy = iter(normalization.normalize_batch(session, pending, component_type))
+                matches = [hit if hit else next(fuzzy)[0] for hit in cached]
+                price_rows = []
+                saved_urls = []
+
+                # Unmatched products are created in bulk; repeats within the batch
+                # are matched against each other and attached to the first one
+                new_products = []
+                new_urls = []
+                new_index = CandidateIndex(component_type)
+                repeats = []
+
+                for (scraped_data, p_url), match_id, hit in zip(batch, matches, cached):
+                    if match_id:
+                        if not hit:
+                            normalization.remember_match(session, scraper.VENDOR_NAME, scraped_data, match_id)
+                        price_rows.append(_price_row(scraped_data, scraper, match_id))
+                        saved_urls.append(p_url)
+                        total_saved += 1
+                        continue
+
+                    twin = normalization.match_against(new_index, scraped_data, component_type)
+                    if twin is not None:
+                        repeats.append((twin, scraped_data, p_url))
                     else:
-                        new_price = VendorPrice(
-                            component_id=match_id,
-                            vendor_name=scraper.VENDOR_NAME,
-                            price_bdt=scraped_data.price,
-                            url=scraped_data.url,
-                            in_stock=(scraped_data.status.lower() == "in stock"),
-                            raw_data=scraped_data.raw_data,
-                            last_updated=datetime.utcnow()
-                        )
-                        session.add(new_price)
+                        new_index.add(len(new_products), scraped_data.name)
+                        new_products.append(scraped_data)
+                        new_urls.append(p_url)
                     total_saved += 1
-                else:
-                    # Create new component — both StarTech and Skyland can create new components
-                    # Previously only StarTech could create, causing Skyland products to be silently dropped
-                    await create_new_component(scraped_data, scraper, component_type, session)
-                    total_saved += 1
-            
-            # Commit entire batch at once
-            session.commit()
-            logger.info(f"Batch saved: {len(batch)} products")
+
+            with scraper.timed("db_write"):
+                # Create new components — both StarTech and Skyland can create new components
+                # Previously only StarTech could create, causing Skyland products to be silently dropped
+                new_ids = creator.create_batch(session, scraper.VENDOR_NAME, component_type, new_products)
+                created = []
+                for scraped_data, p_url, component_id in zip(new_products, new_urls, new_ids):
+                    if component_id is None:
+                        total_saved -= 1
+                        continue
+                    normalization.remember_match(session, scraper.VENDOR_NAME, scraped_data, component_id)
+                    created.append((component_id, scraped_data.name))
+                    saved_urls.append(p_url)
+                for pos, scraped_data, p_url in repeats:
+                    component_id = new_ids[pos]
+                    if component_id is None:
+                        total_saved -= 1
+                        continue
+                    normalization.remember_match(session, scraper.VENDOR_NAME, scraped_data, component_id)
+                    price_rows.append(_price_row(scraped_data, scraper, component_id))
+                    saved_urls.append(p_url)
+
+                # Write every matched price with a single upsert, then commit once;
+                # checkpoints and page validators commit with the prices, so "done"
+                # always means saved and a page is only skipped as unchanged once
+                # its data is in the database
+                counts = upsert_vendor_prices(session, price_rows)
+                validators = {p_url: staged[p_url] for p_url in saved_urls if p_url in staged}
+                validator_store.save(session, scraper.VENDOR_NAME, validators)
+                # New components got their price from the creator; they are observations too
+                RefreshStatsStore().observe(session, price_rows + [
+                    _price_row(scraped_data, scraper, component_id)
+                    for scraped_data, component_id in zip(new_products, new_ids) if component_id is not None
+                ])
+                if checkpoints:
+                    # Products whose component could not be created were not saved
+                    saved = set(saved_urls)
+                    for _, p_url in batch:
+                        checkpoints.mark(scraper.VENDOR_NAME, component_type, p_url,
+                                         "done" if p_url in saved else "failed")
+                    checkpoints.flush(session)
+                session.commit()
+                if checkpoints:
+                    checkpoints.committed()
+
+            scraper.page_validators.update(validators)
+            # Keep the run's candidate index in sync so later batches can match them
+            for component_id, name in created:
+                normalization.register_component(component_id, name, component_type)
+            for key, value in counts.items():
+                price_counts[key] += value
+                scraper.count(f"prices_{key}", value)
+            cached_hits = sum(1 for hit in cached if hit)
+            scraper.count("products_cached_match", cached_hits)
+            scraper.count("products_fuzzy_match", sum(1 for match_id in matches if match_id) - cached_hits)
+            scraper.count("products_new", len(created) + len(repeats))
+            logger.info(
+                f"Batch saved: {len(batch)} products ({len(created)} new components, "
+                f"{counts['inserted']} new prices, {counts['updated']} updated, {counts['unchanged']} unchanged)"
+            )
             
         except Exception as e:
             logger.error(f"Batch save failed: {e}")
             session.rollback()
+            if checkpoints:
+                # The "done" marks above rolled back with the prices
+                for _, p_url in batch:
+                    checkpoints.mark(scraper.VENDOR_NAME, component_type, p_url, "failed")
+            # In-memory indexes may now point at rolled-back rows
+            normalization.reset()
     
     logger.info(f"Total products saved: {total_saved}")
+    logger.info(
+        f"Price upserts: {price_counts['inserted']} inserted, "
+        f"{price_counts['updated']} updated, {price_counts['unchanged']} unchanged"
+    )
+    return total_saved
 
-async def create_new_component(scraped_data, scraper, component_type, session):
-    """Create new component efficiently"""
-    try:
-        import re
-        slug = scraped_data.name.lower()
-        slug = re.sub(r'[^a-z0-9]+', '-', slug)
-        slug = slug.strip('-')
-        
-        # Check if slug exists
-        existing_slug = session.exec(select(Component).where(Component.slug == slug)).first()
-        if existing_slug:
-            slug = f"{slug}-{int(datetime.utcnow().timestamp())}"
-
-        # Extract brand
-        brand = scraped_data.name.split(" ")[0]
-        for k, v in scraped_data.specs.items():
-            if "brand" in k.lower():
-                brand = v
-                break
-
-        # Create component
-        new_component = Component(
-            name=scraped_data.name,
-            slug=slug,
-            image_url=scraped_data.image_url,
-            component_type=component_type,
-            brand=brand,
-            performance_score=50
-        )
-        session.add(new_component)
-        session.commit()
-        session.refresh(new_component)
-        
-        # Create price
-        new_price = VendorPrice(
-            component_id=new_component.id,
-            vendor_name=scraper.VENDOR_NAME,
-            price_bdt=scraped_data.price,
-            url=scraped_data.url,
-            in_stock=(scraped_data.status.lower() == "in stock"),
-            raw_data=scraped_data.raw_data,
-            last_updated=datetime.utcnow()
-        )
-        session.add(new_price)
-        session.commit()
-        logger.info(f"Created new component: {new_component.name} (ID: {new_component.id})")
-        
-    except Exception as e:
-        logger.error(f"Failed to create component: {e}")
-        session.rollback()
+def _price_row(scraped_data, scraper, component_id):
+    """VendorPrice column values for a bulk upsert."""
+    return {
+        "component_id": component_id,
+        "vendor_name": scraper.VENDOR_NAME,
+        "price_bdt": scraped_data.price,
+        "url": scraped_data.url,
+        "in_stock": (scraped_data.status.lower() == "in stock"),
+        "raw_data": scraped_data.raw_data,
+    }
 
 async def process_vendor_category(
     scraper, 
     vendor_urls: Dict[ComponentType, str], 
     component_type: ComponentType, 
     normalization: NormalizationService,
-    session: Session
+    session: Session,
+    checkpoints: Optional[CheckpointStore] = None,
+    listing_only: Optional[bool] = None
 ):
     """Enhanced category processing with stealth crawling and fallback URLs"""
+    if listing_only is None:
+        listing_only = get_config()["listing_only"]
     url = vendor_urls.get(component_type)
     if not url:
         return 0
+
+    if checkpoints and checkpoints.category_done(scraper.VENDOR_NAME, component_type):
+        logger.info(f"⏭️ {scraper.VENDOR_NAME} {component_type} already completed in this run")
+        return 0
+    scraper.category = component_type.value
+
+    # Conditional-fetch validators from earlier runs, loaded once per scraper
+    if not scraper.validators_loaded:
+        scraper.page_validators = PageValidatorStore().load(session, scraper.VENDOR_NAME)
+        scraper.validators_loaded = True
     
     logger.info(f"🔄 Scraping {scraper.VENDOR_NAME} {component_type} from {url}")
     
-    # Try primary URL first
-    result = await _try_scrape_url(scraper, url, component_type, normalization, session)
+    # Try primary URL first; the category only counts as done once some URL
+    # was scraped without failing
+    result, failed = 0, True
+    try:
+        if listing_only:
+            result = await refresh_from_listing(scraper, url, component_type, normalization, session, checkpoints)
+        else:
+            result = await _try_scrape_url(scraper, url, component_type, normalization, session, checkpoints)
+        failed = False
+    except Exception:
+        pass  # Logged by the scrape function
     
     # If primary URL failed and we have fallbacks, try them
     if result == 0 and component_type in [ComponentType.STORAGE, ComponentType.CASE]:
@@ -292,19 +392,50 @@ async def process_vendor_category(
         
         for fallback_url in fallback_urls:
             logger.info(f"🔄 Trying fallback URL for {component_type}: {fallback_url}")
-            result = await _try_scrape_url(scraper, fallback_url, component_type, normalization, session)
+            try:
+                result = await _try_scrape_url(scraper, fallback_url, component_type, normalization, session, checkpoints)
+                failed = False
+            except Exception:
+                result = 0
             if result > 0:  # Success with fallback
                 logger.info(f"✅ Fallback URL worked for {component_type}: {result} products")
                 break
-            await asyncio.sleep(random.uniform(5, 10))  # Extra delay between fallback attempts
+            with scraper.timed("delay"):
+                await asyncio.sleep(random.uniform(5, 10))  # Extra delay between fallback attempts
+
+    if checkpoints:
+        # A failed category is scraped again when the run is resumed
+        checkpoints.mark(scraper.VENDOR_NAME, component_type, "", "failed" if failed else "done", kind="category")
+        save_checkpoints(checkpoints, session)
     
     return result
 
-async def _try_scrape_url(scraper, url, component_type, normalization, session):
-    """Try scraping a specific URL with error handling and duplicate prevention"""
+async def _try_scrape_url(scraper, url, component_type, normalization, session, checkpoints=None):
+    """
+    Try scraping a specific URL with error handling and duplicate prevention.
+    Returns products saved or confirmed unchanged. Raises when the category
+    page could not be fetched or every product tried failed; 0 means there was
+    nothing new to scrape.
+    """
     try:
+        # Resuming an interrupted run: only the planned products not yet finished
+        planned = checkpoints.planned_products(session, scraper.VENDOR_NAME, component_type) if checkpoints else {}
+        if planned:
+            remaining = [p_url for p_url, status in planned.items() if status == "pending"]
+            logger.info(f"♻️ Resuming {scraper.VENDOR_NAME} {component_type}: {len(planned) - len(remaining)}/{len(planned)} products already handled")
+            if not remaining:
+                return 0
+            saved_count = await process_products_concurrently(
+                scraper, remaining, component_type, normalization, session, checkpoints
+            )
+            logger.info(f"✅ {scraper.VENDOR_NAME} {component_type} completed: {saved_count}/{len(remaining)} products saved or unchanged")
+            if saved_count == 0:
+                raise RuntimeError(f"all {len(remaining)} products failed")
+            return saved_count
+
         # Collect all product URLs from first 2 pages (reduced for safety)
         all_product_urls = []
+        found_on_page = {}
         current_url = url
         max_pages = 2 # Reduced for better stealth and IP protection
         
@@ -313,26 +444,31 @@ async def _try_scrape_url(scraper, url, component_type, normalization, session):
             
             # Longer delay between category pages for stealth
             if page_count > 1:
-                await asyncio.sleep(random.uniform(8, 15))  # Increased delays for safety
+                with scraper.timed("delay"):
+                    await asyncio.sleep(random.uniform(8, 15))  # Increased delays for safety
             
             html = await scraper.fetch_page(current_url)
+            if checkpoints:
+                checkpoints.mark(scraper.VENDOR_NAME, component_type, current_url, "done" if html else "failed",
+                                 page=page_count, kind="listing")
             if not html:
                 logger.error(f"❌ Failed to fetch page: {current_url}")
                 # More conservative retry logic
                 if page_count == 1:  # If first page fails, abort category
-                    break
+                    raise RuntimeError(f"category page {current_url} could not be fetched")
                 else:
                     continue
         
-            product_urls = scraper.extract_product_urls(html)
+            # Product links and the next-page link come from one parse
+            product_urls, next_url = await scraper.parse_in_pool("parse_category_page", html)
             logger.info(f"✅ Found {len(product_urls)} products on page {page_count}")
             
             # Remove duplicates while preserving order
             new_urls = [url for url in product_urls if url not in all_product_urls]
             all_product_urls.extend(new_urls)
+            for new_url in new_urls:
+                found_on_page[new_url] = page_count
             
-            # Get next page URL
-            next_url = scraper.extract_next_page_url(html)
             if not next_url:
                 logger.info("📋 No more pages available")
                 break
@@ -355,12 +491,18 @@ async def _try_scrape_url(scraper, url, component_type, normalization, session):
         existing_urls = get_existing_product_urls(session, scraper.VENDOR_NAME, component_type)
         logger.info(f"🔍 Found {len(existing_urls)} existing products in database")
         
-        # Filter out URLs that already exist
-        new_product_urls = [url for url in all_product_urls if url not in existing_urls]
+        # Filter out URLs that already exist, unless their validators let a conditional
+        # GET tell whether they changed: a 304 or identical body costs nothing more
+        recheck_count = sum(1 for url in all_product_urls if url in existing_urls and url in scraper.page_validators)
+        new_product_urls = [
+            url for url in all_product_urls if url not in existing_urls or url in scraper.page_validators
+        ]
         skipped_count = len(all_product_urls) - len(new_product_urls)
         
         if skipped_count > 0:
             logger.info(f"⏭️ Skipping {skipped_count} products (already in database)")
+        if recheck_count > 0:
+            logger.info(f"🔁 Re-checking {recheck_count} known products with a conditional GET")
         
         if len(new_product_urls) == 0:
             logger.info(f"✅ All products already exist in database - nothing to scrape")
@@ -368,22 +510,236 @@ async def _try_scrape_url(scraper, url, component_type, normalization, session):
         
         # Randomize product order to avoid predictable patterns
         random.shuffle(new_product_urls)
+
+        # Record the plan before fetching, so a crash resumes with the same products
+        if checkpoints:
+            for p_url in new_product_urls:
+                checkpoints.mark(scraper.VENDOR_NAME, component_type, p_url, "pending", page=found_on_page[p_url])
+            save_checkpoints(checkpoints, session)
         
         # Process all products concurrently with enhanced stealth
         saved_count = await process_products_concurrently(
-            scraper, new_product_urls, component_type, normalization, session
+            scraper, new_product_urls, component_type, normalization, session, checkpoints
         )
         
-        logger.info(f"✅ {scraper.VENDOR_NAME} {component_type} completed: {saved_count}/{len(new_product_urls)} products saved")
+        logger.info(f"✅ {scraper.VENDOR_NAME} {component_type} completed: {saved_count}/{len(new_product_urls)} products saved or unchanged")
+        if saved_count == 0:
+            raise RuntimeError(f"all {len(new_product_urls)} products failed")
         return saved_count
         
     except Exception as e:
         logger.error(f"❌ Error scraping {component_type} from {url}: {e}")
-        return 0
+        raise
+
+async def refresh_from_listing(scraper, url, component_type, normalization, session, checkpoints=None):
+    """
+    Listing-only refresh: prices and stock come from the category pages. Known
+    URLs whose listing data is unchanged are recorded as checked without being
+    opened; product pages are fetched only for new URLs, changed listing data,
+    and (with use_sitemaps) known URLs whose sitemap lastmod is newer than our
+    last check. Returns products saved or confirmed unchanged.
+    """
+    config = get_config()
+    try:
+        planned = checkpoints.planned_products(session, scraper.VENDOR_NAME, component_type) if checkpoints else {}
+        if planned:
+            # Resuming: the listing was already read, finish the product pages it chose
+            return await _try_scrape_url(scraper, url, component_type, normalization, session, checkpoints)
+
+        listed = {}
+        current_url = url
+        for page_count in range(1, config["listing_max_pages"] + 1):
+            if page_count > 1:
+                with scraper.timed("delay"):
+                    await asyncio.sleep(random.uniform(*config["page_delay_range"]))
+            logger.info(f"📄 Listing page {page_count}/{config['listing_max_pages']}: {current_url}")
+            html = await scraper.fetch_page(current_url)
+            if checkpoints:
+                checkpoints.mark(scraper.VENDOR_NAME, component_type, current_url, "done" if html else "failed",
+                                 page=page_count, kind="listing")
+            if not html:
+                break
+            items, next_url = await scraper.parse_in_pool("parse_listing", html)
+            for item in items:
+                listed.setdefault(item.url, item)
+            if not next_url:
+                break
+            current_url = next_url
+
+        if not listed:
+            # No cards recognised (layout change or unsupported vendor): crawl product pages instead
+            logger.warning(f"⚠️ No listing data for {scraper.VENDOR_NAME} {component_type}, falling back to product pages")
+            return await _try_scrape_url(scraper, url, component_type, normalization, session, checkpoints)
+
+        known = get_known_listing_state(session, scraper.VENDOR_NAME)
+        lastmods = await load_sitemap_lastmods(scraper) if config["use_sitemaps"] else {}
+
+        unchanged_rows, to_fetch = [], []
+        for p_url, item in listed.items():
+            state = known.get(p_url)
+            in_stock = item.status.lower() == "in stock"
+            modified = lastmods.get(p_url)
+            if state is None or item.status == "Unknown" or (item.price, in_stock) != (state["price_bdt"], state["in_stock"]):
+                to_fetch.append(p_url)
+            elif modified is not None and (state["last_checked"] is None or modified > state["last_checked"]):
+                to_fetch.append(p_url)
+            else:
+                unchanged_rows.append({
+                    "component_id": state["component_id"],
+                    "vendor_name": scraper.VENDOR_NAME,
+                    "price_bdt": item.price,
+                    "url": p_url,
+                    "in_stock": in_stock,
+                })
+
+        # Known URLs of this category that fell off the listed pages but changed per the sitemap
+        for p_url, state in known.items():
+            modified = lastmods.get(p_url)
+            if (p_url not in listed and state["component_type"] == component_type
+                    and modified is not None
+                    and (state["last_checked"] is None or modified > state["last_checked"])):
+                to_fetch.append(p_url)
+
+        if unchanged_rows:
+            try:
+                with scraper.timed("db_write"):
+                    counts = upsert_vendor_prices(session, unchanged_rows)
+                    RefreshStatsStore().observe(session, unchanged_rows)
+                    session.commit()
+                for key, value in counts.items():
+                    scraper.count(f"prices_{key}", value)
+            except Exception as e:
+                logger.error(f"Could not record unchanged listing prices: {e}")
+                session.rollback()
+
+        logger.info(
+            f"📋 {scraper.VENDOR_NAME} {component_type}: {len(listed)} listed, "
+            f"{len(unchanged_rows)} unchanged, {len(to_fetch)} product pages to fetch"
+        )
+        if not to_fetch:
+            return len(unchanged_rows)
+
+        if checkpoints:
+            for p_url in to_fetch:
+                checkpoints.mark(scraper.VENDOR_NAME, component_type, p_url, "pending")
+            save_checkpoints(checkpoints, session)
+
+        saved_count = await process_products_concurrently(
+            scraper, to_fetch, component_type, normalization, session, checkpoints
+        )
+        return len(unchanged_rows) + saved_count
+
+    except Exception as e:
+        logger.error(f"❌ Listing refresh failed for {component_type} from {url}: {e}")
+        raise
+
+def get_known_listing_state(session: Session, vendor_name: str) -> Dict[str, Dict]:
+    """Stored price, stock and last check (None if never recorded) of every known product URL of a vendor"""
+    prices, stats, components = VendorPrice.__table__, UrlRefreshStats.__table__, Component.__table__
+    rows = session.execute(
+        select(
+            prices.c.url, prices.c.component_id, prices.c.price_bdt, prices.c.in_stock, prices.c.last_updated,
+            components.c.component_type, stats.c.last_checked,
+        )
+        .join(components, components.c.id == prices.c.component_id)
+        .outerjoin(stats, stats.c.url == prices.c.url)
+        .where(prices.c.vendor_name == vendor_name)
+    )
+    return {
+        row.url: {
+            "component_id": row.component_id,
+            "price_bdt": row.price_bdt,
+            "in_stock": row.in_stock,
+            "component_type": row.component_type,
+            "last_checked": max(filter(None, (row.last_updated, row.last_checked)), default=None),
+        }
+        for row in rows
+    }
+
+# Sitemap lastmods per vendor, fetched at most once per process
+_sitemap_lastmods: Dict[str, Dict[str, Optional[datetime]]] = {}
+
+async def load_sitemap_lastmods(scraper, max_sitemaps: int = 10) -> Dict[str, Optional[datetime]]:
+    """Page URL -> lastmod from the vendor's sitemap, following a sitemap index"""
+    if scraper.VENDOR_NAME in _sitemap_lastmods:
+        return _sitemap_lastmods[scraper.VENDOR_NAME]
+
+    lastmods = {}
+    queue = [scraper.SITEMAP_URL] if scraper.SITEMAP_URL else []
+    fetched = 0
+    while queue and fetched < max_sitemaps:
+        xml = await scraper.fetch_page(queue.pop(0), retries=1)
+        fetched += 1
+        if not xml:
+            continue
+        pages, children = await scraper.parse_in_pool("parse_sitemap", xml)
+        lastmods.update(pages)
+        queue.extend(children)
+
+    logger.info(f"🗺️ {scraper.VENDOR_NAME} sitemap: {len(lastmods)} URLs from {fetched} sitemap files")
+    _sitemap_lastmods[scraper.VENDOR_NAME] = lastmods
+    return lastmods
+
+def save_checkpoints(checkpoints, session):
+    """Persist buffered checkpoint marks"""
+    try:
+        checkpoints.flush(session)
+        session.commit()
+        checkpoints.committed()
+    except Exception as e:
+        # The marks stay buffered for the next flush
+        logger.warning(f"Could not save checkpoints: {e}")
+        session.rollback()
+
+def save_unchanged(urls, scraper, session):
+    """
+    Count unchanged pages as checked so the refresh planner sees them as fresh,
+    and refresh their validators (their data is already saved)
+    """
+    try:
+        with scraper.timed("db_write"):
+            RefreshStatsStore().touch(session, urls)
+            PageValidatorStore().save(session, scraper.VENDOR_NAME, scraper.take_validators(urls))
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Could not record unchanged pages: {e}")
+        session.rollback()
+
+async def scrape_vendor(scraper, vendor_urls, targets, normalization, checkpoints):
+    """One vendor's worker: its categories in order, with its own DB session"""
+    config = get_config()
+    session = Session(engine)
+    saved = 0
+    try:
+        for c_type in targets:
+            if checkpoints.category_done(scraper.VENDOR_NAME, c_type):
+                continue
+
+            logger.info(f"🎯 {scraper.VENDOR_NAME}: processing {c_type.value.upper()}")
+            try:
+                saved += await process_vendor_category(scraper, vendor_urls, c_type, normalization, session, checkpoints)
+            except Exception as e:
+                logger.error(f"❌ Error processing {scraper.VENDOR_NAME} {c_type}: {e}")
+                # Retried by the next run; continue with other categories even if one fails
+                checkpoints.mark(scraper.VENDOR_NAME, c_type, "", "failed", kind="category")
+                save_checkpoints(checkpoints, session)
+                continue
+
+            # Inter-category delay for stealth
+            if c_type != targets[-1]:  # Don't wait after last category
+                with scraper.timed("delay"):
+                    await asyncio.sleep(random.uniform(*config["category_delay_range"]))
+
+            # Memory cleanup after each component type
+            gc.collect()
+    finally:
+        session.close()
+    return saved
 
 async def main():
     """Enhanced main scraping function with session management"""
     start_time = datetime.utcnow()
+    started = time.time()
     logger.info("🚀 Starting enhanced stealth scraping process...")
     
     session = Session(engine)
@@ -392,6 +748,9 @@ async def main():
     # Initialize scrapers with enhanced configuration
     startech = StarTechScraper(headless=True)
     skyland = SkylandScraper(headless=True)
+    # Per-request metrics and per-phase timings of both vendors
+    monitor = ScraperMonitor()
+    startech.monitor = skyland.monitor = monitor
     
     # Process ALL component types with optimized sequencing
     targets = [
@@ -406,44 +765,42 @@ async def main():
     ]
     
     total_saved = 0
+
+    # Resume the last run if it died part-way, otherwise start a new one
+    checkpoints = CheckpointStore("full")
+    targets = checkpoints.open_run(session, plan=targets)
+    if checkpoints.resumed:
+        logger.info(f"♻️ Resuming interrupted run #{checkpoints.run_id}")
     
     try:
-        for c_type in targets:
-            logger.info(f"\n{'='*50}")
-            logger.info(f"🎯 Processing {c_type.value.upper()}")
-            logger.info(f"{'='*50}")
-            
-            try:
-                # Process StarTech with session management
-                startech_saved = await process_vendor_category(startech, STARTECH_URLS, c_type, norm, session)
-                total_saved += startech_saved
-                
-                # Strategic delay between vendors (longer for stealth)
-                await asyncio.sleep(random.uniform(8, 15))
-                
-                # Process Skyland
-                skyland_saved = await process_vendor_category(skyland, SKYLAND_URLS, c_type, norm, session)
-                total_saved += skyland_saved
-                
-                # Longer inter-category delay for stealth
-                if c_type != targets[-1]:  # Don't wait after last category
-                    await asyncio.sleep(random.uniform(10, 20))
-                
-                # Memory cleanup after each component type
-                gc.collect()
-                
-            except Exception as e:
-                logger.error(f"❌ Error processing {c_type}: {e}")
-                # Continue with other categories even if one fails
-                continue
+        # Vendors are independent hosts: each runs on its own worker, paced by
+        # its host budget, so neither idles on the other's politeness delays.
+        # Like its session, each worker gets its own checkpoint buffer
+        vendor_checkpoints = {v.VENDOR_NAME: checkpoints.fork() for v in (startech, skyland)}
+        results = await run_per_vendor({
+            startech.VENDOR_NAME: scrape_vendor(startech, STARTECH_URLS, targets, norm, vendor_checkpoints[startech.VENDOR_NAME]),
+            skyland.VENDOR_NAME: scrape_vendor(skyland, SKYLAND_URLS, targets, norm, vendor_checkpoints[skyland.VENDOR_NAME]),
+        })
+        total_saved = sum(r for r in results.values() if isinstance(r, int))
+
+        # One full pass finishes the run; what failed is retried by the next one
+        if all(
+            vendor_checkpoints[v.VENDOR_NAME].category_attempted(v.VENDOR_NAME, c)
+            for c in targets for v in (startech, skyland)
+        ):
+            checkpoints.finish_run(session)
         
     finally:
         # Cleanup browser resources
         try:
             await startech.cleanup()
             await skyland.cleanup()
+            shutdown_parse_pool()
+            monitor.close()
         except Exception as e:
             logger.warning(f"Cleanup warning: {e}")
+        config = get_config()
+        export_run_metrics(monitor, "full", started, config["metrics_textfile_dir"], config["metrics_pushgateway"])
     
     # Summary
     end_time = datetime.utcnow()
@@ -452,12 +809,27 @@ async def main():
     logger.info(f"\n{'='*50}")
     logger.info(f"✅ ENHANCED SCRAPING COMPLETED")
     logger.info(f"🕒 Duration: {duration:.0f} seconds ({duration/60:.1f} minutes)")
-    logger.info(f"📊 Total products saved: {total_saved}")
+    logger.info(f"📊 Total products saved or unchanged: {total_saved}")
     logger.info(f"⚡ Average speed: {total_saved/(duration/60):.1f} products/minute")
     logger.info(f"🛡️ Enhanced anti-detection measures active")
+    logger.info(f"⏱️ Time by phase (seconds, share of the category):\n{monitor.format_phase_summary()}")
     logger.info(f"{'='*50}")
     
     session.close()
 
 if __name__ == "__main__":
+    import sys
+
+    # --listing-only: refresh prices from category pages, open product pages only when needed
+    # --sitemaps: also refetch known URLs whose sitemap lastmod moved
+    if "--listing-only" in sys.argv:
+        SCRAPER_CONFIG["listing_only"] = True
+    if "--sitemaps" in sys.argv:
+        SCRAPER_CONFIG["use_sitemaps"] = True
+    # --metrics-textfile=DIR / --pushgateway=HOST:PORT: export run metrics for Prometheus
+    for arg in sys.argv[1:]:
+        if arg.startswith("--metrics-textfile="):
+            SCRAPER_CONFIG["metrics_textfile_dir"] = arg.split("=", 1)[1]
+        elif arg.startswith("--pushgateway="):
+            SCRAPER_CONFIG["metrics_pushgateway"] = arg.split("=", 1)[1]
     asyncio.run(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+OFFLINE RE-PARSE
+Replays stored raw pages through the vendor parsers without any network
+requests, refreshing price, stock and specs in vendor_prices.
+
+    python run_reparse.py                       # everything
+    python run_reparse.py --vendor StarTech --type gpu --workers 8
+    python run_reparse.py --dry-run             # parse and report only
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlmodel import Session
+from app.database import engine
+from app.models.component import Component
+from app.models.enums import ComponentType
+from app.models.price import VendorPrice
+from app.scraping.vendors.startech import StarTechScraper
+from app.scraping.vendors.skyland import SkylandScraper
+from app.services.raw_pages import RawPageStore
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCRAPERS = {
+    StarTechScraper.VENDOR_NAME: StarTechScraper,
+    SkylandScraper.VENDOR_NAME: SkylandScraper,
+}
+
+CHUNK_SIZE = 200
+
+_worker_scrapers: Dict[str, object] = {}
+
+
+def _reparse_page(vendor_name: str, url: str, html: str) -> Optional[Dict]:
+    """Runs in a worker process: parse one page, return only the extracted fields."""
+    scraper = _worker_scrapers.get(vendor_name)
+    if scraper is None:
+        scraper = SCRAPERS[vendor_name](headless=True)
+        _worker_scrapers[vendor_name] = scraper
+
+    product = asyncio.run(scraper.parse_product(html, url))
+    if not product:
+        return None
+    return {"price": product.price, "status": product.status, "specs": product.specs}
+
+
+def _load_targets(session: Session, vendor: Optional[str], component_type: Optional[ComponentType]) -> List[Tuple]:
+    prices = VendorPrice.__table__
+    query = select(prices.c.id, prices.c.vendor_name, prices.c.url, prices.c.raw_data["page"].as_string().label("page"))
+    query = query.where(prices.c.raw_data["page"].as_string().is_not(None))
+    if vendor:
+        query = query.where(prices.c.vendor_name == vendor)
+    if component_type:
+        query = query.join(Component.__table__).where(Component.__table__.c.component_type == component_type)
+    return session.execute(query.order_by(prices.c.id)).all()
+
+
+def reparse(vendor: Optional[str] = None, component_type: Optional[ComponentType] = None,
+            workers: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+    store = RawPageStore()
+    stats = {"pages": 0, "parsed": 0, "failed": 0, "missing": 0, "price_changes": 0}
+    start = time.time()
+
+    with Session(engine) as session, ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        targets = _load_targets(session, vendor, component_type)
+        logger.info(f"🔁 Re-parsing {len(targets)} stored pages")
+
+        for i in range(0, len(targets), CHUNK_SIZE):
+            chunk = targets[i:i + CHUNK_SIZE]
+            pages = store.get_many(session, (row.page for row in chunk))
+            current = dict(session.execute(
+                select(VendorPrice.__table__.c.id, VendorPrice.__table__.c.price_bdt)
+                .where(VendorPrice.__table__.c.id.in_([row.id for row in chunk]))
+            ).all())
+
+            jobs = []
+            for row in chunk:
+                html = pages.get(row.page)
+                if html is None or row.vendor_name.value not in SCRAPERS:
+                    stats["missing"] += 1
+                    continue
+                jobs.append((row, pool.submit(_reparse_page, row.vendor_name.value, row.url, html)))
+
+            updates = []
+            for row, future in jobs:
+                stats["pages"] += 1
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    logger.error(f"Re-parse failed for {row.url}: {e}")
+                    parsed = None
+                if not parsed:
+                    stats["failed"] += 1
+                    continue
+
+                stats["parsed"] += 1
+                if parsed["price"] != current.get(row.id):
+                    stats["price_changes"] += 1
+                updates.append({
+                    "id": row.id,
+                    "price_bdt": parsed["price"],
+                    "in_stock": (parsed["status"].lower() == "in stock"),
+                    "raw_data": {"page": row.page, "specs": parsed["specs"]},
+                })
+
+            if updates and not dry_run:
+                # ORM bulk UPDATE by primary key: one executemany per chunk
+                session.execute(update(VendorPrice), updates)
+                session.commit()
+            logger.info(f"📦 Chunk {i // CHUNK_SIZE + 1}: {len(updates)} rows re-parsed")
+
+    duration = time.time() - start
+    logger.info(f"✅ Re-parse completed in {duration:.1f}s: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-derive prices and specs from stored raw pages")
+    parser.add_argument("--vendor", choices=sorted(SCRAPERS), help="Only re-parse this vendor")
+    parser.add_argument("--type", dest="component_type", choices=[c.value for c in ComponentType],
+                        help="Only re-parse this component type")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and report without writing")
+    args = parser.parse_args()
+
+    reparse(
+        vendor=args.vendor,
+        component_type=ComponentType(args.component_type) if args.component_type else None,
+        workers=args.workers,
+        dry_run=args.dry_run,
+    )
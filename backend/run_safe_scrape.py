@@ -15,7 +15,16 @@ from app.models.enums import ComponentType
 from app.scraping.vendors.startech import StarTechScraper
 from app.scraping.vendors.skyland import SkylandScraper
 from app.services.normalization import NormalizationService
-from run_full_scrape import process_vendor_category, STARTECH_URLS, SKYLAND_URLS, get_existing_product_urls
+from app.scraping.base_scraper import shutdown_parse_pool
+from app.scraping.monitor import ScraperMonitor
+from app.scraping.metrics_export import export_run_metrics
+from app.scraping.config import get_config
+from app.services.checkpoints import CheckpointStore
+from app.services.refresh import RefreshPlanner
+from run_full_scrape import (
+    process_vendor_category, process_products_concurrently, save_checkpoints,
+    STARTECH_URLS, SKYLAND_URLS, get_existing_product_urls
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,31 +37,50 @@ class SafeScraperManager:
         self.session_request_limit = 100  # Per session limit (reduced)
         self.min_session_break = 1800  # 30 minutes between sessions
         self.daily_reset_hour = 2  # 2 AM daily reset
+        self.refresh_share = 0.7  # Share of a session spent re-checking known URLs
         
     async def run_safe_scraping_session(self, component_types=None):
         """Run a single safe scraping session with limits"""
         
-        if component_types is None:
-            # Default: Only scrape 2-3 component types per session for safety
-            all_types = [ComponentType.CPU, ComponentType.GPU, ComponentType.RAM, 
-                        ComponentType.MOTHERBOARD, ComponentType.STORAGE, 
-                        ComponentType.PSU, ComponentType.CASE, ComponentType.COOLER]
-            component_types = random.sample(all_types, 3)  # Random 3 components
+        session = Session(engine)
+        normalization = NormalizationService()
+        checkpoints = CheckpointStore("safe")
+        planner = RefreshPlanner()
+        # Specific components requested: discovery only, no refresh phase
+        refresh = component_types is None
+
+        # Default: Only scrape 2-3 component types per session for safety
+        all_types = [ComponentType.CPU, ComponentType.GPU, ComponentType.RAM, 
+                    ComponentType.MOTHERBOARD, ComponentType.STORAGE, 
+                    ComponentType.PSU, ComponentType.CASE, ComponentType.COOLER]
+        # Discovery goes to the categories with the most stale, volatile or
+        # popular URLs; categories with nothing known yet come first
+        priorities = [c for c in planner.category_priorities(session) if c in all_types]
+        # An interrupted or limit-stopped session is resumed before picking new components
+        component_types = checkpoints.open_run(
+            session, plan=component_types, fallback_plan=priorities[:3]
+        )
         
         logger.info(f"🛡️ SAFE SCRAPING SESSION STARTED")
+        if checkpoints.resumed:
+            logger.info(f"♻️ Resuming unfinished run #{checkpoints.run_id}")
         logger.info(f"📋 Components this session: {[c.value for c in component_types]}")
         
-        session = Session(engine)
-        normalization = NormalizationService()
-        
         # Initialize scrapers with enhanced stealth
         startech = StarTechScraper(headless=True)
         skyland = SkylandScraper(headless=True)
+        monitor = ScraperMonitor()
+        startech.monitor = skyland.monitor = monitor
         
         total_requests = 0
         session_start = time.time()
         
         try:
+            if refresh:
+                total_requests += await self.refresh_known_urls(
+                    [startech, skyland], planner, checkpoints, normalization, session
+                )
+
             for component_type in component_types:
                 logger.info(f"\n🎯 Processing {component_type.value.upper()}")
                 
@@ -61,11 +89,15 @@ class SafeScraperManager:
                     logger.warning(f"⚠️ Session request limit ({self.session_request_limit}) reached")
                     break
                 
+                if all(checkpoints.category_done(v.VENDOR_NAME, component_type) for v in (startech, skyland)):
+                    logger.info(f"⏭️ {component_type.value} already completed in this run")
+                    continue
+
                 # Process StarTech with monitoring
                 logger.info(f"🔄 StarTech {component_type.value}")
                 pre_startech_requests = startech.request_count
                 startech_count = await process_vendor_category(
-                    startech, STARTECH_URLS, component_type, normalization, session
+                    startech, STARTECH_URLS, component_type, normalization, session, checkpoints
                 )
                 startech_requests_made = startech.request_count - pre_startech_requests
                 total_requests += startech_requests_made
@@ -74,7 +106,8 @@ class SafeScraperManager:
                 # Inter-vendor break - CRITICAL for safety
                 break_time = random.uniform(60, 120)  # 1-2 minute break
                 logger.info(f"⏱️ Inter-vendor break: {break_time:.1f}s")
-                await asyncio.sleep(break_time)
+                with startech.timed("delay"):
+                    await asyncio.sleep(break_time)
                 
                 # Check limits again
                 if total_requests >= self.session_request_limit:
@@ -85,7 +118,7 @@ class SafeScraperManager:
                 logger.info(f"🔄 Skyland {component_type.value}")
                 pre_skyland_requests = skyland.request_count
                 skyland_count = await process_vendor_category(
-                    skyland, SKYLAND_URLS, component_type, normalization, session
+                    skyland, SKYLAND_URLS, component_type, normalization, session, checkpoints
                 )
                 skyland_requests_made = skyland.request_count - pre_skyland_requests
                 total_requests += skyland_requests_made
@@ -95,7 +128,20 @@ class SafeScraperManager:
                 if component_type != component_types[-1]:  # Don't wait after last component
                     break_time = random.uniform(180, 300)  # 3-5 minute break
                     logger.info(f"⏱️ Inter-component break: {break_time:.1f}s")
-                    await asyncio.sleep(break_time)
+                    with skyland.timed("delay"):
+                        await asyncio.sleep(break_time)
+
+            # Stopped early by the request limit: the next session picks up the rest.
+            # Categories that failed don't hold the run open; the next run retries them
+            refresh_pending = any(
+                status == "pending"
+                for urls in checkpoints.planned_by_kind(session, "refresh").values()
+                for status in urls.values()
+            )
+            if not refresh_pending and all(
+                checkpoints.category_attempted(v.VENDOR_NAME, c) for c in component_types for v in (startech, skyland)
+            ):
+                checkpoints.finish_run(session)
                 
         except Exception as e:
             logger.error(f"❌ Session error: {e}")
@@ -103,16 +149,74 @@ class SafeScraperManager:
         finally:
             await startech.cleanup()
             await skyland.cleanup()
+            shutdown_parse_pool()
+            monitor.close()
             session.close()
+            config = get_config()
+            export_run_metrics(monitor, "safe", session_start, config["metrics_textfile_dir"], config["metrics_pushgateway"])
         
         session_duration = time.time() - session_start
         logger.info(f"\n✅ SAFE SESSION COMPLETED")
         logger.info(f"⏱️ Duration: {session_duration/60:.1f} minutes")
         logger.info(f"📊 Estimated requests: {total_requests}")
         logger.info(f"🛡️ Session safety: MAINTAINED")
+        logger.info(f"⏱️ Time by phase (seconds, share of the category):\n{monitor.format_phase_summary()}")
         
         return total_requests
 
+    async def refresh_known_urls(self, scrapers, planner, checkpoints, normalization, session):
+        """
+        Re-checks the known product URLs most likely to have changed, within
+        ``refresh_share`` of the session limit, and records how many changes
+        the plan expected against how many it found. Returns requests made.
+        """
+        by_vendor = {scraper.VENDOR_NAME: scraper for scraper in scrapers}
+        planned = checkpoints.planned_by_kind(session, "refresh")
+
+        if not checkpoints.resumed:
+            budget = int(self.session_request_limit * self.refresh_share)
+            plan = [c for c in planner.plan(session, budget) if c.vendor_name in by_vendor]
+            for candidate in plan:
+                checkpoints.mark(candidate.vendor_name, candidate.component_type, candidate.url, "pending", kind="refresh")
+                planned.setdefault((candidate.vendor_name, candidate.component_type), {})[candidate.url] = "pending"
+            planner.record_plan(session, checkpoints.run_id, plan)
+            save_checkpoints(checkpoints, session)
+            logger.info(
+                f"🔁 Refresh plan: {len(plan)} known URLs, "
+                f"~{sum(c.p_changed for c in plan):.1f} expected to have changed"
+            )
+
+        requests_made = 0
+        for (vendor_name, component_type), urls in planned.items():
+            remaining = [url for url, status in urls.items() if status == "pending"]
+            if not remaining or vendor_name not in by_vendor:
+                continue
+            if requests_made >= self.session_request_limit * self.refresh_share:
+                logger.warning(f"⚠️ Refresh budget reached, {vendor_name} {component_type.value} left for next session")
+                continue
+
+            scraper = by_vendor[vendor_name]
+            logger.info(f"🔁 Refreshing {len(remaining)} {vendor_name} {component_type.value} URLs")
+            before = scraper.request_count
+            await process_products_concurrently(
+                scraper, remaining, component_type, normalization, session, checkpoints
+            )
+            requests_made += scraper.request_count - before
+
+        # Expected vs observed freshness of this run's plan
+        all_urls = [url for urls in planned.values() for url in urls]
+        try:
+            outcome = planner.record_outcome(session, checkpoints.run_id, all_urls)
+            session.commit()
+            logger.info(
+                f"📊 Refresh: {outcome['refreshed']}/{len(all_urls)} checked, "
+                f"{outcome['changed']} changed, {requests_made} HTTP requests"
+            )
+        except Exception as e:
+            logger.warning(f"Could not record refresh outcome: {e}")
+            session.rollback()
+        return requests_made
+
     async def run_daily_safe_scraping(self):
         """Run multiple safe sessions throughout the day"""
         logger.info(f"🌅 STARTING DAILY SAFE SCRAPING ROUTINE")
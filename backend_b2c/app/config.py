@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     api_title: str = "PC Lagbe B2C API"
     api_version: str = "1.0.0"
     debug: bool = False
+    metrics_enabled: bool = False  # Serve Prometheus metrics at /metrics
     
     # Security
     secret_key: str
@@ -3,7 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from .config import get_settings
-from .database import init_db
+from .database import init_db, engine
+from .metrics import setup_metrics
 from .services.news.scheduler import start_scheduler, shutdown_scheduler
 
 settings = get_settings()
@@ -45,6 +46,10 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 
+# Opt-in Prometheus endpoint (METRICS_ENABLED=true)
+if settings.metrics_enabled:
+    setup_metrics(app, engine, prefix="zenfa_b2c_api")
+
 # Includes
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(payments.router, prefix="/payments", tags=["Payments"])